@@ -0,0 +1,140 @@
+"""
+Throughput per GB of RAM: the single-driver venue loop versus tabs of one Chrome over DevTools.
+
+Serves synthetic lobby and race pages locally and scrapes them with real Chrome
+sessions, so Chrome and ChromeDriver must be installed. Memory is the peak
+proportional set size (resident size where PSS is unavailable) of every browser
+process started by the benchmark, sampled while it runs.
+
+    python bench_cdp_tabs.py --code G --venues 24 --tabs 1 4 8 --workers 4
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+import psutil
+
+from cdp_tabs import debugger_address, scrape_races_cdp
+from fixture_site import FixtureSite, lobby_url, serve
+from lean_browser import start_chrome
+from scraper_loader import load_scraper
+from venue_pool import scrape_in_parallel
+
+
+class MemorySampler:
+    """Samples the memory of this process's descendants (ChromeDriver and Chrome) in a thread."""
+
+    def __init__(self, interval=0.2):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @staticmethod
+    def _memory(process):
+        try:
+            info = process.memory_full_info()
+            return getattr(info, 'pss', info.rss)
+        except (psutil.AccessDenied, psutil.NoSuchProcess):
+            try:
+                return process.memory_info().rss
+            except psutil.NoSuchProcess:
+                return 0
+
+    def _run(self):
+        me = psutil.Process()
+        while not self._stop.is_set():
+            self.peak = max(self.peak, sum(self._memory(child) for child in me.children(recursive=True)))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_sequential(scraper, url):
+    driver = start_chrome()
+    try:
+        locations = scraper.load_lobby(driver, url)
+        return scraper.scrape_races(driver, locations, url)
+    finally:
+        driver.quit()
+
+
+def run_pool(scraper, url, workers):
+    driver = start_chrome()
+    try:
+        locations = scraper.load_lobby(driver, url)
+        race_urls = scraper.collect_race_urls(driver, locations)
+    finally:
+        driver.quit()
+    return scrape_in_parallel(
+        make_driver=start_chrome,
+        open_lobby=lambda d: scraper.load_lobby(d, url, report=False),
+        scrape_venue=lambda d, name: scraper.scrape_venue(d, name, url, race_urls.get(name)),
+        locations=locations,
+        workers=workers,
+    )
+
+
+def run_tabs(scraper, url, tabs):
+    driver = start_chrome()
+    try:
+        _, race_dfs, form_dfs = scrape_races_cdp(
+            debugger_address(driver), url,
+            lambda text: scraper.parse_australian_race_locations([text]),
+            scraper.parse_venue,
+            tabs=tabs,
+            blocked_urls=driver.blocked_urls,
+        )
+        return race_dfs, form_dfs
+    finally:
+        driver.quit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--code", choices=["G", "T"], default="G")
+    parser.add_argument("--venues", type=int, default=24)
+    parser.add_argument("--tabs", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--workers", type=int, nargs="*", default=[4], help="Also run the worker pool with N browsers.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Server latency per request (s).")
+    args = parser.parse_args()
+
+    scraper = load_scraper(args.code)
+    site = FixtureSite(args.code, venues=args.venues)
+    server, base_url = serve(site, latency=args.latency)
+    url = lobby_url(site, base_url)
+
+    modes = [("single driver", lambda: run_sequential(scraper, url))]
+    modes += [(f"pool x{n}", lambda n=n: run_pool(scraper, url, n)) for n in args.workers]
+    modes += [(f"cdp tabs x{n}", lambda n=n: run_tabs(scraper, url, n)) for n in args.tabs]
+
+    print(f"{'mode':<15}{'seconds':>9}{'venues/min':>12}{'peak MB':>9}{'venues/min/GB':>15}{'form rows':>11}")
+    try:
+        for mode, run in modes:
+            start = time.perf_counter()
+            with MemorySampler() as memory:
+                race_dfs, form_dfs = run()
+            elapsed = time.perf_counter() - start
+            per_minute = args.venues / elapsed * 60
+            peak_gb = memory.peak / 2 ** 30
+            form_rows = sum(len(df) for df in form_dfs)
+            print(
+                f"{mode:<15}{elapsed:>9.1f}{per_minute:>12.1f}{memory.peak / 2 ** 20:>9.0f}"
+                f"{per_minute / peak_gb if peak_gb else 0:>15.1f}{form_rows:>11}"
+            )
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
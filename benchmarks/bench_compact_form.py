@@ -0,0 +1,97 @@
+"""
+Peak memory of a large form history: one dict per run, the CSV as text columns, and
+the compact columns of scripts/compact_form.py.
+
+Writes `--rows` synthetic form rows to a CSV, then loads it once per representation,
+each in a fresh process, and reports that process's peak RSS, the size of the
+loaded data and the load time. The RSS of a process that only imports pandas is
+shown for reference.
+
+    python bench_compact_form.py --code G --rows 1000000
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+import pandas as pd
+
+from compact_form import read_history
+from form_engine import form_frame, greyhound_form_columns, horse_form_columns
+from synthetic_forms import meeting
+
+
+def write_history(path, code, rows):
+    parse = greyhound_form_columns if code == 'G' else horse_form_columns
+    written, seed = 0, 0
+    while written < rows:
+        _, form = meeting(code, f"Venue {seed % 40}", runners=100, runs_per_runner=10, seed=seed, quirks=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            df = form_frame(parse(form)).iloc[:rows - written]
+        df.to_csv(path, mode='a', header=written == 0, index=False)
+        written += len(df)
+        seed += 1
+
+
+def load(mode, path, code):
+    if mode == 'dicts':
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        df = pd.DataFrame(rows, dtype=object)
+        del rows
+    elif mode == 'text':
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    elif mode == 'compact':
+        df = read_history(path, code)
+    else:
+        df = pd.DataFrame()
+    return df
+
+
+def child(mode, path, code):
+    start = time.perf_counter()
+    df = load(mode, path, code)
+    seconds = time.perf_counter() - start
+    print(json.dumps({
+        'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'data_mb': df.memory_usage(deep=True).sum() / 2 ** 20,
+        'rows': len(df),
+        'seconds': seconds,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--code", choices=["G", "T"], default="G")
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "CSV"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child, args.code)
+        return
+
+    with tempfile.TemporaryDirectory() as work:
+        path = os.path.join(work, 'history.csv')
+        write_history(path, args.code, args.rows)
+        print(f"{args.rows} {args.code} form rows, {os.path.getsize(path) / 2 ** 20:.0f} MB of CSV")
+        print(f"{'representation':<16}{'peak RSS MB':>12}{'data MB':>10}{'load s':>9}")
+        for mode in ['imports only', 'dicts', 'text', 'compact']:
+            output = subprocess.run(
+                [sys.executable, __file__, '--code', args.code, '--child', mode, path],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:<16}{result['peak_mb']:>12.0f}{result['data_mb']:>10.0f}{result['seconds']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
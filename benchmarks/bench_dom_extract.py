@@ -0,0 +1,91 @@
+"""
+WebDriver round trips and time for per-element `el.text` versus one bulk script call.
+
+Loads a synthetic race page with its FULL FORM blocks open and reads the runner
+cards and form blocks both ways. Chrome and ChromeDriver must be installed.
+
+    python bench_dom_extract.py --code G --runners 12 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+
+from dom_extract import extract_texts
+from fixture_site import FixtureSite, serve
+from readiness import wait_for_dom_quiet
+
+SELECTORS = {'runner cards': ".css-10arllf", 'form blocks': ".sc-jNwOwP.drZjiD"}
+
+
+class RoundTripCounter:
+    """Counts WebDriver commands sent by `driver` while active."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.count = 0
+        self._execute = driver.execute
+
+    def __enter__(self):
+        def counted(*args, **kwargs):
+            self.count += 1
+            return self._execute(*args, **kwargs)
+
+        self.count = 0
+        self.driver.execute = counted
+        return self
+
+    def __exit__(self, *exc):
+        self.driver.execute = self._execute
+
+
+def per_element(driver, css_selector):
+    elements = driver.find_elements(By.CSS_SELECTOR, css_selector)
+    return [el.text.strip() for el in elements if el.text.strip()]
+
+
+def measure(driver, read, css_selector, repeat):
+    with RoundTripCounter(driver) as counter:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            texts = read(driver, css_selector)
+        elapsed = (time.perf_counter() - start) / repeat
+    return texts, counter.count // repeat, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--code", choices=["G", "T"], default="G")
+    parser.add_argument("--runners", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    site = FixtureSite(args.code, venues=1, runners=args.runners, render_delay_ms=0)
+    server, base_url = serve(site)
+    driver = webdriver.Chrome()
+    try:
+        driver.get(base_url + site.race_path(0))
+        wait_for_dom_quiet(driver, "race_page", SELECTORS['runner cards'], 30)
+        driver.find_element(By.ID, "full-form").click()
+        wait_for_dom_quiet(driver, "full_form", SELECTORS['form blocks'], 30)
+
+        print(f"{'elements':<14}{'method':<13}{'round trips':>12}{'ms':>10}")
+        for label, css_selector in SELECTORS.items():
+            old_texts, old_trips, old_time = measure(driver, per_element, css_selector, args.repeat)
+            new_texts, new_trips, new_time = measure(driver, extract_texts, css_selector, args.repeat)
+            print(f"{label:<14}{'el.text':<13}{old_trips:>12}{old_time * 1000:>10.1f}")
+            print(f"{label:<14}{'bulk script':<13}{new_trips:>12}{new_time * 1000:>10.1f}")
+            if old_texts != new_texts:
+                print(f"  warning: {label} text differs between methods")
+    finally:
+        driver.quit()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""
+Original line-walking parsers versus the single-pass engine in scripts/form_engine.py.
+
+Checks first that both produce identical records and DataFrames on synthetic meetings,
+on a few hand-written edge cases, and on the runner-list and FULL FORM text rebuilt from
+the rows in data/ (where both must also give those rows back exactly). Then times each
+over a large synthetic batch and over data/. The single pass is a modest win: between
+1.1x and 2.4x across codes and inputs in our runs, about 1.5x on data/ and at a few
+hundred runners.
+
+    python bench_form_engine.py --runners 2000 --runs 10
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+import pandas as pd
+
+import legacy_parsers
+from form_engine import (
+    dog_card_records, form_frame, greyhound_form_columns, horse_card_records, horse_form_columns,
+)
+from synthetic_forms import greyhound_form_entry, horse_form_entry, meeting
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+DATA_FILES = {'G': ('race_data.csv', 'full_form_data.csv'), 'T': ('Trace_data.csv', 'Tfull_form_data.csv')}
+
+EDGE_FORMS = {
+    'G': [
+        "No History Dog\nT: J Smith",
+        "Spell Dog\nRace History\nPlc\n1/8\n22/08/2025\nSale\n7\n520\n1.25\nM\n4\n1,1,1\n$3.40\n5.10\n"
+        "29.80\n29.55\n1. Spell Dog\n2. Other Dog\nSPELL 45 DAYS\n3/6\n01/06/2025\nThe Meadows\n525\n"
+        "3.00\n5\n2\n3,3,3\n$8.00\n5.30\n30.10\nN/A\n1. Winner\nBack to top",
+        "Odd Dog\nRace History\nPlc\n2/7\nnot a date\nAngle Park\n12\n515\n2.5\nFFA\n6\nx,y\n$12.00\n"
+        "5.40\n30.00\nslow\n1. Winner\n5/8\n10/05/2025\nSale\n$2.10\n5.00\n",
+    ],
+    'T': [
+        "7\nNo History Horse",
+        "Short Horse\nRace History\nPlc\n2/10\n14/08/2025\nDoomben\n14\n70.1\n1200\n1.5\nG\n5\n5,5,3\n"
+        "A Jockey\n57.5\n$4.60\n1. Winner 58kg\n2. Short Horse\nLET-UP\n1/9\n02/07/2025\nEagle Farm\n"
+        "69.2\n1100\n0.5\nCL1\nS\n$2.20\nBack to top",
+    ],
+}
+EDGE_CARDS = {
+    'G': ["20:05  Sale", "Lonely Dog (1)", "T: J Smith", "Scratched", "20:25  Sale",
+          "Fast Dog (2)", "T: K Brown", "Box 2", "1X2", "W: 30kg", "3.5", "1.6", "Slow Dog (3)"],
+    'T': ["13:15  Doomben", "Doomben Hcp", "1200m", "Good 4", "1. Gone Horse (4)", "J", "A Jockey 56kg",
+          "T", "A Trainer", "12", "3yo G", "Scratched", "2. Only Win (2)", "J", "B Jockey", "T",
+          "B Trainer", "x21", "4yo M", "7.5", "J"],
+}
+
+
+def inputs(code, meetings, runners, runs):
+    cards, forms = [], []
+    for n in range(meetings):
+        card, form = meeting(code, f"Venue {n}", runners=runners, runs_per_runner=runs, seed=n)
+        cards.append(card)
+        forms.append(form)
+    return cards, forms
+
+
+def _present(*values):
+    return [value for value in values if value]
+
+
+def data_card(code, race_df):
+    """Rebuilds the runner-list lines behind the race rows in data/."""
+    lines = []
+    if code == 'G':
+        for label, race in race_df.groupby('Race', sort=False):
+            lines.append(label)
+            for row in race.itertuples(index=False):
+                number = row[1]
+                lines += [f"{row.Name} ({number})", "T: A Trainer", f"Box {number}", row.Form, "W: 30kg"]
+                lines += _present(row.Win, row.Place)
+        return lines
+    for (label, name), race in race_df.groupby(['Race Time', 'Race Name'], sort=False):
+        lines += [label, name, "1200m", "Good 4"]
+        for row in race.to_dict('records'):
+            lines.append(f"{row['Horse Number']}. {row['Horse Name']} ({row['Barrier']})")
+            lines += ["J", row['Jockey']] if row['Jockey'] else []
+            lines += ["T", row['Trainer']] + _present(row['Form'], row['Age/Sex'])
+            lines += ["Scratched"] if row['Status'] == 'Scratched' else _present(row['Win Odds'], row['Place Odds'])
+    return lines
+
+
+def data_forms(code, form_df):
+    """Rebuilds the FULL FORM blocks behind the form rows in data/, one per runner."""
+    runner = form_df.columns[0]
+    render = greyhound_form_entry if code == 'G' else horse_form_entry
+    entries = []
+    for name, runs in form_df.groupby(runner, sort=False):
+        rows = []
+        for run in runs.to_dict('records'):
+            run['Date'] = f"{run['Date'][8:10]}/{run['Date'][5:7]}/{run['Date'][:4]}"
+            # A missing Days or Class is a line the page did not have
+            for column in ['Days', 'Class']:
+                run[column] = None if run[column] == 'N/A' else run[column]
+            run['Placing'] = run['Placing'].split('\n') if run['Placing'] != 'N/A' else []
+            if code == 'G':
+                run.update(Sect='N/A', Best='N/A')
+            rows.append(run)
+        entries.append(render(name, rows))
+    return entries
+
+
+def data_inputs(code):
+    race_file, form_file = (os.path.join(DATA_DIR, name) for name in DATA_FILES[code])
+    race_df = pd.read_csv(race_file, dtype=str, keep_default_na=False)
+    form_df = pd.read_csv(form_file, dtype=str, keep_default_na=False)
+    return race_df, form_df, data_card(code, race_df), data_forms(code, form_df)
+
+
+def check_data(code):
+    """
+    Both parsers must give back exactly the rows in data/ from the text rebuilt from them.
+    """
+    race_df, form_df, card, forms = data_inputs(code)
+    check_equivalence(code, [card], [forms])
+    _, (new_card, new_form) = parsers(code).values()
+    records = pd.DataFrame(new_card(card), columns=race_df.columns).fillna('')
+    pd.testing.assert_frame_equal(records, race_df)
+    with contextlib.redirect_stdout(io.StringIO()):
+        parsed = new_form(forms)
+    pd.testing.assert_frame_equal(parsed[form_df.columns], form_df)
+
+
+def parsers(code):
+    if code == 'G':
+        return {
+            'legacy': (legacy_parsers.parse_dog_data, legacy_parsers.parse_greyhound_data),
+            'engine': (dog_card_records, lambda forms: form_frame(greyhound_form_columns(forms))),
+        }
+    return {
+        'legacy': (legacy_parsers.parse_horse_data, legacy_parsers.parse_horse_form),
+        'engine': (horse_card_records, lambda forms: form_frame(horse_form_columns(forms))),
+    }
+
+
+def check_equivalence(code, cards, forms):
+    (old_card, old_form), (new_card, new_form) = parsers(code).values()
+    for card, form in zip(cards + [EDGE_CARDS[code], []], forms + [EDGE_FORMS[code], []]):
+        assert new_card(card) == old_card(card), f"{code} card records differ"
+        old_out, new_out = io.StringIO(), io.StringIO()
+        with contextlib.redirect_stdout(old_out):
+            expected = old_form(form)
+        with contextlib.redirect_stdout(new_out):
+            actual = new_form(form)
+        pd.testing.assert_frame_equal(actual, expected)
+        assert new_out.getvalue() == old_out.getvalue(), f"{code} form warnings differ"
+
+
+def timed(card_parser, form_parser, cards, forms):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for card, form in zip(cards, forms):
+            card_parser(card)
+            form_parser(form)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runners", type=int, default=2000, help="Runners per code, in meetings of 8.")
+    parser.add_argument("--runs", type=int, default=10, help="Form runs per runner.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'input':<12}{'runners':>9}{'form rows':>11}{'legacy s':>11}{'engine s':>11}{'speedup':>9}")
+    for code in ['G', 'T']:
+        cards, forms = inputs(code, max(1, args.runners // 8), 8, args.runs)
+        check_equivalence(code, cards[:20], forms[:20])
+        check_data(code)
+        race_df, _, card, data_forms = data_inputs(code)
+        for label, runners, cards, forms in [
+            (f"{code} synthetic", len(cards) * 8, cards, forms),
+            (f"{code} data/", len(race_df), [card], [data_forms]),
+        ]:
+            timings = {
+                name: min(timed(card_parser, form_parser, cards, forms) for _ in range(args.repeat))
+                for name, (card_parser, form_parser) in parsers(code).items()
+            }
+            with contextlib.redirect_stdout(io.StringIO()):
+                rows = sum(len(parsers(code)['engine'][1](form)) for form in forms)
+            print(
+                f"{label:<12}{runners:>9}{rows:>11}{timings['legacy']:>11.3f}{timings['engine']:>11.3f}"
+                f"{timings['legacy'] / timings['engine']:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Venue visits of an HTTP run: the legacy lobby parser versus structured lobby entries.
+
+Serves a synthetic lobby in which some meetings have resulted or been abandoned and
+scrapes it with the HTTP engine twice: once picking venues with the old line filter,
+which takes every Australian name (and the tiles' status lines) as a venue to visit,
+and once with `lobby.parse_lobby`, which skips finished and abandoned meetings before
+any page is fetched.
+
+    python bench_lobby.py --code G --venues 24 --finished 8 --abandoned 2 --latency 0.05
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+import legacy_parsers
+from fixture_site import FixtureSite, lobby_url, serve
+from http_engine import HttpEngine, make_backend, scrape_races_http
+from lobby import parse_lobby, venues_to_scrape
+from scraper_loader import load_scraper
+
+
+def run(url, parse_locations, parse_venue):
+    visits = []
+
+    def visit(name, race_data, form_data):
+        visits.append(name)
+        return parse_venue(name, race_data, form_data)
+
+    engine = HttpEngine(make_backend(), url)
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            locations, _, form_dfs = scrape_races_http(engine, parse_locations, visit)
+    finally:
+        engine.close()
+    return time.perf_counter() - start, locations, visits, sum(len(df) for df in form_dfs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--code", choices=["G", "T"], default="G")
+    parser.add_argument("--venues", type=int, default=24)
+    parser.add_argument("--finished", type=int, default=8)
+    parser.add_argument("--abandoned", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.05, help="Server latency per request (s).")
+    args = parser.parse_args()
+
+    scraper = load_scraper(args.code)
+    site = FixtureSite(
+        args.code, venues=args.venues, prerender=True, finished=args.finished, abandoned=args.abandoned
+    )
+    server, base_url = serve(site, latency=args.latency)
+    url = lobby_url(site, base_url)
+
+    modes = [
+        ("legacy filter", lambda text: legacy_parsers.parse_australian_race_locations([text])),
+        ("lobby entries", lambda text: venues_to_scrape(parse_lobby(text, args.code), report=False)),
+    ]
+    print(f"{'mode':<15}{'locations':>10}{'visits':>8}{'seconds':>9}{'form rows':>11}")
+    try:
+        for mode, parse_locations in modes:
+            elapsed, locations, visits, form_rows = run(url, parse_locations, scraper.parse_venue)
+            print(f"{mode:<15}{len(locations):>10}{len(visits):>8}{elapsed:>9.2f}{form_rows:>11}")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Time and peak memory of the scrapers' parsers at 10, 1k and 100k runners.
+
+Input is synthetic race-card and FULL FORM text with scratchings, SPELL / LET-UP
+lines, missing Days and odd In Run values mixed in. Each parser is called once on
+the whole input, and so is its original line-walking version from
+`legacy_parsers.py`, in the same process. Results are reported as a ratio to the
+original, so they do not depend on the machine; a parser more than --tolerance
+slower than the original, or with a peak memory more than --memory-tolerance above
+it, is flagged as a regression (exit code 1). `build_dataframe` is the original
+code, so it is timed but not compared.
+
+    python bench_parsers.py
+    python bench_parsers.py --sizes 10 1000 --tolerance 0.1
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+import legacy_parsers
+from scraper_loader import load_scraper
+from synthetic_forms import meeting
+
+FIELD_SIZE = 8
+# Differences below these are noise at the small sizes and are never flagged
+MIN_DELTA = {'seconds': 0.002, 'peak_mb': 0.1}
+
+
+def synthetic_input(code, runners, runs_per_runner):
+    """Concatenated card lines and form entries for `runners` runners in meetings of FIELD_SIZE."""
+    card_lines, form_entries = [], []
+    for n in range((runners + FIELD_SIZE - 1) // FIELD_SIZE):
+        size = min(FIELD_SIZE, runners - n * FIELD_SIZE)
+        card, form = meeting(code, f"Venue {n}", size, runs_per_runner, seed=n,
+                             jump=f"{12 + n % 10}:{(n * 7) % 60:02d}", quirks=True)
+        card_lines += card
+        form_entries += form
+    return card_lines, form_entries
+
+
+def parser_calls(code, card_lines, form_entries):
+    """
+    The parsers to measure, as (name, zero-argument call, zero-argument call of the
+    original parser or None) triples.
+    """
+    scraper = load_scraper(code)
+    if code == 'G':
+        card_parser, form_parser = scraper.parse_dog_data, scraper.parse_greyhound_data
+    else:
+        card_parser, form_parser = scraper.parse_horse_data, scraper.parse_horse_form
+    legacy_card_parser = getattr(legacy_parsers, card_parser.__name__)
+    legacy_form_parser = getattr(legacy_parsers, form_parser.__name__)
+    records = card_parser(card_lines)
+    return [
+        (card_parser.__name__, lambda: card_parser(card_lines), lambda: legacy_card_parser(card_lines)),
+        (form_parser.__name__, lambda: form_parser(form_entries), lambda: legacy_form_parser(form_entries)),
+        (f"build_dataframe[{code}]", lambda: scraper.build_dataframe(records), None),
+    ]
+
+
+def measure(calls, repeat):
+    """
+    Best wall time over `repeat` rounds, then peak traced memory of one call, in MB,
+    for each of `calls`. The calls take turns within a round, so a slow patch of the
+    machine hits all of them alike.
+    Returns [(seconds, peak MB), ...] in the order of `calls`.
+    """
+    timings = [[] for _ in calls]
+    peaks = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            for call, call_timings in zip(calls, timings):
+                start = time.perf_counter()
+                call()
+                call_timings.append(time.perf_counter() - start)
+
+        for call in calls:
+            tracemalloc.start()
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            peaks.append(peak / 1e6)
+    return [(min(call_timings), peak) for call_timings, peak in zip(timings, peaks)]
+
+
+def compare(results, tolerances):
+    """
+    Returns a description of every result that is worse than the original parser's,
+    measured in the same run, by more than its metric's tolerance in `tolerances`.
+    """
+    regressions = []
+    for key, result in results.items():
+        legacy = result.get('legacy')
+        if not legacy:
+            continue
+        for metric, unit in [('seconds', 's'), ('peak_mb', 'MB')]:
+            if result[metric] > legacy[metric] * (1 + tolerances[metric]) and result[metric] - legacy[metric] > MIN_DELTA[metric]:
+                regressions.append(
+                    f"{key}: {metric} {result[metric]:.4f}{unit} vs original {legacy[metric]:.4f}{unit} "
+                    f"(x{result[metric] / legacy[metric]:.2f})"
+                )
+    return regressions
+
+
+def ratio(value, reference):
+    return f"{value / reference:.2f}" if reference else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000], help="Runner counts.")
+    parser.add_argument("--runs", type=int, default=6, help="Form runs per runner.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown, 0.25 = 25%%.")
+    # The card parsers keep a stripped copy of the lines, about 1.7x the original's peak
+    parser.add_argument("--memory-tolerance", type=float, default=1.0, help="Allowed peak memory growth.")
+    args = parser.parse_args()
+
+    results = {}
+    print(
+        f"{'parser':<24}{'runners':>9}{'input lines':>13}{'seconds':>10}{'peak MB':>10}"
+        f"{'x time':>8}{'x memory':>10}"
+    )
+    for code in ['G', 'T']:
+        for size in args.sizes:
+            card_lines, form_entries = synthetic_input(code, size, args.runs)
+            input_lines = len(card_lines) + sum(entry.count('\n') + 1 for entry in form_entries)
+            for name, call, legacy_call in parser_calls(code, card_lines, form_entries):
+                if legacy_call is None:
+                    [(seconds, peak_mb)] = measure([call], args.repeat)
+                    legacy = None
+                else:
+                    (seconds, peak_mb), (legacy_seconds, legacy_peak_mb) = measure([call, legacy_call], args.repeat)
+                    legacy = {'seconds': legacy_seconds, 'peak_mb': legacy_peak_mb}
+                result = {'seconds': seconds, 'peak_mb': peak_mb, 'legacy': legacy}
+                results[f"{name}@{size}"] = result
+                legacy = result['legacy'] or {}
+                print(
+                    f"{name:<24}{size:>9}{input_lines:>13}{seconds:>10.4f}{peak_mb:>10.2f}"
+                    f"{ratio(seconds, legacy.get('seconds')):>8}{ratio(peak_mb, legacy.get('peak_mb')):>10}"
+                )
+
+    print("x time / x memory: this parser's time and peak memory over the original parser's (lower is better)")
+    regressions = compare(results, {'seconds': args.tolerance, 'peak_mb': args.memory_tolerance})
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print(
+            f"No parser is more than {args.tolerance:.0%} slower or {args.memory_tolerance:.0%} larger "
+            f"than the original"
+        )
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Per-runner statistics: a pandas group-by over the whole form table versus the
+incrementally maintained index in scripts/runner_stats.py.
+
+Builds `--runners` synthetic runners' form, times the group-by an analyst would run
+for every question, the initial index build, an incremental update for one
+meeting, and per-runner and per-race lookups.
+
+    python bench_runner_stats.py --runners 20000 --runs 10
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+import pandas as pd
+
+from form_engine import form_frame, greyhound_form_columns, horse_form_columns
+from runner_stats import RunnerStats
+from synthetic_forms import meeting
+
+RUNNER_COLUMN = {'G': 'Greyhound', 'T': 'Horse'}
+
+
+def form_rows(code, runners, runs, meeting_size=100, seed=0):
+    parse = greyhound_form_columns if code == 'G' else horse_form_columns
+    frames = []
+    for n in range(max(1, runners // meeting_size)):
+        _, form = meeting(code, f"Venue {seed + n}", runners=meeting_size, runs_per_runner=runs, seed=seed + n)
+        with contextlib.redirect_stdout(io.StringIO()):
+            frames.append(form_frame(parse(form)))
+    return pd.concat(frames, ignore_index=True).astype('string').fillna('')
+
+
+def group_by(form_df, runner_column):
+    finish = pd.to_numeric(form_df['Plc'].str.split('/').str[0], errors='coerce')
+    first = pd.to_numeric(form_df['In Run'].str.split(',').str[0], errors='coerce')
+    time_ = pd.to_numeric(form_df['Time'], errors='coerce')
+    df = form_df.assign(win=finish == 1, first=first, time=time_)
+    per_runner = df.groupby(runner_column).agg(win_rate=('win', 'mean'), first=('first', 'mean'), last=('Date', 'max'))
+    best = df.groupby([runner_column, 'Track', 'Distance'])['time'].min()
+    return per_runner, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--code", choices=["G", "T"], default="G")
+    parser.add_argument("--runners", type=int, default=20000)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    column = RUNNER_COLUMN[args.code]
+    form_df = form_rows(args.code, args.runners, args.runs)
+    update_df = form_rows(args.code, 100, args.runs, seed=args.runners)
+    names = form_df[column].unique().tolist()
+
+    start = time.perf_counter()
+    group_by(form_df, column)
+    print(f"pandas group-by over {len(form_df)} form rows: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    with tempfile.TemporaryDirectory() as work:
+        stats = RunnerStats(os.path.join(work, 'stats.json'))
+        start = time.perf_counter()
+        stats.update(form_df)
+        print(f"index build, {len(names)} runners: {(time.perf_counter() - start) * 1000:.1f} ms")
+        start = time.perf_counter()
+        touched = stats.update(update_df)
+        print(f"incremental update, {touched} runners of one meeting: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+        number = 100000
+        per_runner = timeit.timeit(lambda: stats.runner(names[0]), number=number) / number
+        print(f"runner lookup: {per_runner * 1e6:.2f} us")
+        field = names[:8]
+        per_race = timeit.timeit(lambda: stats.race(field, 'Sale', 435), number=number // 10) / (number // 10)
+        print(f"race lookup, 8 runners: {per_race * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Load time and file size of the CSV outputs versus the typed Parquet datasets.
+
+"CSV" load time includes turning the text columns into usable numbers, dates and
+lists, since every downstream model has to do that on each load. Then times the
+typed form conversion alone on `--rows` parsed synthetic form rows, whose prices,
+times and placings vary like real ones rather than repeating the sample data, the
+costliest column conversions on their own, and the form parser's dd/mm/yyyy to ISO
+date conversion (`form_engine.iso_dates`) on dates it has not and has seen before.
+
+    python bench_typed_output.py --scale 100 --rows 100000
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+import pandas as pd
+
+from form_engine import form_frame, greyhound_form_columns, horse_form_columns, iso_dates
+from synthetic_forms import meeting
+from typed_columns import (
+    plc_features, read_dataset, to_date, to_int_list, to_number, to_placings, typed_form_frame, typed_race_frame,
+    write_typed_outputs,
+)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+OUTPUTS = {
+    'G': ('race_data.csv', 'full_form_data.csv'),
+    'T': ('Trace_data.csv', 'Tfull_form_data.csv'),
+}
+CONVERSIONS = [
+    ('Placing (to_placings)', 'Placing', to_placings),
+    ('In Run (to_int_list)', 'In Run', to_int_list),
+    ('Plc (plc_features)', 'Plc', plc_features),
+    ('Date (to_date)', 'Date', to_date),
+    ('Price (to_number)', 'Price', to_number),
+]
+
+
+def scaled_copy(src, dst, scale):
+    df = pd.read_csv(src, dtype=str, keep_default_na=False)
+    pd.concat([df] * scale, ignore_index=True).to_csv(dst, index=False)
+    return dst
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+
+def synthetic_form_rows(code, rows):
+    parse = greyhound_form_columns if code == 'G' else horse_form_columns
+    frames, total, seed = [], 0, 0
+    while total < rows:
+        _, form = meeting(code, f"Venue {seed}", runners=100, runs_per_runner=10, seed=seed, quirks=True)
+        with contextlib.redirect_stdout(io.StringIO()):
+            frames.append(form_frame(parse(form)))
+        total += len(frames[-1])
+        seed += 1
+    df = pd.concat(frames, ignore_index=True).iloc[:rows]
+    # As read back from the CSV
+    return df.astype('string').fillna('')
+
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scale", type=int, default=100, help="Repeat the rows in data/ this many times.")
+    parser.add_argument("--rows", type=int, default=100000, help="Synthetic form rows to convert.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work:
+        print(f"{'dataset':<10}{'rows':>9}{'csv MB':>9}{'parquet MB':>12}{'csv load s':>12}{'parquet load s':>16}")
+        for code, files in OUTPUTS.items():
+            race_csv, form_csv = (scaled_copy(os.path.join(DATA_DIR, f), os.path.join(work, f), args.scale) for f in files)
+            parquet_dir = os.path.join(work, 'parquet')
+            write_typed_outputs(race_csv, form_csv, parquet_dir, code, '2025-08-30')
+
+            for kind, csv_path, convert in [('race', race_csv, typed_race_frame), ('form', form_csv, typed_form_frame)]:
+                root = os.path.join(parquet_dir, kind)
+                csv_time = best_of(args.repeat, lambda: convert(
+                    pd.read_csv(csv_path, dtype=str, keep_default_na=False), code
+                ))
+                parquet_time = best_of(args.repeat, lambda: read_dataset(root, code))
+                rows = len(read_dataset(root, code))
+                print(
+                    f"{code + ' ' + kind:<10}{rows:>9}{os.path.getsize(csv_path) / 1e6:>9.2f}"
+                    f"{dir_size(os.path.join(root, f'code={code}')) / 1e6:>12.2f}"
+                    f"{csv_time:>12.3f}{parquet_time:>16.3f}"
+                )
+
+    print(f"\n{'typed form':<10}{'rows':>9}{'ms':>9}")
+    frames = {code: synthetic_form_rows(code, args.rows) for code in OUTPUTS}
+    for code, df in frames.items():
+        elapsed = best_of(args.repeat, lambda: typed_form_frame(df, code))
+        print(f"{code:<10}{len(df):>9}{elapsed * 1000:>9.1f}")
+
+    print(f"\n{'conversion':<22}" + ''.join(f"{code + ' ms':>9}" for code in frames))
+    for name, column, convert in CONVERSIONS:
+        timings = [best_of(args.repeat, lambda: convert(df[column])) for df in frames.values()]
+        print(f"{name:<22}" + ''.join(f"{elapsed * 1000:>9.1f}" for elapsed in timings))
+    # Three years of race days, each run on by many rows, as in a form history
+    days = [f"{day:%d/%m/%Y}" for day in pd.date_range('2023-01-01', periods=1000)]
+    dates = [days[i % len(days)] for i in range(args.rows)]
+    print(f"{'iso_dates (new text)':<22}{best_of(1, lambda: iso_dates(dates)) * 1000:>9.1f}")
+    print(f"{'iso_dates (seen)':<22}{best_of(args.repeat, lambda: iso_dates(dates)) * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
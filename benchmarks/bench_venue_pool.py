@@ -0,0 +1,90 @@
+"""
+Throughput of the single-driver venue loop versus the concurrent worker pool.
+
+Serves synthetic lobby and race pages locally and scrapes them with real Chrome
+sessions, so Chrome and ChromeDriver must be installed. `--tiles links` serves
+tiles that link to their race pages, so each venue is opened directly;
+`--tiles div` serves href-less tiles like the live lobby's, so each venue reloads
+the lobby and clicks its tile.
+
+    python bench_venue_pool.py --code G --venues 12 --workers 1 2 4 --tiles links div
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from selenium import webdriver
+
+from fixture_site import FixtureSite, lobby_url, serve
+from scraper_loader import load_scraper
+from venue_pool import scrape_in_parallel
+
+
+def run_sequential(scraper, url):
+    driver = webdriver.Chrome()
+    try:
+        locations = scraper.load_lobby(driver, url)
+        return scraper.scrape_races(driver, locations, url)
+    finally:
+        driver.quit()
+
+
+def run_pool(scraper, url, workers, min_interval):
+    driver = webdriver.Chrome()
+    try:
+        locations = scraper.load_lobby(driver, url)
+        race_urls = scraper.collect_race_urls(driver, locations)
+    finally:
+        driver.quit()
+    return scrape_in_parallel(
+        make_driver=webdriver.Chrome,
+        open_lobby=lambda d: scraper.load_lobby(d, url, report=False),
+        scrape_venue=lambda d, name: scraper.scrape_venue(d, name, url, race_urls.get(name)),
+        locations=locations,
+        workers=workers,
+        min_interval=min_interval,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--code", choices=["G", "T"], default="G")
+    parser.add_argument("--venues", type=int, default=12)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--min-interval", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.05, help="Server latency per request (s).")
+    parser.add_argument("--tiles", choices=["links", "div"], nargs="+", default=["links", "div"])
+    args = parser.parse_args()
+
+    scraper = load_scraper(args.code)
+
+    print(f"{'tiles':<7}{'mode':<12}{'seconds':>10}{'venues/min':>12}{'race rows':>11}{'form rows':>11}")
+    for tiles in args.tiles:
+        site = FixtureSite(args.code, venues=args.venues, tile_links=tiles == "links")
+        server, base_url = serve(site, latency=args.latency)
+        url = lobby_url(site, base_url)
+        try:
+            for workers in args.workers:
+                start = time.perf_counter()
+                if workers == 1:
+                    race_dfs, form_dfs = run_sequential(scraper, url)
+                    mode = "sequential"
+                else:
+                    race_dfs, form_dfs = run_pool(scraper, url, workers, args.min_interval)
+                    mode = f"pool x{workers}"
+                elapsed = time.perf_counter() - start
+                race_rows = sum(len(df) for df in race_dfs)
+                form_rows = sum(len(df) for df in form_dfs)
+                print(
+                    f"{tiles:<7}{mode:<12}{elapsed:>10.1f}{args.venues / elapsed * 60:>12.1f}"
+                    f"{race_rows:>11}{form_rows:>11}"
+                )
+        finally:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
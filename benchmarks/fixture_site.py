@@ -0,0 +1,191 @@
+"""
+A local stand-in for the Unibet racing lobby, served from synthetic fixture pages.
+
+The pages reuse the CSS classes the scrapers look for (`.css-1kd0cbg` lobby,
+`.sc-kVUOzj.knIZUY` venue tiles, `.css-10arllf` runner cards, the FULL FORM button
+and `.sc-jNwOwP.drZjiD` form blocks) and render their content after a short delay,
+like the real single-page app. With `prerender=True` the same content is served
+as static HTML, for the browserless HTTP engine. With `tile_links=False` the venue
+tiles are bare `div`s that navigate from an onclick handler, as on the live lobby,
+so no race URL can be read from them. `ReplaySite` serves responses
+recorded by the HTTP engine's `--record-dir`.
+"""
+import html
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import synthetic_forms
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body><div id="root"></div>
+<script>
+setTimeout(function () {{ document.getElementById('root').innerHTML = {body}; {after} }}, {delay});
+</script>
+</body></html>"""
+
+STATIC_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body><div id="root">{body}</div></body></html>"""
+
+SHOW_FORM = """
+document.getElementById('full-form').onclick = function () {
+  setTimeout(function () {
+    FORM.forEach(function (text) {
+      var block = document.createElement('div');
+      block.className = 'sc-jNwOwP drZjiD';
+      block.innerText = text;
+      document.getElementById('root').appendChild(block);
+    });
+  }, %d);
+};"""
+
+
+class FixtureSite:
+    """
+    Synthetic meetings for one racing code, rendered as lobby and race pages.
+    The first `finished` venues' tiles read "Resulted" and the next `abandoned` ones
+    "Abandoned" instead of their jump time. Tiles link to their race pages unless
+    `tile_links=False`.
+    """
+
+    def __init__(self, code='G', venues=10, runners=8, runs_per_runner=6, render_delay_ms=200, prerender=False,
+                 finished=0, abandoned=0, tile_links=True):
+        self.code = code
+        self.tile_links = tile_links
+        self.statuses = ["Resulted"] * finished + ["Abandoned"] * abandoned
+        self.render_delay_ms = render_delay_ms
+        self.prerender = prerender
+        self.venues = [f"{track} {n}" if n else track for n, track in self._venue_names(venues)]
+        self.meetings = [
+            synthetic_forms.meeting(code, venue, runners, runs_per_runner, jump=f"{19 + i // 6}:{(i * 9) % 60:02d}")
+            for i, venue in enumerate(self.venues)
+        ]
+
+    def _venue_names(self, count):
+        tracks = synthetic_forms.GREYHOUND_TRACKS if self.code == 'G' else synthetic_forms.HORSE_TRACKS
+        return [(i // len(tracks), tracks[i % len(tracks)]) for i in range(count)]
+
+    def lobby_path(self):
+        return "/racing"
+
+    def race_path(self, index):
+        return f"/race/{self.code}/{index}"
+
+    def tile_detail(self, index):
+        """The line under a venue's name on its tile: its status, or its next jump time."""
+        if index < len(self.statuses):
+            return self.statuses[index]
+        return self.meetings[index][0][0].split()[0]
+
+    def tile(self, index):
+        content = f'<h5>{html.escape(self.venues[index])}</h5><div>{html.escape(self.tile_detail(index))}</div>'
+        if self.tile_links:
+            return f'<a href="{self.race_path(index)}"><div class="sc-kVUOzj knIZUY">{content}</div></a>'
+        return f'<div class="sc-kVUOzj knIZUY" onclick="location.href=\'{self.race_path(index)}\'">{content}</div>'
+
+    def lobby_page(self):
+        tiles = "".join(self.tile(i) for i in range(len(self.venues)))
+        body = f'<div class="css-1kd0cbg"><div>Australia</div>{tiles}<div>New Zealand</div>' \
+               f'<div class="sc-kVUOzj knIZUY"><h5>Addington</h5></div></div>'
+        return self._page("Lobby", body)
+
+    def race_page(self, index):
+        card, form_entries = self.meetings[index]
+        body = "".join(self._block("css-10arllf", lines) for lines in self._split_card(card))
+        body += '<button id="full-form"><span>FULL FORM</span></button>'
+        if self.prerender:
+            body += "".join(self._block("sc-jNwOwP drZjiD", entry.split("\n")) for entry in form_entries)
+            return self._page(self.venues[index], body)
+        after = f"var FORM = {json.dumps(form_entries)};" + SHOW_FORM % self.render_delay_ms
+        return self._page(self.venues[index], body, after)
+
+    def _block(self, css_class, lines):
+        return f'<div class="{css_class}">' + "<br>".join(html.escape(line) for line in lines) + '</div>'
+
+    def _page(self, title, body, after=""):
+        if self.prerender:
+            return STATIC_PAGE.format(title=html.escape(title), body=body)
+        return PAGE.format(title=html.escape(title), body=json.dumps(body), after=after, delay=self.render_delay_ms)
+
+    def _split_card(self, card):
+        """Groups card lines into one block per runner card, as the live page does."""
+        blocks, current = [], []
+        header = 1 if self.code == 'G' else 4
+        blocks.append(card[:header])
+        for line in card[header:]:
+            if line.endswith(")") and current:
+                blocks.append(current)
+                current = []
+            current.append(line)
+        if current:
+            blocks.append(current)
+        return blocks
+
+    def render(self, path):
+        """Returns (content type, body) for `path`, or None if there is no such page."""
+        page = None
+        path = path.split('?')[0]
+        prefix = f"/race/{self.code}/"
+        if path == self.lobby_path():
+            page = self.lobby_page()
+        elif path.startswith(prefix) and path[len(prefix):].isdigit():
+            index = int(path[len(prefix):])
+            if index < len(self.meetings):
+                page = self.race_page(index)
+        return ("text/html; charset=utf-8", page.encode('utf-8')) if page is not None else None
+
+
+class ReplaySite:
+    """
+    Serves responses recorded by the HTTP engine, looked up by path in `record_dir`/index.json.
+    """
+
+    def __init__(self, record_dir):
+        self.record_dir = record_dir
+        with open(os.path.join(record_dir, 'index.json')) as f:
+            self.index = json.load(f)
+
+    def render(self, path):
+        entry = self.index.get(path)
+        if entry is None:
+            return None
+        with open(os.path.join(self.record_dir, entry['file']), 'rb') as f:
+            return entry['content_type'], f.read()
+
+
+def serve(site, latency=0.0, port=0):
+    """
+    Serves `site` on localhost in a background thread.
+    Every response is delayed by `latency` seconds. Returns (server, base_url).
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            time.sleep(latency)
+            page = site.render(self.path)
+            if page is None:
+                self.send_error(404)
+                return
+            content_type, payload = page
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def lobby_url(site, base_url):
+    return f"{base_url}{site.lobby_path()}#/lobby/{site.code}"
@@ -0,0 +1,443 @@
+"""
+Reference copies of the original line-walking parsers from the two scraper scripts.
+
+They are kept unchanged so the single-pass engine in `scripts/form_engine.py` can be
+checked for identical output and benchmarked against them. The lobby parser is the
+greyhound scraper's, from before `scripts/lobby.py` parsed the lobby into entries.
+"""
+import re
+from datetime import datetime
+
+import pandas as pd
+
+
+def is_number(s):
+    """Checks if a string is a number."""
+    try:
+        float(s)
+        return True
+    except ValueError:
+        return False
+
+
+def parse_greyhound_data(data_list):
+    """
+    Parses full form greyhound data into a DataFrame.
+    """
+    rows = []
+
+    for entry in data_list:
+        greyhound_name = entry.split('\n')[0].strip()
+        race_history_section = entry[entry.find('Race History'):]
+        lines = race_history_section.split('\n')
+        race_start_idx = lines.index('Plc') + 1 if 'Plc' in lines else len(lines)
+        i = race_start_idx
+
+        while i < len(lines):
+            line = lines[i].strip()
+            if not line or line in ['Back to top', 'Race History']:
+                i += 1
+                continue
+
+            line_upper = line.upper()
+            if 'SPELL' in line_upper or 'LET-UP' in line_upper:
+                i += 1
+                continue
+
+            if re.fullmatch(r'\d+/\d+', line):
+                race_data = {
+                    'Greyhound': greyhound_name,
+                    'Plc': line,
+                    'Date': '',
+                    'Track': '',
+                    'Days': '',
+                    'Distance': '',
+                    'Mgn': '',
+                    'Class': '',
+                    'Box': '',
+                    'In Run': '',
+                    'Wgt': 'N/A',
+                    'Price': '',
+                    'Sect': '',
+                    'Time': '',
+                    'Best': '',
+                    'Placing': ''
+                }
+
+                i += 1
+                # Date
+                if i < len(lines):
+                    try:
+                        race_data['Date'] = datetime.strptime(lines[i].strip(), '%d/%m/%Y').strftime('%Y-%m-%d')
+                    except ValueError:
+                        race_data['Date'] = lines[i].strip()
+                    i += 1
+
+                # Track and subsequent fields
+                if i < len(lines):
+                    parts = []
+                    while i < len(lines) and not lines[i].strip().startswith('$'):
+                        if lines[i].strip():
+                            parts.append(lines[i].strip())
+                        i += 1
+
+                    track_parts = []
+                    j = 0
+                    while j < len(parts) and not parts[j].replace('.', '').isdigit():
+                        track_parts.append(parts[j])
+                        j += 1
+                    race_data['Track'] = ' '.join(track_parts)
+
+                    values = parts[j:]
+                    if i < len(lines):
+                        race_data['Price'] = lines[i].strip()
+                        i += 1
+
+                    if len(values) == 6:
+                        race_data['Days'], race_data['Distance'], race_data['Mgn'], race_data['Class'], race_data['Box'], race_data['In Run'] = values
+                    elif len(values) == 5:
+                        race_data['Days'] = 'N/A'
+                        race_data['Distance'], race_data['Mgn'], race_data['Class'], race_data['Box'], race_data['In Run'] = values
+                    else:
+                        race_data['In Run'] = 'N/A'
+                        print(
+                            f"Warning: Invalid number of values ({len(values)}) "
+                            f"between Track and Price for {greyhound_name} on {race_data['Date']}"
+                        )
+
+                    if race_data['In Run'] and not (
+                        re.fullmatch(r'(\d+,)*\d*', race_data['In Run'])
+                        or race_data['In Run'] == 'N/A'
+                    ):
+                        print(
+                            f"Warning: Invalid In Run data '{race_data['In Run']}' "
+                            f"for {greyhound_name} on {race_data['Date']}"
+                        )
+                        race_data['In Run'] = 'N/A'
+
+                # Sect
+                if i < len(lines):
+                    race_data['Sect'] = lines[i].strip()
+                    i += 1
+
+                # Time
+                if i < len(lines):
+                    race_data['Time'] = lines[i].strip()
+                    i += 1
+
+                # Best
+                if i < len(lines):
+                    next_line = lines[i].strip()
+                    if next_line.replace('.', '').isdigit() or next_line in ['N/A', '0']:
+                        race_data['Best'] = next_line
+                        i += 1
+                    else:
+                        race_data['Best'] = 'N/A'
+
+                # Placing
+                placing_lines = []
+                while i < len(lines):
+                    l = lines[i].strip()
+                    if not l or re.fullmatch(r'\d+/\d+', l) or 'SPELL' in l.upper() or 'LET-UP' in l.upper():
+                        break
+                    if l[0].isdigit() and l[1] == '.':
+                        placing_lines.append(l)
+                    i += 1
+                race_data['Placing'] = '\n'.join(placing_lines) if placing_lines else 'N/A'
+
+                rows.append(race_data)
+            else:
+                i += 1
+
+    return pd.DataFrame(rows, columns=[
+        'Greyhound', 'Plc', 'Date', 'Track', 'Days', 'Distance', 'Mgn',
+        'Class', 'Box', 'In Run', 'Wgt', 'Price', 'Sect', 'Time', 'Best', 'Placing'
+    ])
+
+
+def parse_dog_data(data):
+    """
+    Parses race data into structured records.
+    """
+    records = []
+    i = 0
+    current_race = None
+
+    while i < len(data):
+        if re.match(r"\d{2}:\d{2}\s+", data[i]):
+            current_race = data[i].strip()
+            i += 1
+            continue
+
+        runner_match = re.match(r"^(.*?)\((\d+)\)$", data[i].strip())
+        if runner_match:
+            name_with_num = runner_match.group(1).strip()
+            dog_num = runner_match.group(2).strip()
+            potential_form = data[i + 3] if i + 3 < len(data) else None
+            form = potential_form.strip() if potential_form and re.match(r'^[\dX\-]+$', potential_form.strip()) else None
+
+            odds = []
+            j = i + 5
+            while (
+                j < len(data)
+                and not ("(" in data[j] and ")" in data[j])
+                and not re.match(r"\d{2}:\d{2}\s+", data[j])
+            ):
+                if is_number(data[j]):
+                    odds.append(data[j])
+                j += 1
+
+            win, place = (odds[-2], odds[-1]) if len(odds) >= 2 else (None, None)
+            records.append([current_race, dog_num, name_with_num, form, win, place])
+            i = j
+        else:
+            i += 1
+
+    return records
+
+
+def parse_horse_data(data):
+    records = []
+    i = 0
+    current_race, current_race_name, current_distance, current_track = None, None, None, None
+
+    while i < len(data):
+        # Detect race start (time + venue)
+        if re.match(r"\d{2}:\d{2}\s+", data[i]):
+            current_race = data[i].strip()
+            current_race_name = data[i + 1].strip() if i + 1 < len(data) else None
+            current_distance = data[i + 2].strip() if i + 2 < len(data) else None
+            current_track = data[i + 3].strip() if i + 3 < len(data) else None
+            i += 4
+            continue
+
+        # Detect runner line: "1. HorseName (3)"
+        runner_match = re.match(r"^(\d+)\.\s+(.*?)\s+\((\d+)\)$", data[i].strip())
+        if runner_match:
+            horse_num = runner_match.group(1)
+            horse_name = runner_match.group(2).strip()
+            barrier = runner_match.group(3).strip()
+
+            jockey, trainer, form, age_sex = None, None, None, None
+            odds, win, place = [], None, None
+
+            # Look ahead
+            j = i + 1
+            while j < len(data):
+                line = data[j].strip()
+
+                if line == 'J' and j + 1 < len(data):
+                    jockey = data[j + 1].strip()
+                    j += 2
+                    continue
+                if line == 'T' and j + 1 < len(data):
+                    trainer = data[j + 1].strip()
+                    j += 2
+                    continue
+                if re.match(r"^[\dX\-]+$", line):
+                    form = line
+                    j += 1
+                    continue
+                if re.match(r"^\d+yo\s+[A-Z]$", line):
+                    age_sex = line
+                    j += 1
+                    continue
+
+                # Scratched runner
+                if line == "Scratched":
+                    records.append([
+                        current_race, current_race_name, horse_num, horse_name, barrier,
+                        jockey, trainer, form, age_sex, None, None, "Scratched"
+                    ])
+                    j += 1
+                    break
+
+                # Odds
+                if is_number(line):
+                    odds.append(line)
+                    j += 1
+                    continue
+
+                # End of runner if new runner/race detected
+                if re.match(r"^\d+\.\s+", line) or re.match(r"\d{2}:\d{2}\s+", line):
+                    break
+
+                j += 1
+
+            if odds:
+                win, place = (odds[-2], odds[-1]) if len(odds) >= 2 else (odds[-1], None)
+
+            required_fields = [barrier, jockey, trainer, form, age_sex, win, place]
+            if all(field is not None for field in required_fields):
+                records.append([
+                    current_race, current_race_name, horse_num, horse_name, barrier,
+                    jockey, trainer, form, age_sex, win, place, "Active"
+                ])
+            i = j
+        else:
+            i += 1
+
+    return records
+
+
+def parse_horse_form(data_list):
+    rows = []
+
+    for entry in data_list:
+        if 'Race History' not in entry:
+            continue
+
+        parts = [p.strip() for p in entry.split('\n') if p.strip()]
+
+        # Horse name = first valid text before "Race History"
+        horse_name = None
+        for p in parts:
+            if p in ["T:", "Race History"]:
+                break
+            if not p.isdigit() and p != ",":
+                horse_name = p
+                break
+
+        if not horse_name:
+            continue
+
+        race_history_section = entry[entry.find('Race History'):]
+        lines = [l.strip() for l in race_history_section.split('\n') if l.strip()]
+        i = lines.index('Plc') + 1 if 'Plc' in lines else len(lines)
+
+        while i < len(lines):
+            line = lines[i]
+            if not re.fullmatch(r'\d+/\d+', line):
+                i += 1
+                continue
+
+            race_data = {
+                'Horse': horse_name,
+                'Plc': line,
+                'Date': 'N/A',
+                'Track': '',
+                'Days': 'N/A',
+                'Time': 'N/A',
+                'Distance': '',
+                'Mgn': '',
+                'Class': 'N/A',
+                'Cond': 'N/A',
+                'Bar': '',
+                'In Run': '',
+                'Jockey': '',
+                'Wgt': '',
+                'Price': '',
+                'Placing': ''
+            }
+
+            # Date
+            i += 1
+            if i < len(lines):
+                try:
+                    race_data['Date'] = datetime.strptime(lines[i], '%d/%m/%Y').strftime('%Y-%m-%d')
+                except ValueError:
+                    race_data['Date'] = lines[i]
+                i += 1
+
+            # Track + numeric values until Cond
+            parts = []
+            while i < len(lines) and lines[i] not in ['S', 'G', 'H'] and not lines[i].startswith('$'):
+                parts.append(lines[i])
+                i += 1
+
+            # Split track vs numeric section
+            j = 0
+            while j < len(parts) and not re.fullmatch(r"^\d+(\.\d+)?$", parts[j]):
+                j += 1
+            race_data['Track'] = " ".join(parts[:j])
+            values = parts[j:]
+
+            # Map values
+            if len(values) == 5:
+                race_data['Days'], race_data['Time'], race_data['Distance'], race_data['Mgn'], race_data['Class'] = values
+            elif len(values) == 4:
+                if re.fullmatch(r"^\d+(\.\d+)?$", values[-1]):
+                    race_data['Days'], race_data['Time'], race_data['Distance'], race_data['Mgn'] = values
+                else:
+                    race_data['Time'], race_data['Distance'], race_data['Mgn'], race_data['Class'] = values
+            elif len(values) == 3:
+                race_data['Time'], race_data['Distance'], race_data['Mgn'] = values
+
+            # Cond
+            if i < len(lines) and lines[i] in ['S', 'G', 'H']:
+                race_data['Cond'] = lines[i]
+                i += 1
+
+            # Bar
+            if i < len(lines) and re.fullmatch(r"\d+", lines[i]):
+                race_data['Bar'] = lines[i]
+                i += 1
+
+            # In Run
+            if i < len(lines) and (',' in lines[i] or re.fullmatch(r"(\d+,)*\d+", lines[i])):
+                race_data['In Run'] = lines[i]
+                i += 1
+
+            # Jockey
+            if i < len(lines):
+                race_data['Jockey'] = lines[i]
+                i += 1
+
+            # Wgt
+            if i < len(lines) and re.fullmatch(r"\d+(\.\d+)?", lines[i]):
+                race_data['Wgt'] = lines[i]
+                i += 1
+
+            # Price
+            if i < len(lines) and lines[i].startswith('$'):
+                race_data['Price'] = lines[i]
+                i += 1
+
+            # Placing
+            placing_lines = []
+            while i < len(lines):
+                l = lines[i]
+                if re.fullmatch(r'\d+/\d+', l) or l in ['Race History', 'Back to top']:
+                    break
+                if l[0].isdigit() and '.' in l:
+                    placing_lines.append(l)
+                i += 1
+
+            race_data['Placing'] = "\n".join(placing_lines) if placing_lines else 'N/A'
+            rows.append(race_data)
+
+    return pd.DataFrame(rows, columns=[
+        'Horse', 'Plc', 'Date', 'Track', 'Days', 'Time', 'Distance',
+        'Mgn', 'Class', 'Cond', 'Bar', 'In Run', 'Jockey', 'Wgt', 'Price', 'Placing'
+    ])
+
+
+def parse_australian_race_locations(data_list):
+    """
+    Extracts Australian race locations from the given data list.
+    """
+    data = data_list[0].strip().split('\n')
+    australian_locations = []
+    in_australia_section = False
+
+    for line in data:
+        line = line.strip()
+        if line.lower() == "australia":
+            in_australia_section = True
+            continue
+        elif line in [
+            "New Zealand", "France", "Germany", "Japan", "Korea", "Malaysia",
+            "South Africa", "Turkey", "UK & Ireland", "United States", "Canada"
+        ]:
+            in_australia_section = False
+            continue
+
+        if (
+            in_australia_section
+            and line
+            and not any(char.isdigit() for char in line[0])
+            and not line.startswith((':', '-', ','))
+        ):
+            australian_locations.append(line)
+
+    return australian_locations
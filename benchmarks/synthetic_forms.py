@@ -0,0 +1,197 @@
+"""
+Synthetic race-card and FULL FORM text shaped like what the scrapers read off Unibet.
+
+Runner lists come back as a flat list of lines (as built by `get_dog_form_elements` /
+`get_horse_form_elements`) and form blocks as one text entry per runner. With
+`quirks=True` meetings also carry what real cards throw at the parsers: scratched
+runners, SPELL / LET-UP lines between runs, runs with no Days value and odd In Run text.
+"""
+import random
+from datetime import date, timedelta
+
+GREYHOUND_TRACKS = [
+    "Sale", "Healesville", "Sandown Park", "The Meadows", "Ballarat", "Bendigo",
+    "Warragul", "Wentworth Park", "Angle Park", "Albion Park", "Shepparton",
+]
+GREYHOUND_CLASSES = ["M", "5", "4/5", "FFA", "NG", "RW", "MX"]
+HORSE_TRACKS = [
+    "Eagle Farm", "Doomben", "Sunshine Coast", "Gold Coast", "Randwick",
+    "Rosehill Gardens", "Flemington", "Caulfield", "Moonee Valley",
+]
+HORSE_CLASSES = ["3Y HCP", "MDN-SW", "BM64", "CL1", "OPEN", "2YO", "BM78"]
+FIRST_NAMES = ["Green", "Dundee", "Lakeview", "Amron", "Chorus", "Foreign", "Calypso", "Crypto", "Boom"]
+LAST_NAMES = ["Shoots", "Sterling", "Liam", "Lucy", "Line", "Press", "Rocket", "Miss", "Shanka"]
+PEOPLE = ["Ben E Thompson", "Angela Jones", "T J Gollan", "R G Lipp", "J Smith", "K Brown"]
+ODD_IN_RUN = ["", "-", "F", "1,,3", "DNF", "8,x"]
+
+# Chance of each quirk per runner / run when quirks are on
+SCRATCHED_RATE = 0.08
+SPELL_RATE = 0.1
+NO_DAYS_RATE = 0.05
+ODD_IN_RUN_RATE = 0.03
+
+
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rng.randint(1, 999)}"
+
+
+def _price(rng):
+    return f"{rng.uniform(1.2, 40.0):.2f}"
+
+
+def _placings(rng, field_size):
+    return [f"{n}. {_name(rng)}" for n in range(1, min(field_size, 4) + 1)]
+
+
+def greyhound_run(rng, run_date):
+    field = rng.randint(5, 8)
+    return {
+        'Plc': f"{rng.randint(1, field)}/{field}",
+        'Date': run_date.strftime('%d/%m/%Y'),
+        'Track': rng.choice(GREYHOUND_TRACKS),
+        'Days': str(rng.randint(3, 30)),
+        'Distance': str(rng.choice([300, 350, 435, 440, 520, 595])),
+        'Mgn': f"{rng.uniform(0, 12):.2f}",
+        'Class': rng.choice(GREYHOUND_CLASSES),
+        'Box': str(rng.randint(1, 8)),
+        'In Run': ",".join(str(rng.randint(1, field)) for _ in range(3)),
+        'Price': f"${_price(rng)}",
+        'Sect': f"{rng.uniform(4.5, 9.5):.2f}",
+        'Time': f"{rng.uniform(17.0, 34.0):.2f}",
+        'Best': f"{rng.uniform(17.0, 34.0):.2f}",
+        'Placing': _placings(rng, field),
+    }
+
+
+def horse_run(rng, run_date):
+    field = rng.randint(6, 16)
+    return {
+        'Plc': f"{rng.randint(1, field)}/{field}",
+        'Date': run_date.strftime('%d/%m/%Y'),
+        'Track': rng.choice(HORSE_TRACKS),
+        'Days': str(rng.randint(7, 60)),
+        'Time': f"{rng.uniform(56.0, 150.0):.1f}",
+        'Distance': str(rng.choice([1000, 1200, 1400, 1600, 2000])),
+        'Mgn': f"{rng.uniform(0, 10):.1f}",
+        'Class': rng.choice(HORSE_CLASSES),
+        'Cond': rng.choice(['S', 'G', 'H']),
+        'Bar': str(rng.randint(1, field)),
+        'In Run': ",".join(str(rng.randint(1, field)) for _ in range(3)),
+        'Jockey': rng.choice(PEOPLE),
+        'Wgt': f"{rng.choice([54, 54.5, 56, 57.5, 58, 59])}",
+        'Price': f"${_price(rng)}",
+        'Placing': _placings(rng, field),
+    }
+
+
+def add_quirks(rng, run):
+    """Randomly drops Days, mangles In Run or puts a spell before the run."""
+    if rng.random() < NO_DAYS_RATE:
+        run['Days'] = None
+    if rng.random() < ODD_IN_RUN_RATE:
+        run['In Run'] = rng.choice(ODD_IN_RUN)
+    if rng.random() < SPELL_RATE:
+        run['Spell'] = rng.choice([f"SPELL {rng.randint(40, 200)} DAYS", "LET-UP"])
+    return run
+
+
+def _present(*values):
+    return [value for value in values if value is not None]
+
+
+def greyhound_form_entry(name, runs):
+    """Renders one greyhound's FULL FORM block."""
+    lines = [name, "T: " + PEOPLE[len(name) % len(PEOPLE)], "Race History",
+             "Date", "Track", "Days", "Dist", "Mgn", "Class", "Box", "In Run",
+             "Wgt", "Price", "Sect", "Time", "Best", "Plc"]
+    for run in runs:
+        lines += _present(run.get('Spell'))
+        lines += _present(run['Plc'], run['Date'], run['Track'], run['Days'], run['Distance'],
+                          run['Mgn'], run['Class'], run['Box'], run['In Run'], run['Price'],
+                          run['Sect'], run['Time'], run['Best'])
+        lines += run['Placing']
+    lines.append("Back to top")
+    return "\n".join(lines)
+
+
+def horse_form_entry(name, runs):
+    """Renders one horse's FULL FORM block."""
+    lines = [name, "T: " + PEOPLE[len(name) % len(PEOPLE)], "Race History",
+             "Date", "Track", "Days", "Time", "Dist", "Mgn", "Class", "Cond",
+             "Bar", "In Run", "Jockey", "Wgt", "Price", "Plc"]
+    for run in runs:
+        lines += _present(run.get('Spell'))
+        lines += _present(run['Plc'], run['Date'], run['Track'], run['Days'], run['Time'],
+                          run['Distance'], run['Mgn'], run['Class'], run['Cond'], run['Bar'],
+                          run['In Run'], run['Jockey'], run['Wgt'], run['Price'])
+        lines += run['Placing']
+    lines.append("Back to top")
+    return "\n".join(lines)
+
+
+def greyhound_card_lines(race_label, runners):
+    """Renders a greyhound runner list as the flat list of lines the scraper collects."""
+    lines = [race_label]
+    for number, runner in enumerate(runners, start=1):
+        lines += [f"{runner['name']} ({number})", f"T: {runner['trainer']}", f"Box {number}"]
+        if runner.get('scratched'):
+            lines.append("Scratched")
+            continue
+        lines += [runner['form'], f"W: {runner['weight']}kg", runner['win'], runner['place']]
+    return lines
+
+
+def horse_card_lines(race_label, race_name, runners):
+    """Renders a thoroughbred runner list as the flat list of lines the scraper collects."""
+    lines = [race_label, race_name, "1200m", "Good 4"]
+    for number, runner in enumerate(runners, start=1):
+        lines += [f"{number}. {runner['name']} ({runner['barrier']})", "J",
+                  f"{runner['jockey']} {runner['weight']}kg", "T", runner['trainer'],
+                  runner['form'], runner['age_sex']]
+        lines += ["Scratched"] if runner.get('scratched') else [runner['win'], runner['place']]
+    return lines
+
+
+def _runner(rng, number):
+    return {
+        'name': _name(rng),
+        'trainer': rng.choice(PEOPLE),
+        'jockey': rng.choice(PEOPLE),
+        'barrier': str(rng.randint(1, 16)),
+        'weight': rng.choice(["30.1", "31.4", "54", "58"]),
+        'form': "".join(rng.choice("123456789X") for _ in range(rng.randint(2, 8))),
+        'age_sex': f"{rng.randint(2, 7)}yo {rng.choice('FGCM')}",
+        'win': _price(rng),
+        'place': _price(rng),
+    }
+
+
+def meeting(code, venue, runners=8, runs_per_runner=6, seed=0, jump="20:20", quirks=False):
+    """
+    Builds one synthetic meeting for racing code 'G' or 'T'.
+    Returns (card_lines, form_entries).
+    """
+    rng = random.Random(f"{code}-{venue}-{seed}")
+    field = [_runner(rng, n) for n in range(1, runners + 1)]
+    if quirks:
+        for runner in field:
+            runner['scratched'] = rng.random() < SCRATCHED_RATE
+    make_run = greyhound_run if code == 'G' else horse_run
+    render_form = greyhound_form_entry if code == 'G' else horse_form_entry
+
+    form_entries = []
+    for runner in field:
+        run_date = date(2025, 8, 30)
+        runs = []
+        for _ in range(runs_per_runner):
+            run_date -= timedelta(days=rng.randint(3, 30))
+            run = make_run(rng, run_date)
+            runs.append(add_quirks(rng, run) if quirks else run)
+        form_entries.append(render_form(runner['name'], runs))
+
+    race_label = f"{jump}  {venue}"
+    if code == 'G':
+        card = greyhound_card_lines(race_label, field)
+    else:
+        card = horse_card_lines(race_label, f"{venue} Mdn Plate", field)
+    return card, form_entries
@@ -0,0 +1,322 @@
+"""
+Long-lived browser daemon that keeps warm Chrome sessions for the scrapers.
+
+Starting Chrome and loading the lobby from cold dominates short, frequent runs. The
+daemon keeps one Chrome session per racing code, each with a persistent profile (so
+its HTTP cache and cookies survive between runs), and runs scraper jobs on them. The
+scrapers submit a job over a local socket with `--daemon` and print the output the
+daemon sends back:
+
+    python browser_daemon.py serve &
+    python greyhound-web-scraper.py --daemon
+    python browser_daemon.py status
+    python browser_daemon.py stop
+
+Jobs run one at a time, in the submitting scraper's working directory. A session is
+health-checked before every job and every `--health-interval` seconds while idle,
+and is replaced by a fresh browser when the check fails.
+"""
+import argparse
+import io
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+import traceback
+from contextlib import contextmanager, redirect_stderr, redirect_stdout
+from multiprocessing.connection import AuthenticationError, Client, Listener
+
+from selenium.common.exceptions import WebDriverException
+
+from lean_browser import NAVIGATIONS, start_chrome
+from readiness import RECORDER
+from run_metrics import METRICS
+from scraper_loader import SCRAPER_FILES, load_scraper
+
+DEFAULT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'racing-browser-daemon')
+
+
+class DaemonUnavailable(Exception):
+    pass
+
+
+def daemon_address(daemon_dir=DEFAULT_DIR):
+    if os.name == 'nt':
+        return r'\\.\pipe\racing-browser-daemon'
+    return os.path.join(os.path.abspath(daemon_dir), 'daemon.sock')
+
+
+def read_authkey(daemon_dir=DEFAULT_DIR, create=False):
+    """The shared secret clients authenticate with, readable by the daemon's user only."""
+    path = os.path.join(daemon_dir, 'authkey')
+    if create and not os.path.exists(path):
+        os.makedirs(daemon_dir, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(secrets.token_bytes(32))
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@contextmanager
+def lent(driver):
+    """
+    Lends a session's driver to a job. The job's `driver.quit()` only records its
+    last navigation and leaves the browser running.
+    """
+    quit = driver.quit
+    meter = getattr(driver, 'navigation_meter', None)
+    driver.quit = meter.flush if meter is not None else (lambda: None)
+    try:
+        yield driver
+    finally:
+        driver.quit = quit
+
+
+class BrowserSession:
+    """
+    One warm Chrome for a racing code, with its own persistent profile directory.
+    """
+
+    def __init__(self, code, profile_dir, lean=True):
+        self.code = code
+        self.profile_dir = profile_dir
+        self.lean = lean
+        self.lock = threading.Lock()
+        self.driver = None
+        self.started_at = None
+        self.jobs = 0
+        self.recycled = 0
+
+    def start(self):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        self.driver = start_chrome(lean=self.lean, user_data_dir=self.profile_dir)
+        self.started_at = time.time()
+        # Loading the lobby once fills the cache with its scripts and styles
+        self.driver.get(load_scraper(self.code).LOBBY_URL)
+
+    def healthy(self):
+        if self.driver is None:
+            return False
+        try:
+            return bool(self.driver.window_handles) and self.driver.execute_script("return document.readyState")
+        except WebDriverException:
+            return False
+
+    def close(self):
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except WebDriverException:
+                pass
+            self.driver = None
+
+    def recycle(self, reason):
+        print(f"Recycling the {self.code} browser: {reason}")
+        self.close()
+        self.recycled += 1
+        self.start()
+
+    def ensure(self):
+        """Starts the browser, or replaces it when it fails the health check."""
+        if self.driver is None:
+            self.start()
+        elif not self.healthy():
+            self.recycle("health check failed")
+
+    def status(self):
+        return {
+            'running': self.driver is not None,
+            'uptime_s': round(time.time() - self.started_at) if self.driver is not None else 0,
+            'jobs': self.jobs,
+            'recycled': self.recycled,
+        }
+
+
+class BrowserDaemon:
+    """
+    Serves scraper jobs on warm browser sessions over a local socket.
+    Requests are dicts: {'op': 'run', 'code', 'argv', 'cwd'}, {'op': 'status'} or {'op': 'stop'}.
+    """
+
+    def __init__(self, daemon_dir=DEFAULT_DIR, lean=True, health_interval=60.0):
+        self.daemon_dir = os.path.abspath(daemon_dir)
+        self.health_interval = health_interval
+        self.sessions = {
+            code: BrowserSession(code, os.path.join(self.daemon_dir, 'profiles', code), lean)
+            for code in SCRAPER_FILES
+        }
+        self.jobs_lock = threading.Lock()
+        self.stopping = threading.Event()
+
+    def run_job(self, code, argv, cwd=None):
+        """
+        Runs the scraper for `code` with `argv` on its warm session.
+        Returns {'ok', 'error', 'output', 'seconds', 'metrics'}.
+        """
+        session = self.sessions[code]
+        output = io.StringIO()
+        start = time.perf_counter()
+        error = None
+        with self.jobs_lock, session.lock:
+            previous_cwd = os.getcwd()
+            try:
+                for collector in (METRICS, RECORDER, NAVIGATIONS):
+                    collector.reset()
+                session.ensure()
+                if cwd:
+                    os.chdir(cwd)
+                with redirect_stdout(output), redirect_stderr(output), lent(session.driver) as driver:
+                    load_scraper(code).main(argv, driver=driver)
+            except SystemExit as e:
+                if e.code not in (0, None):
+                    error = f"exited with {e.code}"
+            except Exception:
+                error = traceback.format_exc()
+            finally:
+                os.chdir(previous_cwd)
+            session.jobs += 1
+            if error is not None and session.driver is not None and not session.healthy():
+                try:
+                    session.recycle("the job left it unresponsive")
+                except WebDriverException as e:
+                    print(f"Could not restart the {code} browser: {e.__class__.__name__}")
+        return {
+            'ok': error is None,
+            'error': error,
+            'output': output.getvalue(),
+            'seconds': round(time.perf_counter() - start, 3),
+            'metrics': METRICS.summary(),
+        }
+
+    def status(self):
+        return {code: session.status() for code, session in self.sessions.items()}
+
+    def _health_loop(self):
+        # Idle sessions only; a session busy with a job is checked before its next one
+        while not self.stopping.wait(self.health_interval):
+            for session in self.sessions.values():
+                if session.driver is None or not session.lock.acquire(blocking=False):
+                    continue
+                try:
+                    if not session.healthy():
+                        session.recycle("health check failed")
+                except WebDriverException as e:
+                    print(f"Could not restart the {session.code} browser: {e.__class__.__name__}")
+                finally:
+                    session.lock.release()
+
+    def serve(self):
+        address = daemon_address(self.daemon_dir)
+        authkey = read_authkey(self.daemon_dir, create=True)
+        if os.name != 'nt' and os.path.exists(address):
+            if is_running(self.daemon_dir):
+                print(f"A browser daemon is already listening on {address}")
+                return
+            os.unlink(address)
+
+        for session in self.sessions.values():
+            try:
+                session.start()
+            except WebDriverException as e:
+                print(f"Could not start the {session.code} browser, will retry on its first job: {e.msg}")
+        threading.Thread(target=self._health_loop, daemon=True).start()
+
+        with Listener(address, authkey=authkey) as listener:
+            print(f"Browser daemon listening on {address}")
+            while not self.stopping.is_set():
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, OSError) as e:
+                    print(f"Rejected a connection: {e}")
+                    continue
+                # Stop requests are handled here, after any running job has finished
+                message = conn.recv() if conn.poll(5) else {}
+                if message.get('op') == 'stop':
+                    with self.jobs_lock:
+                        self.stopping.set()
+                    conn.send({'ok': True})
+                    conn.close()
+                    continue
+                threading.Thread(target=self._reply, args=(conn, message), daemon=True).start()
+
+        for session in self.sessions.values():
+            session.close()
+        print("Browser daemon stopped")
+
+    def _reply(self, conn, message):
+        with conn:
+            try:
+                if message.get('op') == 'run':
+                    conn.send(self.run_job(message['code'], message.get('argv', []), message.get('cwd')))
+                elif message.get('op') == 'status':
+                    conn.send(self.status())
+                else:
+                    conn.send({'ok': False, 'error': f"unknown request {message.get('op')!r}"})
+            except (EOFError, OSError) as e:
+                print(f"Client went away: {e.__class__.__name__}")
+
+
+def request(message, daemon_dir=DEFAULT_DIR):
+    """Sends one request to the daemon and returns its reply. Raises DaemonUnavailable."""
+    try:
+        with Client(daemon_address(daemon_dir), authkey=read_authkey(daemon_dir)) as conn:
+            conn.send(message)
+            return conn.recv()
+    except (OSError, EOFError, AuthenticationError) as e:
+        raise DaemonUnavailable(f"{e.__class__.__name__}: {e}") from e
+
+
+def is_running(daemon_dir=DEFAULT_DIR):
+    try:
+        request({'op': 'status'}, daemon_dir)
+        return True
+    except DaemonUnavailable:
+        return False
+
+
+def submit(code, argv, daemon_dir=DEFAULT_DIR):
+    """
+    Runs a scraper job on the daemon's warm browser and prints its output here.
+    Returns the daemon's reply. Raises DaemonUnavailable when no daemon is listening.
+    """
+    reply = request({'op': 'run', 'code': code, 'argv': list(argv), 'cwd': os.getcwd()}, daemon_dir)
+    sys.stdout.write(reply['output'])
+    if reply['error']:
+        print(reply['error'], file=sys.stderr)
+    print(f"Job ran on the browser daemon in {reply['seconds']:.1f}s")
+    return reply
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Keep warm Chrome sessions for the scrapers.")
+    parser.add_argument("command", choices=["serve", "status", "stop"])
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="Where the socket, auth key and browser profiles live.")
+    parser.add_argument(
+        "--full-browser", action="store_true",
+        help="Run Chrome with its default profile instead of the lean one."
+    )
+    parser.add_argument(
+        "--health-interval", type=float, default=60.0,
+        help="Seconds between health checks of idle sessions."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "serve":
+        BrowserDaemon(args.dir, lean=not args.full_browser, health_interval=args.health_interval).serve()
+        return
+    try:
+        reply = request({'op': args.command}, args.dir)
+    except DaemonUnavailable as e:
+        print(f"No browser daemon at {daemon_address(args.dir)} ({e})")
+        sys.exit(1)
+    print(json.dumps(reply, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Memory watchdog for long single-browser runs, with automatic session recycling.
+
+Chrome's memory grows over a long run: every navigation back to the lobby and the
+single-page app's state add to it, until pages slow down or the driver crashes.
+Between venues, `BrowserWatchdog.check` samples the resident memory (RSS) of
+ChromeDriver and every Chrome process under it. When the total exceeds `max_rss_mb`,
+or the session has scraped `max_venues` venues, the session is quit and a fresh one
+started; the run carries on at the next venue, and rows already written are kept.
+A session whose browser has died is replaced the same way, and the venue it failed
+at is retried once on the new one.
+
+Every sample and recycle is kept and written to `browser_memory.json`, so the memory
+curve of a run can be plotted. Sampling memory needs the `psutil` package; recycling
+by venue count works without it.
+"""
+import json
+import threading
+import time
+
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+
+from run_metrics import METRICS
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def driver_pid(driver):
+    """The process id of the driver's ChromeDriver, or None."""
+    service = getattr(driver, 'service', None)
+    process = getattr(service, 'process', None)
+    return getattr(process, 'pid', None)
+
+
+def process_tree_rss(pid):
+    """
+    Resident memory in bytes of process `pid` and all its descendants, or None when
+    the process has exited.
+    """
+    try:
+        root = psutil.Process(pid)
+        if root.status() == psutil.STATUS_ZOMBIE:
+            return None
+        processes = [root] + root.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return None
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            pass
+    return total
+
+
+class BrowserWatchdog:
+    """
+    Owns the driver of a sequential run. `check(venue)` is called after each venue and
+    returns the driver to use for the next one, recycled by `make_driver()` when needed.
+    A limit of 0 (or None) is off.
+    """
+
+    def __init__(self, driver, make_driver, max_rss_mb=0, max_venues=0, clock=time.time):
+        if max_rss_mb and psutil is None:
+            raise ImportError("The browser memory watchdog needs the psutil package: pip install psutil")
+        self.driver = driver
+        self.make_driver = make_driver
+        self.max_rss_mb = max_rss_mb
+        self.max_venues = max_venues
+        self.clock = clock
+        self.started = clock()
+        self.session = 0
+        self.session_venues = 0
+        self.samples = []
+        self.recycles = []
+        self._lock = threading.Lock()
+
+    def rss_mb(self):
+        """Current RSS of ChromeDriver and its browsers in MB, or None when unknown or gone."""
+        pid = driver_pid(self.driver)
+        if psutil is None or pid is None:
+            return None
+        rss = process_tree_rss(pid)
+        return None if rss is None else round(rss / 2 ** 20, 1)
+
+    def session_died(self, error):
+        """
+        Whether `error` came from a dead session (the browser exited or the session is
+        gone) rather than from a slow or broken page, which a fresh browser would not fix.
+        """
+        if isinstance(error, InvalidSessionIdException):
+            return True
+        return psutil is not None and driver_pid(self.driver) is not None and self.rss_mb() is None
+
+    def sample(self, venue=None):
+        rss = self.rss_mb()
+        with self._lock:
+            self.samples.append({
+                't': round(self.clock() - self.started, 3), 'session': self.session,
+                'venues': self.session_venues, 'venue': venue, 'rss_mb': rss,
+            })
+        return rss
+
+    def recycle(self, reason, venue=None, rss=None):
+        """Quits the current session and starts a fresh one."""
+        print(f"Recycling the browser after {self.session_venues} venues: {reason}")
+        with self._lock:
+            self.recycles.append({
+                't': round(self.clock() - self.started, 3), 'session': self.session,
+                'venues': self.session_venues, 'venue': venue, 'rss_mb': rss, 'reason': reason,
+            })
+        METRICS.count("browser_recycles")
+        try:
+            self.driver.quit()
+        except WebDriverException:
+            pass
+        self.driver = self.make_driver()
+        self.session += 1
+        self.session_venues = 0
+        return self.driver
+
+    def check(self, venue=None):
+        """Samples the session after `venue` and recycles it when a limit is exceeded or it died."""
+        self.session_venues += 1
+        rss = self.sample(venue)
+        if psutil is not None and driver_pid(self.driver) is not None and rss is None:
+            return self.recycle("the browser process is gone", venue)
+        if self.max_rss_mb and rss is not None and rss > self.max_rss_mb:
+            return self.recycle(f"{rss:.0f} MB over the {self.max_rss_mb:.0f} MB limit", venue, rss)
+        if self.max_venues and self.session_venues >= self.max_venues:
+            return self.recycle(f"{self.session_venues} venues per session", venue, rss)
+        return self.driver
+
+    def quit(self):
+        self.driver.quit()
+
+    def summary(self):
+        with self._lock:
+            rss = [sample['rss_mb'] for sample in self.samples if sample['rss_mb'] is not None]
+            return {
+                'sessions': self.session + 1,
+                'recycles': len(self.recycles),
+                'venues': len(self.samples),
+                'peak_rss_mb': max(rss) if rss else None,
+            }
+
+    def print_summary(self):
+        summary = self.summary()
+        peak = f", peak {summary['peak_rss_mb']:.0f} MB" if summary['peak_rss_mb'] is not None else ""
+        print(f"Browser watchdog: {summary['venues']} venues in {summary['sessions']} sessions{peak}")
+
+    def write_json(self, path):
+        with self._lock:
+            report = {'samples': list(self.samples), 'recycles': list(self.recycles)}
+        with open(path, 'w') as f:
+            json.dump({'summary': self.summary(), **report}, f, indent=2)
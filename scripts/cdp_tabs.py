@@ -0,0 +1,370 @@
+"""
+Multi-tab engine: many tabs of one Chrome, driven over the DevTools protocol.
+
+Every Chrome process costs hundreds of MB, so instead of a browser per worker this
+engine opens up to `tabs` tabs in a single browser and drives them concurrently from
+one asyncio loop over Chrome's DevTools websocket. Each tab takes one venue at a
+time: it opens the race page, waits for the runner list, opens FULL FORM and reads
+the form blocks. The text goes through the scraper's own `parse_venue`, exactly as
+with the other engines. Selenium only starts Chrome and hands over its debugger
+address:
+
+    driver = start_chrome()
+    scrape_races_cdp(debugger_address(driver), lobby_url, parse_locations, parse_venue, sink, tabs=6)
+
+Needs the `websockets` package.
+"""
+import asyncio
+import itertools
+import json
+import urllib.request
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+from http_engine import CARD_SELECTOR, FORM_SELECTOR, LOBBY_SELECTOR, TILE_SELECTOR
+from lobby import RACE_LINKS_SCRIPT, match_race_urls
+from run_metrics import METRICS
+
+# Each script is a function expression, called with JSON arguments. The waits poll
+# inside the page and resolve to null when `timeoutMs` passes.
+WAIT_FOR_TEXT_SCRIPT = """
+async function (selector, timeoutMs) {
+  var deadline = Date.now() + timeoutMs;
+  while (Date.now() < deadline) {
+    var el = document.querySelector(selector);
+    var text = el ? (el.innerText || '').trim() : '';
+    if (text) { return text; }
+    await new Promise(function (resolve) { setTimeout(resolve, 100); });
+  }
+  return null;
+}
+"""
+
+# Marks the current race's runner cards and form blocks before the tab moves on. A
+# hash-route navigation keeps the document, so the next reads wait for them to go.
+MARK_STALE_SCRIPT = """
+function (selectors) {
+  selectors.forEach(function (selector) {
+    document.querySelectorAll(selector).forEach(function (el) { el.setAttribute('data-cdp-stale', ''); });
+  });
+}
+"""
+
+# Same rule as runner_lines(): the card texts once they add up to `minLines` lines,
+# read only after the previous race's cards are gone (like the staleness wait of open_race)
+RUNNER_LIST_SCRIPT = """
+async function (selector, minLines, timeoutMs) {
+  var deadline = Date.now() + timeoutMs;
+  while (Date.now() < deadline) {
+    if (document.querySelector(selector + '[data-cdp-stale]')) {
+      await new Promise(function (resolve) { setTimeout(resolve, 100); });
+      continue;
+    }
+    var texts = Array.from(document.querySelectorAll(selector))
+      .map(function (el) { return (el.innerText || '').trim(); })
+      .filter(function (text) { return text; });
+    if (texts.join('\\n').split('\\n').length >= minLines) { return texts; }
+    await new Promise(function (resolve) { setTimeout(resolve, 100); });
+  }
+  return null;
+}
+"""
+
+# Clicks FULL FORM, then waits like wait_for_dom_quiet() for the form blocks to settle.
+# Form blocks of the previous race (still marked stale) are not read.
+FULL_FORM_SCRIPT = """
+async function (selector, timeoutMs, quietMs) {
+  var deadline = Date.now() + timeoutMs;
+  selector += ':not([data-cdp-stale])';
+  function sleep(ms) { return new Promise(function (resolve) { setTimeout(resolve, ms); }); }
+  var button = null;
+  while (!button && Date.now() < deadline) {
+    button = Array.from(document.querySelectorAll('button')).find(function (b) {
+      return Array.from(b.children).some(function (child) {
+        return child.tagName === 'SPAN' && child.textContent.trim() === 'FULL FORM';
+      });
+    });
+    if (!button) { await sleep(100); }
+  }
+  if (!button) { return null; }
+  var lastMutation = Date.now();
+  var observer = new MutationObserver(function () { lastMutation = Date.now(); });
+  observer.observe(document, {childList: true, subtree: true, characterData: true});
+  button.click();
+  while (Date.now() < deadline) {
+    if (document.querySelectorAll(selector).length && Date.now() - lastMutation >= quietMs) {
+      observer.disconnect();
+      return Array.from(document.querySelectorAll(selector))
+        .map(function (el) { return (el.innerText || '').trim(); })
+        .filter(function (text) { return text; });
+    }
+    await sleep(50);
+  }
+  observer.disconnect();
+  return null;
+}
+"""
+
+# lobby.RACE_LINKS_SCRIPT is written for execute_script; this wraps it as a function
+RACE_LINKS_FUNCTION = f"function () {{ {RACE_LINKS_SCRIPT} }}"
+
+
+class CdpError(Exception):
+    pass
+
+
+def debugger_address(driver):
+    """The host:port of the DevTools endpoint of a Selenium-started Chrome."""
+    return driver.capabilities['goog:chromeOptions']['debuggerAddress']
+
+
+def browser_websocket_url(address):
+    with urllib.request.urlopen(f"http://{address}/json/version", timeout=10) as response:
+        return json.load(response)['webSocketDebuggerUrl']
+
+
+class CdpConnection:
+    """
+    One browser-level DevTools websocket. Commands for different tabs share it and are
+    told apart by their session id, so any number of tabs cost a single connection.
+    """
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._waiters = {}
+        self._reader = asyncio.ensure_future(self._read())
+
+    @classmethod
+    async def connect(cls, address):
+        if websockets is None:
+            raise ImportError("The cdp engine needs the websockets package: pip install websockets")
+        url = await asyncio.get_running_loop().run_in_executor(None, browser_websocket_url, address)
+        return cls(await websockets.connect(url, max_size=None))
+
+    async def _read(self):
+        try:
+            async for raw in self.websocket:
+                message = json.loads(raw)
+                if 'id' in message:
+                    future = self._pending.pop(message['id'], None)
+                    if future is not None and not future.done():
+                        if 'error' in message:
+                            future.set_exception(CdpError(message['error'].get('message', str(message['error']))))
+                        else:
+                            future.set_result(message.get('result', {}))
+                    continue
+                key = (message.get('sessionId'), message.get('method'))
+                for future in self._waiters.pop(key, []):
+                    if not future.done():
+                        future.set_result(message.get('params', {}))
+        finally:
+            for future in list(self._pending.values()):
+                if not future.done():
+                    future.set_exception(CdpError("DevTools connection closed"))
+
+    async def send(self, method, params=None, session_id=None):
+        message_id = next(self._ids)
+        message = {'id': message_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        await self.websocket.send(json.dumps(message))
+        return await future
+
+    def event(self, method, session_id=None):
+        """A future for the next `method` event of a session; create it before triggering the event."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault((session_id, method), []).append(future)
+        return future
+
+    def forget(self, future, method, session_id=None):
+        """Cancels a future from `event` that is no longer awaited."""
+        future.cancel()
+        waiters = self._waiters.get((session_id, method), [])
+        if future in waiters:
+            waiters.remove(future)
+        if not waiters:
+            self._waiters.pop((session_id, method), None)
+
+    async def close(self):
+        await self.websocket.close()
+        self._reader.cancel()
+
+
+class CdpTab:
+    """
+    A tab of the browser, attached over the shared connection.
+    """
+
+    def __init__(self, connection, target_id, session_id):
+        self.connection = connection
+        self.target_id = target_id
+        self.session_id = session_id
+
+    @classmethod
+    async def open(cls, connection, blocked_urls=()):
+        """
+        Opens a blank tab. DevTools applies URL blocking per tab, so the lean profile's
+        `blocked_urls` (lean_browser.BLOCKED_URL_PATTERNS) are blocked in each one.
+        """
+        target = await connection.send('Target.createTarget', {'url': 'about:blank'})
+        attached = await connection.send('Target.attachToTarget', {'targetId': target['targetId'], 'flatten': True})
+        tab = cls(connection, target['targetId'], attached['sessionId'])
+        await tab.send('Page.enable')
+        if blocked_urls:
+            await tab.send('Network.enable')
+            await tab.send('Network.setBlockedURLs', {'urls': list(blocked_urls)})
+        return tab
+
+    async def send(self, method, params=None):
+        return await self.connection.send(method, params, self.session_id)
+
+    async def navigate(self, url, timeout=45):
+        """
+        Opens `url` and waits for its load event, or, for a hash route of the page
+        already open (the lobby and race pages of the single-page app), for the
+        same-document navigation, which fires no load event.
+        """
+        loaded = self.connection.event('Page.loadEventFired', self.session_id)
+        within = self.connection.event('Page.navigatedWithinDocument', self.session_id)
+        try:
+            result = await self.send('Page.navigate', {'url': url})
+            if result.get('errorText'):
+                raise CdpError(f"Could not open {url}: {result['errorText']}")
+            # Page.navigate returns no loaderId for a same-document navigation
+            waits = {loaded, within} if result.get('loaderId') else {within}
+            done, _ = await asyncio.wait(waits, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError(f"{url} did not load within {timeout} seconds")
+        finally:
+            self.connection.forget(loaded, 'Page.loadEventFired', self.session_id)
+            self.connection.forget(within, 'Page.navigatedWithinDocument', self.session_id)
+
+    async def call(self, function, *args):
+        """Calls a function expression in the page with JSON arguments and returns its (awaited) value."""
+        expression = f"({function})({', '.join(json.dumps(arg) for arg in args)})"
+        result = await self.send('Runtime.evaluate', {
+            'expression': expression, 'awaitPromise': True, 'returnByValue': True,
+        })
+        if 'exceptionDetails' in result:
+            details = result['exceptionDetails']
+            raise CdpError(details.get('exception', {}).get('description') or details.get('text'))
+        return result['result'].get('value')
+
+    async def close(self):
+        await self.connection.send('Target.closeTarget', {'targetId': self.target_id})
+
+
+async def read_lobby(tab, lobby_url, parse_locations, timeout=60, attempts=3):
+    """Opens the lobby and returns (locations, {location: race url})."""
+    for _ in range(attempts):
+        with METRICS.stage("lobby"):
+            await tab.navigate(lobby_url, timeout)
+            text = await tab.call(WAIT_FOR_TEXT_SCRIPT, LOBBY_SELECTOR, timeout * 1000)
+            locations = parse_locations(text) if text else []
+            if locations:
+                tiles = await tab.call(RACE_LINKS_FUNCTION, TILE_SELECTOR) or []
+                return locations, match_race_urls(tiles, locations)
+        await asyncio.sleep(2)
+    raise TimeoutError(f"No Australian locations in the lobby after {attempts} attempts")
+
+
+async def scrape_venue_tab(tab, race_url, need_form=None, race_name=None, timeout=45, min_lines=10):
+    """
+    Reads one venue's runner list and FULL FORM in `tab`. `need_form(race_name, race_data)`
+    may return False to skip FULL FORM. Returns (race_data, form_data) as lists of lines and blocks.
+    """
+    with METRICS.stage("open_race"):
+        await tab.call(MARK_STALE_SCRIPT, [CARD_SELECTOR, FORM_SELECTOR])
+        await tab.navigate(race_url, timeout)
+    with METRICS.stage("runner_list"):
+        cards = await tab.call(RUNNER_LIST_SCRIPT, CARD_SELECTOR, min_lines, timeout * 1000)
+    if cards is None:
+        raise TimeoutError(f"Runner list did not reach {min_lines} lines within {timeout} seconds")
+    race_data = '\n'.join(cards).split('\n')
+    if need_form is not None and not need_form(race_name, race_data):
+        return race_data, []
+    with METRICS.stage("full_form"):
+        form_data = await tab.call(FULL_FORM_SCRIPT, FORM_SELECTOR, timeout * 1000, 250)
+    if form_data is None:
+        raise TimeoutError(f"FULL FORM did not settle within {timeout} seconds")
+    return race_data, form_data
+
+
+async def _scrape(address, lobby_url, parse_locations, parse_venue, sink, tabs, need_form, timeout, blocked_urls):
+    connection = await CdpConnection.connect(address)
+    open_tabs = []
+    try:
+        lobby_tab = await CdpTab.open(connection, blocked_urls)
+        open_tabs.append(lobby_tab)
+        locations, race_urls = await read_lobby(lobby_tab, lobby_url, parse_locations)
+        completed = sink.completed() if sink is not None else set()
+
+        queue = asyncio.Queue()
+        for race_name in locations:
+            if race_name in completed:
+                continue
+            if race_name not in race_urls:
+                print(f"Skipping {race_name}, no race link in the lobby.")
+                continue
+            queue.put_nowait(race_name)
+
+        results = {}
+
+        async def worker(tab):
+            while not queue.empty():
+                race_name = queue.get_nowait()
+                with METRICS.venue(race_name):
+                    try:
+                        race_data, form_data = await scrape_venue_tab(
+                            tab, race_urls[race_name], need_form, race_name, timeout
+                        )
+                    except (TimeoutError, CdpError) as e:
+                        print(f"Skipping {race_name}: {e}")
+                        continue
+                    race_df, form_df = parse_venue(race_name, race_data, form_data)
+                if sink is not None:
+                    sink.write_venue(race_name, race_df, form_df)
+                else:
+                    results[race_name] = (race_df, form_df)
+
+        # The lobby tab takes venues too, so `tabs` is the number of pages open at once
+        workers = [lobby_tab]
+        for _ in range(min(tabs, queue.qsize()) - 1):
+            tab = await CdpTab.open(connection, blocked_urls)
+            open_tabs.append(tab)
+            workers.append(tab)
+        await asyncio.gather(*(worker(tab) for tab in workers))
+    finally:
+        for tab in open_tabs:
+            try:
+                await tab.close()
+            except CdpError:
+                pass
+        await connection.close()
+
+    ordered = [results[name] for name in locations if name in results]
+    all_dfs = [race_df for race_df, _ in ordered if race_df is not None]
+    forms_dfs = [form_df for _, form_df in ordered if form_df is not None]
+    return locations, all_dfs, forms_dfs
+
+
+def scrape_races_cdp(address, lobby_url, parse_locations, parse_venue, sink=None, tabs=4, need_form=None,
+                     timeout=45, blocked_urls=()):
+    """
+    Scrapes every venue of the lobby in up to `tabs` concurrent tabs of the Chrome
+    listening on `address`. Arguments are as for http_engine.scrape_races_http, plus
+    `need_form(race_name, race_data)`, which may return False to skip FULL FORM, and
+    `blocked_urls`, blocked in every tab (pass the driver's `blocked_urls` from
+    lean_browser.start_chrome).
+    Returns (locations, race DataFrames, form DataFrames).
+    """
+    return asyncio.run(
+        _scrape(address, lobby_url, parse_locations, parse_venue, sink, tabs, need_form, timeout, blocked_urls)
+    )
@@ -0,0 +1,95 @@
+"""
+Compact in-memory form history for large, multi-meeting histories.
+
+As text, every form row holds 16 strings, and runner, track, class and jockey
+names repeat thousands of times over a season. `read_history` loads the form
+CSVs in chunks and keeps only the compact columns of each chunk: categorical
+runner, track, class, jockey and Plc columns (one copy of each distinct name
+plus small integer codes), numeric arrays for prices, margins, times and
+positions, datetime dates, and In Run and Placing as list columns. The chunks are
+then joined with their categories unioned, so the text of the whole history is
+never in memory at once:
+
+    history = read_history(['../data/full_form_data.csv', 'archive/2025-07.csv'], 'G')
+    history.memory_usage(deep=True).sum()
+"""
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from typed_columns import pa, pc, to_category, to_number, typed_form_frame
+
+RUNNER_COLUMN = {'G': 'Greyhound', 'T': 'Horse'}
+
+
+def _arrow(series):
+    values = pa.array(series)
+    return values.combine_chunks() if isinstance(values, pa.ChunkedArray) else values
+
+
+def _arrow_series(values, like):
+    return pd.Series(pd.arrays.ArrowExtensionArray(values), index=like.index, name=like.name)
+
+
+def compact_in_run(in_run):
+    """In Run positions as lists of 16-bit integers with 32-bit offsets."""
+    return _arrow_series(_arrow(in_run).cast(pa.list_(pa.int16())), in_run)
+
+
+def compact_placings(placings):
+    """Placing lists with every name dictionary-encoded, so each distinct name is stored once per chunk."""
+    lists = _arrow(placings).cast(pa.list_(pa.string()))
+    names = pc.dictionary_encode(lists.flatten())
+    return _arrow_series(pa.ListArray.from_arrays(lists.offsets, names, mask=lists.is_null()), placings)
+
+
+def compact_form_frame(df, code):
+    """
+    The typed form columns (see typed_columns.typed_form_frame) with categorical
+    runner names and Plc, 16-bit days and distances and, with pyarrow, compact
+    In Run and Placing lists.
+    """
+    df = typed_form_frame(df, code)
+    runner = RUNNER_COLUMN[code]
+    df[runner] = to_category(df[runner])
+    df['Plc'] = to_category(df['Plc'])
+    df['Days'] = df['Days'].astype('Int16')
+    df['Distance'] = df['Distance'].astype('Int16')
+    if code == 'G' and 'Wgt' in df:
+        # Greyhound form rows carry no weight ('N/A'), so this is all missing
+        df['Wgt'] = to_number(df['Wgt'])
+    if pa is not None:
+        df['In Run'] = compact_in_run(df['In Run'])
+        df['Placing'] = compact_placings(df['Placing'])
+    return df
+
+
+def concat_compact(frames):
+    """Joins compact frames; categorical columns keep one set of categories instead of falling back to text."""
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame()
+    columns = {}
+    for column in list(frames[0].columns):
+        # Popped column by column, so the parts are freed as the joined column is built
+        parts = [frame.pop(column) for frame in frames]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            columns[column] = pd.Series(union_categoricals(parts, ignore_order=True), name=column)
+        else:
+            columns[column] = pd.concat(parts, ignore_index=True)
+        del parts
+    return pd.DataFrame(columns, copy=False)
+
+
+def read_history(paths, code, chunksize=50000):
+    """
+    Loads form CSVs of racing code `code` as one compact DataFrame, converting
+    `chunksize` rows of text at a time.
+    """
+    if isinstance(paths, str):
+        paths = [paths]
+    frames = [
+        compact_form_frame(chunk, code)
+        for path in paths
+        for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize)
+    ]
+    return concat_compact(frames)
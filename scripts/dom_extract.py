@@ -0,0 +1,41 @@
+DEFAULT_ATTRIBUTES = ('id', 'class', 'href', 'data-testid')
+
+# Reads every element matching each selector in a single WebDriver round trip,
+# instead of one `el.text` request per element.
+EXTRACT_SCRIPT = """
+var selectors = arguments[0], attributes = arguments[1], payload = {};
+Object.keys(selectors).forEach(function (key) {
+  payload[key] = Array.from(document.querySelectorAll(selectors[key])).map(function (el) {
+    var attrs = {};
+    attributes.forEach(function (name) {
+      if (el.hasAttribute(name)) { attrs[name] = el.getAttribute(name); }
+    });
+    return {text: (el.innerText || '').trim(), attrs: attrs};
+  });
+});
+return payload;
+"""
+
+
+def extract_page(driver, selectors, attributes=DEFAULT_ATTRIBUTES):
+    """
+    Extracts the text and attributes of every element matching each selector in one script call.
+    `selectors` maps a payload key to a CSS selector.
+    Returns {key: [{'text': ..., 'attrs': {...}}, ...]} in document order.
+    """
+    return driver.execute_script(EXTRACT_SCRIPT, dict(selectors), list(attributes))
+
+
+def extract_elements(driver, css_selector, attributes=DEFAULT_ATTRIBUTES):
+    """
+    Extracts [{'text': ..., 'attrs': {...}}, ...] for every element matching `css_selector`.
+    """
+    return extract_page(driver, {'elements': css_selector}, attributes)['elements']
+
+
+def extract_texts(driver, css_selector):
+    """
+    Returns the non-empty text of every element matching `css_selector`, like
+    `[el.text.strip() for el in elements if el.text.strip()]` but in one round trip.
+    """
+    return [el['text'] for el in extract_elements(driver, css_selector, ()) if el['text']]
@@ -0,0 +1,143 @@
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+
+RUN_START = re.compile(r'\d+/\d+')
+RUN_DATE = re.compile(r'(\d{2})/(\d{2})/(\d{4})')
+ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+class FormCache:
+    """
+    Persistent record of the form history already emitted for each runner.
+
+    Runs are keyed by runner name plus race date and track. Runners not seen for
+    `max_age_days` are evicted on save, and a runner whose form was read within
+    `fresh_hours` counts as fresh, so its FULL FORM view does not need reopening.
+    Each runner's run keys are a set in memory; keys older than its latest run are
+    pruned on save, since trim_entry cuts those runs off before they are parsed.
+    """
+
+    def __init__(self, path, max_age_days=60, fresh_hours=12):
+        self.path = path
+        self.max_age_days = max_age_days
+        self.fresh_hours = fresh_hours
+        self.runners = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path) as f:
+                self.runners = json.load(f).get('runners', {})
+            for entry in self.runners.values():
+                entry['runs'] = set(entry.get('runs', []))
+
+    def is_fresh(self, name, now=None):
+        entry = self.runners.get(name)
+        if not entry or not entry.get('form_checked'):
+            return False
+        now = time.time() if now is None else now
+        return now - entry['form_checked'] < self.fresh_hours * 3600
+
+    def all_fresh(self, names):
+        """True when every runner in `names` has fresh cached form."""
+        with self._lock:
+            return bool(names) and all(self.is_fresh(name) for name in names)
+
+    def knows(self, names):
+        """True when every runner in `names` is in the cache."""
+        with self._lock:
+            return all(name in self.runners for name in names)
+
+    def touch(self, names):
+        """Marks runners as seen today, which keeps them from being evicted."""
+        today = datetime.now().strftime('%Y-%m-%d')
+        with self._lock:
+            for name in names:
+                self.runners.setdefault(name, {'runs': set()})['last_seen'] = today
+
+    def mark_checked(self, names):
+        """Records that the full form of these runners was read just now."""
+        now = time.time()
+        with self._lock:
+            for name in names:
+                self.runners.setdefault(name, {'runs': set()})['form_checked'] = now
+
+    def trim_entry(self, name, entry):
+        """
+        Cuts a FULL FORM block before its first run older than the runner's latest
+        cached run. Form history is listed newest first, so everything from there on has
+        been parsed before. Runs on the latest date itself are kept (a second meeting or
+        a rerun heat that day) and deduplicated by new_rows.
+        """
+        with self._lock:
+            latest = self.runners.get(name, {}).get('latest_run')
+        if not latest:
+            return entry
+
+        lines = entry.split('\n')
+        for i in range(len(lines) - 1):
+            if RUN_START.fullmatch(lines[i].strip()):
+                date_match = RUN_DATE.fullmatch(lines[i + 1].strip())
+                if date_match:
+                    day, month, year = date_match.groups()
+                    if f"{year}-{month}-{day}" < latest:
+                        return '\n'.join(lines[:i])
+        return entry
+
+    def new_rows(self, form_df, runner_column):
+        """
+        Returns only the rows of `form_df` not already cached, and adds them to the cache.
+        """
+        keep = []
+        with self._lock:
+            for name, date, track in zip(form_df[runner_column], form_df['Date'], form_df['Track']):
+                entry = self.runners.setdefault(name, {'runs': set()})
+                run_key = f"{date}|{track}"
+                if run_key in entry['runs']:
+                    keep.append(False)
+                    continue
+                entry['runs'].add(run_key)
+                if ISO_DATE.fullmatch(date) and date > entry.get('latest_run', ''):
+                    entry['latest_run'] = date
+                keep.append(True)
+
+        return form_df[keep]
+
+    def evict(self):
+        """Drops runners not seen in `max_age_days`. Returns the number evicted."""
+        cutoff = (datetime.now() - timedelta(days=self.max_age_days)).strftime('%Y-%m-%d')
+        with self._lock:
+            stale = [name for name, entry in self.runners.items() if entry.get('last_seen', '') < cutoff]
+            for name in stale:
+                del self.runners[name]
+        return len(stale)
+
+    def prune(self):
+        """
+        Drops run keys dated before each runner's latest run: trim_entry never lets such
+        runs reach new_rows again. Returns the number of keys dropped.
+        """
+        dropped = 0
+        with self._lock:
+            for entry in self.runners.values():
+                latest = entry.get('latest_run')
+                if not latest:
+                    continue
+                old = {key for key in entry['runs'] if ISO_DATE.fullmatch(key[:10]) and key[:10] < latest}
+                entry['runs'] -= old
+                dropped += len(old)
+        return dropped
+
+    def save(self):
+        evicted = self.evict()
+        self.prune()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with self._lock:
+            runners = {name: dict(entry, runs=sorted(entry['runs'])) for name, entry in self.runners.items()}
+            with open(tmp_path, 'w') as f:
+                json.dump({'runners': runners}, f)
+        os.replace(tmp_path, self.path)
+        print(f"Form cache saved: {len(self.runners)} runners, {evicted} evicted")
@@ -0,0 +1,452 @@
+"""
+Single-pass parsing engine for race cards and FULL FORM history.
+
+Each input line is stripped and classified once by a tokenizer built on
+precompiled patterns. A small state machine then walks the tokens linearly and
+appends every field straight into per-column lists, instead of building one
+dict per row. The output matches the original line-walking parsers exactly,
+including their fallbacks and warnings.
+"""
+import re
+from datetime import datetime
+
+import pandas as pd
+
+PLC = re.compile(r'\d+/\d+')
+RACE_TIME = re.compile(r'\d{2}:\d{2}\s+')
+DOG_RUNNER = re.compile(r'^(.*?)\((\d+)\)$')
+HORSE_RUNNER = re.compile(r'^(\d+)\.\s+(.*?)\s+\((\d+)\)$')
+HORSE_NUMBERED = re.compile(r'^\d+\.\s+')
+FORM_FIGURES = re.compile(r'^[\dX\-]+$')
+AGE_SEX = re.compile(r'^\d+yo\s+[A-Z]$')
+DECIMAL = re.compile(r'\d+(\.\d+)?')
+INTEGER = re.compile(r'\d+')
+GREYHOUND_IN_RUN = re.compile(r'(\d+,)*\d*')
+HORSE_IN_RUN = re.compile(r'(\d+,)*\d+')
+
+CONDITIONS = frozenset(['S', 'G', 'H'])
+
+GREYHOUND_FORM_COLUMNS = [
+    'Greyhound', 'Plc', 'Date', 'Track', 'Days', 'Distance', 'Mgn',
+    'Class', 'Box', 'In Run', 'Wgt', 'Price', 'Sect', 'Time', 'Best', 'Placing'
+]
+HORSE_FORM_COLUMNS = [
+    'Horse', 'Plc', 'Date', 'Track', 'Days', 'Time', 'Distance',
+    'Mgn', 'Class', 'Cond', 'Bar', 'In Run', 'Jockey', 'Wgt', 'Price', 'Placing'
+]
+
+# dd/mm/yyyy text -> ISO date, shared by every parse of the run (see iso_dates)
+ISO_DATES = {}
+ISO_DATES_LIMIT = 8192
+
+# Token kinds for race-card lines
+OTHER, RACE, RUNNER, JOCKEY, TRAINER, FORM, AGE, SCRATCHED, ODDS, NUMBERED = range(10)
+
+
+def iso_date(text):
+    """'22/08/2025' -> '2025-08-22'; text that is not a dd/mm/yyyy date is returned as is."""
+    try:
+        return datetime.strptime(text, '%d/%m/%Y').strftime('%Y-%m-%d')
+    except ValueError:
+        return text
+
+
+def iso_dates(texts):
+    """
+    `iso_date` over a whole column. Dates not converted before are parsed together in
+    one `pd.to_datetime` call; a venue's form shares most of its dates with the venues
+    before it, so the rest are dictionary lookups.
+    """
+    known = {text: ISO_DATES.get(text) for text in dict.fromkeys(texts)}
+    new = [text for text, iso in known.items() if iso is None]
+    if new:
+        parsed = pd.to_datetime(pd.Index(new, dtype=object), format='%d/%m/%Y', errors='coerce')
+        known.update(zip(new, pd.Index(parsed.strftime('%Y-%m-%d'), dtype=object).where(parsed.notna(), new)))
+        if len(ISO_DATES) > ISO_DATES_LIMIT:
+            ISO_DATES.clear()
+        ISO_DATES.update((text, known[text]) for text in new)
+    return [known[text] for text in texts]
+
+
+def is_number(s):
+    try:
+        float(s)
+        return True
+    except ValueError:
+        return False
+
+
+def new_columns(columns):
+    return {column: [] for column in columns}
+
+
+def form_frame(columns):
+    """DataFrame from {column: [values]}; an empty result keeps the object-dtype columns."""
+    if not next(iter(columns.values())):
+        return pd.DataFrame([], columns=list(columns))
+    return pd.DataFrame(columns)
+
+
+# ------------------------------
+# FULL FORM history
+# ------------------------------
+
+def greyhound_form_columns(data_list):
+    """
+    Parses greyhound FULL FORM blocks into {column: [values]} (see GREYHOUND_FORM_COLUMNS).
+    """
+    cols = new_columns(GREYHOUND_FORM_COLUMNS)
+    append = {column: values.append for column, values in cols.items()}
+
+    for entry in data_list:
+        if 'Race History' not in entry:
+            continue
+        greyhound_name = entry.split('\n', 1)[0].strip()
+        raw = entry[entry.find('Race History'):].split('\n')
+        n = len(raw)
+        lines = [line.strip() for line in raw]
+        is_plc = ['/' in line and PLC.fullmatch(line) is not None for line in lines]
+        i = raw.index('Plc') + 1 if 'Plc' in raw else n
+
+        while i < n:
+            line = lines[i]
+            if not is_plc[i]:
+                i += 1
+                continue
+
+            plc = line
+            date = track = days = distance = mgn = grade = box = in_run = price = sect = time = best = ''
+            i += 1
+            if i < n:
+                date = lines[i]
+                i += 1
+
+            if i < n:
+                parts = []
+                while i < n and not lines[i].startswith('$'):
+                    if lines[i]:
+                        parts.append(lines[i])
+                    i += 1
+
+                j = 0
+                while j < len(parts) and not parts[j].replace('.', '').isdigit():
+                    j += 1
+                track = ' '.join(parts[:j])
+                values = parts[j:]
+
+                if i < n:
+                    price = lines[i]
+                    i += 1
+
+                if len(values) == 6:
+                    days, distance, mgn, grade, box, in_run = values
+                elif len(values) == 5:
+                    days = 'N/A'
+                    distance, mgn, grade, box, in_run = values
+                else:
+                    in_run = 'N/A'
+                    print(
+                        f"Warning: Invalid number of values ({len(values)}) "
+                        f"between Track and Price for {greyhound_name} on {iso_date(date)}"
+                    )
+
+                if in_run and in_run != 'N/A' and not GREYHOUND_IN_RUN.fullmatch(in_run):
+                    print(
+                        f"Warning: Invalid In Run data '{in_run}' "
+                        f"for {greyhound_name} on {iso_date(date)}"
+                    )
+                    in_run = 'N/A'
+
+            if i < n:
+                sect = lines[i]
+                i += 1
+            if i < n:
+                time = lines[i]
+                i += 1
+            if i < n:
+                next_line = lines[i]
+                if next_line.replace('.', '').isdigit() or next_line in ('N/A', '0'):
+                    best = next_line
+                    i += 1
+                else:
+                    best = 'N/A'
+
+            placing_lines = []
+            while i < n:
+                l = lines[i]
+                if not l or is_plc[i]:
+                    break
+                upper = l.upper()
+                if 'SPELL' in upper or 'LET-UP' in upper:
+                    break
+                if len(l) > 1 and l[0].isdigit() and l[1] == '.':
+                    placing_lines.append(l)
+                i += 1
+
+            append['Greyhound'](greyhound_name)
+            append['Plc'](plc)
+            append['Date'](date)
+            append['Track'](track)
+            append['Days'](days)
+            append['Distance'](distance)
+            append['Mgn'](mgn)
+            append['Class'](grade)
+            append['Box'](box)
+            append['In Run'](in_run)
+            append['Wgt']('N/A')
+            append['Price'](price)
+            append['Sect'](sect)
+            append['Time'](time)
+            append['Best'](best)
+            append['Placing']('\n'.join(placing_lines) if placing_lines else 'N/A')
+
+    cols['Date'] = iso_dates(cols['Date'])
+    return cols
+
+
+def horse_form_name(entry):
+    """The horse a FULL FORM block belongs to: its first text before "T:" / "Race History"."""
+    for p in entry.split('\n'):
+        p = p.strip()
+        if p in ("T:", "Race History"):
+            return None
+        if p and not p.isdigit() and p != ",":
+            return p
+    return None
+
+
+def horse_form_columns(data_list):
+    """
+    Parses thoroughbred FULL FORM blocks into {column: [values]} (see HORSE_FORM_COLUMNS).
+    """
+    cols = new_columns(HORSE_FORM_COLUMNS)
+    append = {column: values.append for column, values in cols.items()}
+
+    for entry in data_list:
+        if 'Race History' not in entry:
+            continue
+        horse_name = horse_form_name(entry)
+        if not horse_name:
+            continue
+
+        lines = [l for l in (l.strip() for l in entry[entry.find('Race History'):].split('\n')) if l]
+        n = len(lines)
+        is_plc = ['/' in line and PLC.fullmatch(line) is not None for line in lines]
+        i = lines.index('Plc') + 1 if 'Plc' in lines else n
+
+        while i < n:
+            if not is_plc[i]:
+                i += 1
+                continue
+
+            plc = lines[i]
+            date, days, time, grade, cond = 'N/A', 'N/A', 'N/A', 'N/A', 'N/A'
+            distance = mgn = bar = in_run = jockey = wgt = price = ''
+
+            i += 1
+            if i < n:
+                date = lines[i]
+                i += 1
+
+            start = i
+            while i < n and lines[i] not in CONDITIONS and not lines[i].startswith('$'):
+                i += 1
+            parts = lines[start:i]
+
+            j = 0
+            while j < len(parts) and not DECIMAL.fullmatch(parts[j]):
+                j += 1
+            track = " ".join(parts[:j])
+            values = parts[j:]
+
+            if len(values) == 5:
+                days, time, distance, mgn, grade = values
+            elif len(values) == 4:
+                if DECIMAL.fullmatch(values[-1]):
+                    days, time, distance, mgn = values
+                else:
+                    time, distance, mgn, grade = values
+            elif len(values) == 3:
+                time, distance, mgn = values
+
+            if i < n and lines[i] in CONDITIONS:
+                cond = lines[i]
+                i += 1
+            if i < n and INTEGER.fullmatch(lines[i]):
+                bar = lines[i]
+                i += 1
+            if i < n and (',' in lines[i] or HORSE_IN_RUN.fullmatch(lines[i])):
+                in_run = lines[i]
+                i += 1
+            if i < n:
+                jockey = lines[i]
+                i += 1
+            if i < n and DECIMAL.fullmatch(lines[i]):
+                wgt = lines[i]
+                i += 1
+            if i < n and lines[i].startswith('$'):
+                price = lines[i]
+                i += 1
+
+            placing_lines = []
+            while i < n:
+                l = lines[i]
+                if is_plc[i] or l == 'Race History' or l == 'Back to top':
+                    break
+                if l[0].isdigit() and '.' in l:
+                    placing_lines.append(l)
+                i += 1
+
+            append['Horse'](horse_name)
+            append['Plc'](plc)
+            append['Date'](date)
+            append['Track'](track)
+            append['Days'](days)
+            append['Time'](time)
+            append['Distance'](distance)
+            append['Mgn'](mgn)
+            append['Class'](grade)
+            append['Cond'](cond)
+            append['Bar'](bar)
+            append['In Run'](in_run)
+            append['Jockey'](jockey)
+            append['Wgt'](wgt)
+            append['Price'](price)
+            append['Placing']("\n".join(placing_lines) if placing_lines else 'N/A')
+
+    cols['Date'] = iso_dates(cols['Date'])
+    return cols
+
+
+# ------------------------------
+# Race cards
+# ------------------------------
+
+def dog_card_records(data):
+    """
+    Parses greyhound runner-list lines into [race, number, name, form, win, place] records.
+    """
+    n = len(data)
+    stripped = [line.strip() for line in data]
+    is_race = [RACE_TIME.match(line) is not None for line in data]
+    records = []
+    current_race = None
+    i = 0
+
+    while i < n:
+        if is_race[i]:
+            current_race = stripped[i]
+            i += 1
+            continue
+
+        runner_match = DOG_RUNNER.match(stripped[i])
+        if not runner_match:
+            i += 1
+            continue
+
+        potential_form = stripped[i + 3] if i + 3 < n else None
+        form = potential_form if potential_form is not None and FORM_FIGURES.match(potential_form) else None
+
+        odds = []
+        j = i + 5
+        while j < n and not is_race[j]:
+            line = data[j]
+            if "(" in line and ")" in line:
+                break
+            if is_number(line):
+                odds.append(line)
+            j += 1
+
+        win, place = (odds[-2], odds[-1]) if len(odds) >= 2 else (None, None)
+        records.append([current_race, runner_match.group(2).strip(), runner_match.group(1).strip(), form, win, place])
+        i = j
+
+    return records
+
+
+def _horse_token(line):
+    if line == 'J':
+        return JOCKEY
+    if line == 'T':
+        return TRAINER
+    if FORM_FIGURES.match(line):
+        return FORM
+    if AGE_SEX.match(line):
+        return AGE
+    if line == "Scratched":
+        return SCRATCHED
+    if is_number(line):
+        return ODDS
+    if HORSE_NUMBERED.match(line) or RACE_TIME.match(line):
+        return NUMBERED
+    return OTHER
+
+
+def horse_card_records(data):
+    """
+    Parses thoroughbred runner-list lines into
+    [race time, race name, number, name, barrier, jockey, trainer, form, age/sex, win, place, status] records.
+    """
+    n = len(data)
+    stripped = [line.strip() for line in data]
+    tokens = [_horse_token(line) for line in stripped]
+    records = []
+    current_race = current_race_name = None
+    i = 0
+
+    while i < n:
+        if RACE_TIME.match(data[i]):
+            current_race = stripped[i]
+            current_race_name = stripped[i + 1] if i + 1 < n else None
+            i += 4
+            continue
+
+        runner_match = HORSE_RUNNER.match(stripped[i])
+        if not runner_match:
+            i += 1
+            continue
+
+        horse_num, horse_name, barrier = runner_match.group(1), runner_match.group(2).strip(), runner_match.group(3).strip()
+        jockey = trainer = form = age_sex = None
+        odds = []
+
+        j = i + 1
+        while j < n:
+            token = tokens[j]
+            if token == JOCKEY and j + 1 < n:
+                jockey = stripped[j + 1]
+                j += 2
+                continue
+            if token == TRAINER and j + 1 < n:
+                trainer = stripped[j + 1]
+                j += 2
+                continue
+            if token == FORM:
+                form = stripped[j]
+            elif token == AGE:
+                age_sex = stripped[j]
+            elif token == SCRATCHED:
+                records.append([
+                    current_race, current_race_name, horse_num, horse_name, barrier,
+                    jockey, trainer, form, age_sex, None, None, "Scratched"
+                ])
+                j += 1
+                break
+            elif token == ODDS:
+                odds.append(stripped[j])
+            elif token == NUMBERED:
+                break
+            j += 1
+
+        win = place = None
+        if odds:
+            win, place = (odds[-2], odds[-1]) if len(odds) >= 2 else (odds[-1], None)
+
+        if None not in (jockey, trainer, form, age_sex, win, place):
+            records.append([
+                current_race, current_race_name, horse_num, horse_name, barrier,
+                jockey, trainer, form, age_sex, win, place, "Active"
+            ])
+        i = j
+
+    return records
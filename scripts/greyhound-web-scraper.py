@@ -1,302 +1,168 @@
+import argparse
 import os
-import re
+import sys
 import time
 from datetime import datetime
 
 import pandas as pd
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
-
-
-def parse_australian_race_locations(data_list):
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+
+from browser_daemon import DEFAULT_DIR as DAEMON_DIR, DaemonUnavailable, submit
+from browser_watchdog import BrowserWatchdog
+from cdp_tabs import debugger_address, scrape_races_cdp
+from dom_extract import extract_texts
+from form_cache import FormCache
+from form_engine import dog_card_records, form_frame, greyhound_form_columns
+from http_engine import BACKENDS, HttpEngine, make_backend, scrape_races_http
+from jump_scheduler import JumpScheduler, follow_jumps
+from lean_browser import NAVIGATIONS, start_chrome
+from lobby import HOME_COUNTRY, collect_race_urls, collect_tile_texts, parse_lobby, remember_race_url, venues_to_scrape
+from race_results import write_race_results
+from race_store import RaceStore
+from readiness import RECORDER, wait_for_dom_quiet, wait_until
+from run_metrics import METRICS, MeteredSink
+from runner_stats import RunnerStats
+from snapshot_archive import SnapshotArchive
+from typed_columns import write_typed_outputs
+from venue_fingerprints import FingerprintSink, VenueFingerprints
+from venue_pool import scrape_in_parallel
+from venue_sink import CsvVenueSink, TeeSink
+
+LOBBY_URL = "https://www.unibet.com.au/racing#/lobby/G"
+# Reads of the lobby before a run gives up on finding Australian meetings
+LOBBY_ATTEMPTS = 3
+
+FORM_OUTPUT_COLUMNS = [
+    'Greyhound', 'Plc', 'Date', 'Track', 'Days', 'Distance', 'Mgn',
+    'Class', 'Box', 'In Run', 'Price', 'Time', 'Placing'
+]
+
+
+def parse_australian_race_locations(data_list, report=True):
     """
-    Extracts Australian race locations from the given data list.
+    Extracts the Australian race locations that still have races to run from the lobby text.
+    Finished and abandoned meetings are left out (and, with `report`, counted as visits saved).
     """
-    data = data_list[0].strip().split('\n')
-    australian_locations = []
-    in_australia_section = False
-
-    for line in data:
-        line = line.strip()
-        if line.lower() == "australia":
-            in_australia_section = True
-            continue
-        elif line in [
-            "New Zealand", "France", "Germany", "Japan", "Korea", "Malaysia",
-            "South Africa", "Turkey", "UK & Ireland", "United States", "Canada"
-        ]:
-            in_australia_section = False
-            continue
-
-        if (
-            in_australia_section
-            and line
-            and not any(char.isdigit() for char in line[0])
-            and not line.startswith((':', '-', ','))
-        ):
-            australian_locations.append(line)
-
-    return australian_locations
-
-
-def is_number(s):
-    """Checks if a string is a number."""
-    try:
-        float(s)
-        return True
-    except ValueError:
-        return False
+    return venues_to_scrape(parse_lobby(data_list[0], 'G'), report=report)
 
 
 def click_race(driver, race_name, timeout=10, post_click_wait=3, max_retries=1):
     """
     Attempts to click on a race by name.
+    Waits up to `post_click_wait` seconds for the lobby to be replaced by the race page.
     Returns True if successful, False otherwise.
     """
     xpath = f"//div[contains(@class, 'sc-kVUOzj knIZUY') and .//h5[contains(text(), '{race_name}')]]"
 
     for attempt in range(max_retries):
         try:
-            WebDriverWait(driver, timeout).until(
-                lambda d: d.find_element(By.XPATH, xpath).is_displayed()
+            wait_until(
+                driver, "lobby_tile",
+                lambda d: d.find_element(By.XPATH, xpath).is_displayed(), timeout
             )
             race_div = driver.find_element(By.XPATH, xpath)
             driver.execute_script("arguments[0].click();", race_div)
             print(f"Clicked on {race_name}")
-            time.sleep(post_click_wait)
+            try:
+                wait_until(driver, "race_page", EC.staleness_of(race_div), post_click_wait)
+            except TimeoutException:
+                pass
             return True
         except (StaleElementReferenceException, TimeoutException):
             print(f"Attempt {attempt + 1} to click '{race_name}' failed.")
-            time.sleep(1)
+            METRICS.count("click_retries")
 
     return False
 
 
-def get_dog_form_elements(
-    driver,
-    homepage_url="https://www.unibet.com.au/racing#/lobby/G",
-    css_selector=".css-10arllf",
-    timeout=45
-):
+def open_race(driver, race_name, race_url=None, homepage_url=LOBBY_URL, css_selector=".css-10arllf", timeout=45):
     """
-    Scrapes dog list and full form data from the current race page.
-    Returns two lists: dog_list and form_list.
+    Opens a race page straight from its URL, or by clicking its lobby tile when
+    the lobby exposed no URL for it.
+    Returns True if the race page was opened, False otherwise.
     """
-    start = time.time()
-    dog_list = []
-
-    while len(dog_list) < 10:
-        if time.time() - start > timeout:
-            raise TimeoutError(f"Dog list did not reach 10 items within {timeout} seconds")
+    previous_cards = driver.find_elements(By.CSS_SELECTOR, css_selector)
+
+    if race_url:
+        driver.get(race_url)
+        print(f"Opened {race_name} at {race_url}")
+    else:
+        if driver.current_url != homepage_url:
+            driver.get(homepage_url)
+        if not click_race(driver, race_name):
+            return False
+
+    # The previous race's cards must be gone before the new runner list is read
+    if previous_cards:
         try:
-            elements = WebDriverWait(driver, 5).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, css_selector))
-            )
-            dog_list = [el.text.strip() for el in elements if el.text.strip()]
-            dog_list = '\n'.join(dog_list).split('\n')
+            wait_until(driver, "race_page", EC.staleness_of(previous_cards[0]), timeout)
         except TimeoutException:
-            time.sleep(0.5)
+            print(f"Race page for {race_name} did not replace the previous race within {timeout} seconds")
+            return False
 
-    button = WebDriverWait(driver, 45).until(
-        EC.element_to_be_clickable((By.XPATH, "//button[span[normalize-space()='FULL FORM']]"))
-    )
-    driver.execute_script("arguments[0].click();", button)
+    return True
 
-    elements = WebDriverWait(driver, 45).until(
-        EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".sc-jNwOwP.drZjiD"))
-    )
-    form_list = [el.text.strip() for el in elements if el.text.strip()]
 
-    driver.back()
-    print("Back navigation triggered...")
+def runner_lines(driver, css_selector, min_lines=10):
+    """
+    Returns the non-empty lines of the runner cards, or False while fewer than `min_lines` are rendered.
+    """
+    lines = '\n'.join(extract_texts(driver, css_selector)).split('\n')
+    return lines if len(lines) >= min_lines else False
 
+
+def get_dog_list(driver, css_selector=".css-10arllf", timeout=45):
+    """
+    Waits for the runner list of the current race page and returns its lines.
+    """
     try:
-        WebDriverWait(driver, timeout).until(lambda d: d.current_url == homepage_url)
-        print("Back to homepage successfully")
+        return wait_until(driver, "runner_list", lambda d: runner_lines(d, css_selector), timeout)
     except TimeoutException:
-        print(f"Failed to return to homepage within {timeout} seconds (current_url: {driver.current_url})")
-
-    time.sleep(2)
-    return dog_list, form_list
+        raise TimeoutError(f"Dog list did not reach 10 items within {timeout} seconds")
 
 
-def parse_greyhound_data(data_list):
+def get_full_form(driver, timeout=45):
     """
-    Parses full form greyhound data into a DataFrame.
+    Opens the FULL FORM view of the current race page and returns one text block per runner.
     """
-    rows = []
+    button = wait_until(
+        driver, "full_form_button",
+        EC.element_to_be_clickable((By.XPATH, "//button[span[normalize-space()='FULL FORM']]")), timeout
+    )
+    driver.execute_script("arguments[0].click();", button)
 
-    for entry in data_list:
-        greyhound_name = entry.split('\n')[0].strip()
-        race_history_section = entry[entry.find('Race History'):]
-        lines = race_history_section.split('\n')
-        race_start_idx = lines.index('Plc') + 1 if 'Plc' in lines else len(lines)
-        i = race_start_idx
+    wait_for_dom_quiet(driver, "full_form", ".sc-jNwOwP.drZjiD", timeout)
+    return extract_texts(driver, ".sc-jNwOwP.drZjiD")
 
-        while i < len(lines):
-            line = lines[i].strip()
-            if not line or line in ['Back to top', 'Race History']:
-                i += 1
-                continue
 
-            line_upper = line.upper()
-            if 'SPELL' in line_upper or 'LET-UP' in line_upper:
-                i += 1
-                continue
+def get_dog_form_elements(
+    driver,
+    css_selector=".css-10arllf",
+    timeout=45
+):
+    """
+    Scrapes dog list and full form data from the current race page.
+    Returns two lists: dog_list and form_list.
+    """
+    dog_list = get_dog_list(driver, css_selector, timeout)
+    form_list = get_full_form(driver, timeout)
+    return dog_list, form_list
+
 
-            if re.fullmatch(r'\d+/\d+', line):
-                race_data = {
-                    'Greyhound': greyhound_name,
-                    'Plc': line,
-                    'Date': '',
-                    'Track': '',
-                    'Days': '',
-                    'Distance': '',
-                    'Mgn': '',
-                    'Class': '',
-                    'Box': '',
-                    'In Run': '',
-                    'Wgt': 'N/A',
-                    'Price': '',
-                    'Sect': '',
-                    'Time': '',
-                    'Best': '',
-                    'Placing': ''
-                }
-
-                i += 1
-                # Date
-                if i < len(lines):
-                    try:
-                        race_data['Date'] = datetime.strptime(lines[i].strip(), '%d/%m/%Y').strftime('%Y-%m-%d')
-                    except ValueError:
-                        race_data['Date'] = lines[i].strip()
-                    i += 1
-
-                # Track and subsequent fields
-                if i < len(lines):
-                    parts = []
-                    while i < len(lines) and not lines[i].strip().startswith('$'):
-                        if lines[i].strip():
-                            parts.append(lines[i].strip())
-                        i += 1
-
-                    track_parts = []
-                    j = 0
-                    while j < len(parts) and not parts[j].replace('.', '').isdigit():
-                        track_parts.append(parts[j])
-                        j += 1
-                    race_data['Track'] = ' '.join(track_parts)
-
-                    values = parts[j:]
-                    if i < len(lines):
-                        race_data['Price'] = lines[i].strip()
-                        i += 1
-
-                    if len(values) == 6:
-                        race_data['Days'], race_data['Distance'], race_data['Mgn'], race_data['Class'], race_data['Box'], race_data['In Run'] = values
-                    elif len(values) == 5:
-                        race_data['Days'] = 'N/A'
-                        race_data['Distance'], race_data['Mgn'], race_data['Class'], race_data['Box'], race_data['In Run'] = values
-                    else:
-                        race_data['In Run'] = 'N/A'
-                        print(
-                            f"Warning: Invalid number of values ({len(values)}) "
-                            f"between Track and Price for {greyhound_name} on {race_data['Date']}"
-                        )
-
-                    if race_data['In Run'] and not (
-                        re.fullmatch(r'(\d+,)*\d*', race_data['In Run'])
-                        or race_data['In Run'] == 'N/A'
-                    ):
-                        print(
-                            f"Warning: Invalid In Run data '{race_data['In Run']}' "
-                            f"for {greyhound_name} on {race_data['Date']}"
-                        )
-                        race_data['In Run'] = 'N/A'
-
-                # Sect
-                if i < len(lines):
-                    race_data['Sect'] = lines[i].strip()
-                    i += 1
-
-                # Time
-                if i < len(lines):
-                    race_data['Time'] = lines[i].strip()
-                    i += 1
-
-                # Best
-                if i < len(lines):
-                    next_line = lines[i].strip()
-                    if next_line.replace('.', '').isdigit() or next_line in ['N/A', '0']:
-                        race_data['Best'] = next_line
-                        i += 1
-                    else:
-                        race_data['Best'] = 'N/A'
-
-                # Placing
-                placing_lines = []
-                while i < len(lines):
-                    l = lines[i].strip()
-                    if not l or re.fullmatch(r'\d+/\d+', l) or 'SPELL' in l.upper() or 'LET-UP' in l.upper():
-                        break
-                    if l[0].isdigit() and l[1] == '.':
-                        placing_lines.append(l)
-                    i += 1
-                race_data['Placing'] = '\n'.join(placing_lines) if placing_lines else 'N/A'
-
-                rows.append(race_data)
-            else:
-                i += 1
-
-    return pd.DataFrame(rows, columns=[
-        'Greyhound', 'Plc', 'Date', 'Track', 'Days', 'Distance', 'Mgn',
-        'Class', 'Box', 'In Run', 'Wgt', 'Price', 'Sect', 'Time', 'Best', 'Placing'
-    ])
+def parse_greyhound_data(data_list):
+    """
+    Parses full form greyhound data into a DataFrame.
+    """
+    return form_frame(greyhound_form_columns(data_list))
 
 
 def parse_dog_data(data):
     """
     Parses race data into structured records.
     """
-    records = []
-    i = 0
-    current_race = None
-
-    while i < len(data):
-        if re.match(r"\d{2}:\d{2}\s+", data[i]):
-            current_race = data[i].strip()
-            i += 1
-            continue
-
-        runner_match = re.match(r"^(.*?)\((\d+)\)$", data[i].strip())
-        if runner_match:
-            name_with_num = runner_match.group(1).strip()
-            dog_num = runner_match.group(2).strip()
-            potential_form = data[i + 3] if i + 3 < len(data) else None
-            form = potential_form.strip() if potential_form and re.match(r'^[\dX\-]+$', potential_form.strip()) else None
-
-            odds = []
-            j = i + 5
-            while (
-                j < len(data)
-                and not ("(" in data[j] and ")" in data[j])
-                and not re.match(r"\d{2}:\d{2}\s+", data[j])
-            ):
-                if is_number(data[j]):
-                    odds.append(data[j])
-                j += 1
-
-            win, place = (odds[-2], odds[-1]) if len(odds) >= 2 else (None, None)
-            records.append([current_race, dog_num, name_with_num, form, win, place])
-            i = j
-        else:
-            i += 1
-
-    return records
+    return dog_card_records(data)
 
 
 def build_dataframe(records):
@@ -307,72 +173,437 @@ def build_dataframe(records):
     return df[1:]
 
 
-def scrape_races(driver, australian_locations):
+def load_lobby(driver, url=LOBBY_URL, report=True, attempts=LOBBY_ATTEMPTS):
     """
-    Iterates over Australian race locations and scrapes race & form data.
-    Returns two lists of DataFrames.
+    Opens the racing lobby and waits until Australian locations can be read.
+    Returns the list of Australian race locations that still have races to run.
     """
-    all_dfs, forms_dfs = [], []
+    driver.get(url)
 
-    for race_name in australian_locations:
-        click_success = click_race(driver, race_name)
+    australian_entries = []
+
+    for attempt in range(1, attempts + 1):
+        try:
+            wait_for_dom_quiet(driver, "lobby", ".css-1kd0cbg", 60)
+            element = driver.find_element(By.CSS_SELECTOR, ".css-1kd0cbg")
+            entries = parse_lobby(element.text.strip(), 'G')
+            australian_entries = [entry for entry in entries if entry['country'] == HOME_COUNTRY]
+        except Exception:
+            australian_entries = []
+        if australian_entries:
+            break
+        if attempt < attempts:
+            time.sleep(2)
+    else:
+        # Late at night or off-season the lobby has no Australian meetings at all
+        print(f"No Australian meetings in the lobby after {attempts} attempts")
+        return []
 
-        if not click_success:
-            print(f"Skipping {race_name}, could not click race.")
-            continue
+    # An empty list when every meeting has finished, instead of waiting for venues forever
+    return venues_to_scrape(australian_entries, report=report)
 
-        race_data, form_data = get_dog_form_elements(driver)
 
-        race_df = build_dataframe(parse_dog_data(race_data))
-        if not race_df.empty:
-            print(race_df)
-            all_dfs.append(race_df)
+def scrape_venue(driver, race_name, homepage_url=LOBBY_URL, race_url=None, form_cache=None, archive=None,
+                 with_form=True, fingerprints=None, race_urls=None):
+    """
+    Scrapes race & form data for a single venue; with `with_form=False` only the runner list is read.
+    With `race_urls`, the race page a clicked tile led to is recorded for the venue's next visit.
+    Returns (race_df, form_df); either is None when nothing was found.
+    """
+    with METRICS.venue(race_name):
+        with METRICS.stage("open_race"):
+            opened = open_race(driver, race_name, race_url, homepage_url)
+        if not opened:
+            print(f"Skipping {race_name}, could not open race.")
+            return None, None
+        if race_url is None and race_urls is not None:
+            remember_race_url(race_urls, race_name, driver.current_url, homepage_url)
+
+        with METRICS.stage("runner_list"):
+            race_data = get_dog_list(driver)
+        if not with_form or not needs_full_form(race_name, race_data, form_cache):
+            form_data = []
         else:
-            print(f"No race data found for {race_name}, skipping.")
+            with METRICS.stage("full_form"):
+                form_data = get_full_form(driver)
+        return parse_venue(race_name, race_data, form_data, form_cache, archive, fingerprints)
+
 
+def needs_full_form(race_name, race_data, form_cache=None):
+    """
+    False when every runner's form is cached and fresh, so FULL FORM has nothing new.
+    """
+    if form_cache is not None and form_cache.all_fresh(runner_names(parse_dog_data(race_data))):
+        print(f"Form for every runner at {race_name} is cached, skipping FULL FORM.")
+        METRICS.count("full_form_skipped")
+        return False
+    return True
+
+
+def runner_names(records):
+    """Returns the dog names of parsed race records."""
+    return [record[2] for record in records]
+
+
+def form_runner_name(entry):
+    """Returns the dog name a FULL FORM block belongs to."""
+    return entry.split('\n')[0].strip()
+
+
+def parse_venue(race_name, race_data, form_data, form_cache=None, archive=None, fingerprints=None):
+    """
+    Parses one venue's runner list and form blocks, however they were fetched.
+    With a form cache, only form rows not emitted by an earlier run are returned.
+    With an archive, the raw text is stored first so it can be re-parsed later.
+    With fingerprints, text unchanged since the last run is not parsed at all and
+    (None, None) is returned; the fingerprint sink commits the rows stored for it.
+    Returns (race_df, form_df); either is None when nothing was found.
+    """
+    if archive is not None:
+        with METRICS.stage("archive"):
+            archive.add('G', race_name, race_data, form_data)
+
+    if fingerprints is not None and fingerprints.unchanged(race_name, race_data, form_data, form_cache):
+        print(f"{race_name} is unchanged since the last run, reusing its rows.")
+        if form_cache is not None:
+            form_cache.touch(fingerprints.runners(race_name))
+        return None, None
+
+    with METRICS.stage("parse_card"):
+        records = parse_dog_data(race_data)
+        race_df = build_dataframe(records)
+    if not race_df.empty:
+        print(f"{race_name}: {len(race_df)} runners in {race_df['Race'].nunique()} races")
+    else:
+        print(f"No race data found for {race_name}, skipping.")
+        race_df = None
+
+    if form_cache is not None:
+        form_data = [form_cache.trim_entry(form_runner_name(entry), entry) for entry in form_data]
+
+    with METRICS.stage("parse_form"):
         form_df = parse_greyhound_data(form_data)
-        if not form_df.empty:
-            print(form_df)
-            forms_dfs.append(form_df)
-        else:
-            print(f"No form data found for {race_name}, skipping.")
 
-    return all_dfs, forms_dfs
+    if form_cache is not None:
+        form_df = form_cache.new_rows(form_df, 'Greyhound')
+        form_cache.mark_checked(form_runner_name(entry) for entry in form_data)
+        form_cache.touch(runner_names(records))
 
+    if not form_df.empty:
+        print(f"{race_name}: {len(form_df)} form rows")
+    else:
+        print(f"No form data found for {race_name}, skipping.")
+        form_df = None
 
-def main():
-    driver = webdriver.Chrome()
-    url = "https://www.unibet.com.au/racing#/lobby/G"
-    driver.get(url)
+    return race_df, form_df
 
-    text = None
-    australian_locations = []
 
-    while not text or not australian_locations:
-        try:
-            element = WebDriverWait(driver, 60).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".css-1kd0cbg"))
+def scrape_races(driver, australian_locations, homepage_url=LOBBY_URL, race_urls=None, form_cache=None, sink=None,
+                 archive=None, fingerprints=None, watchdog=None):
+    """
+    Iterates over Australian race locations and scrapes race & form data.
+    Race URLs are read from the lobby once, so each venue is opened directly.
+    With a sink, each venue is written as soon as it is scraped instead of returned.
+    With a watchdog (browser_watchdog.BrowserWatchdog owning `driver`), the session is
+    recycled between venues when it grows too large, a venue whose session died is
+    retried once on a fresh one, and a venue that still fails (or only timed out) is
+    skipped.
+    Returns two lists of DataFrames.
+    """
+    all_dfs, forms_dfs = [], []
+    if race_urls is None:
+        race_urls = collect_race_urls(driver, australian_locations)
+
+    for race_name in australian_locations:
+        def scrape(driver):
+            return scrape_venue(
+                driver, race_name, homepage_url, race_urls.get(race_name), form_cache, archive,
+                fingerprints=fingerprints, race_urls=race_urls
             )
-            text = element.text.strip()
-            australian_locations = parse_australian_race_locations([text])
-            time.sleep(2)
-        except Exception:
-            text, australian_locations = None, []
-            time.sleep(2)
 
-    scraped_race_data, scraped_form_data = scrape_races(driver, australian_locations)
+        try:
+            race_df, form_df = scrape(driver)
+        except (TimeoutError, WebDriverException) as e:
+            if watchdog is None:
+                raise
+            try:
+                if not watchdog.session_died(e):
+                    raise
+                driver = watchdog.recycle(f"the session died at {race_name} ({e.__class__.__name__})", race_name)
+                race_df, form_df = scrape(driver)
+            except (TimeoutError, WebDriverException) as skipped:
+                # A slow FULL FORM render is not worth a new browser; carry on at the next venue
+                reason = skipped.msg if isinstance(skipped, WebDriverException) else skipped
+                print(f"Skipping {race_name}: {skipped.__class__.__name__}: {reason}")
+                driver = watchdog.check(race_name)
+                continue
+        if sink is not None:
+            sink.write_venue(race_name, race_df, form_df)
+        else:
+            if race_df is not None:
+                all_dfs.append(race_df)
+            if form_df is not None:
+                forms_dfs.append(form_df)
+        if watchdog is not None:
+            driver = watchdog.check(race_name)
+
+    return all_dfs, forms_dfs
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape Unibet greyhound races and form.")
+    parser.add_argument("--lobby-url", default=LOBBY_URL, help="Racing lobby to scrape.")
+    parser.add_argument("--output-dir", default="../data", help="Directory for the output CSVs.")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Number of browser workers to scrape venues with concurrently."
+    )
+    parser.add_argument(
+        "--min-interval", type=float, default=0.0,
+        help="Minimum seconds between venue starts on each worker."
+    )
+    parser.add_argument(
+        "--engine", choices=["browser", "cdp", "http"], default="browser",
+        help="Scrape with Chrome, with many tabs of one Chrome over DevTools, or over plain HTTP without a browser. "
+             "The http engine runs no JavaScript, so it only works against prerendered pages (a fixture site "
+             "or a prerendering proxy), not the live single-page app."
+    )
+    parser.add_argument(
+        "--tabs", type=int, default=4,
+        help="Number of tabs the cdp engine scrapes venues in at once."
+    )
+    parser.add_argument(
+        "--fetch-backend", choices=sorted(BACKENDS), default="requests",
+        help="HTTP client used by the http engine."
+    )
+    parser.add_argument("--record-dir", help="Save every response the http engine fetches here, for offline replay of a prerendered run.")
+    parser.add_argument(
+        "--form-cache",
+        help="JSON file of form history already emitted; only new form rows are written."
+    )
+    parser.add_argument(
+        "--form-cache-days", type=int, default=60,
+        help="Evict runners from the form cache after this many days unseen."
+    )
+    parser.add_argument(
+        "--form-fresh-hours", type=float, default=12,
+        help="Skip FULL FORM when every runner's form was read within this many hours."
+    )
+    parser.add_argument(
+        "--parquet-dir",
+        help="Also write typed Parquet datasets here, partitioned by code and meeting date."
+    )
+    parser.add_argument("--run-id", help="Identifies the run for --resume (default: today's date).")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Keep venues already written by an interrupted run with the same run id."
+    )
+    parser.add_argument(
+        "--archive-dir",
+        help="Keep the raw page text of every venue here, gzipped, for re-parsing with snapshot_archive.py."
+    )
+    parser.add_argument(
+        "--full-browser", action="store_true",
+        help="Run Chrome with its default profile instead of the lean headless one that blocks images, fonts and trackers."
+    )
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="Run on the warm browser of browser_daemon.py instead of starting Chrome; falls back to a local run."
+    )
+    parser.add_argument("--daemon-dir", default=DAEMON_DIR, help="Directory of the browser daemon to submit to.")
+    parser.add_argument(
+        "--fingerprints",
+        help="Keep a hash of each venue's page text here; venues unchanged since the last run are not re-parsed."
+    )
+    parser.add_argument(
+        "--sqlite",
+        help="Also upsert meetings, runners, odds and form runs into this SQLite database."
+    )
+    parser.add_argument(
+        "--stats",
+        help="Keep per-runner statistics (win rate, best times by track and distance, ...) in this JSON file, "
+             "updated from each run's form rows."
+    )
+    parser.add_argument(
+        "--race-results", action="store_true",
+        help="Also write each historical race once (race_results.csv) and the form rows as slim runs referencing it (race_runs.csv)."
+    )
+    parser.add_argument(
+        "--max-browser-mb", type=float, default=0,
+        help="Recycle the browser session between venues once Chrome and ChromeDriver use more than this "
+             "much resident memory (needs psutil; single-browser runs)."
+    )
+    parser.add_argument(
+        "--recycle-after", type=int, default=0,
+        help="Recycle the browser session after this many venues (single-browser runs)."
+    )
+    parser.add_argument(
+        "--follow-jumps", action="store_true",
+        help="Keep re-scraping each race, more often as its jump approaches, until every race has jumped."
+    )
+    args = parser.parse_args(argv)
+    if args.follow_jumps and (args.engine != "browser" or args.workers > 1):
+        parser.error("--follow-jumps needs the browser engine and a single worker")
+    if args.follow_jumps and args.fingerprints:
+        parser.error("--fingerprints cannot be combined with --follow-jumps")
+    return args
+
+
+def make_sink(output_dir, run_id=None, resume=False):
+    """
+    Creates the streaming writer for race_data.csv and full_form_data.csv.
+    """
+    return CsvVenueSink(
+        output_dir, 'race_data.csv', 'full_form_data.csv',
+        race_columns=build_dataframe([]).columns,
+        form_columns=FORM_OUTPUT_COLUMNS,
+        run_id=run_id, resume=resume,
+    )
 
-    race_output = pd.concat(scraped_race_data, ignore_index=True)
-    form_output = pd.concat(scraped_form_data, ignore_index=True)[[
-        'Greyhound', 'Plc', 'Date', 'Track', 'Days', 'Distance', 'Mgn',
-        'Class', 'Box', 'In Run', 'Price', 'Time', 'Placing'
-    ]]
 
-    os.makedirs('../data', exist_ok=True)
-    form_output.to_csv('../data/full_form_data.csv', index=False)
-    race_output.to_csv('../data/race_data.csv', index=False)
+def main(argv=None, driver=None):
+    args = parse_args(argv)
+    if args.daemon and driver is None:
+        try:
+            reply = submit('G', sys.argv[1:] if argv is None else argv, args.daemon_dir)
+            if not reply['ok']:
+                sys.exit(1)
+            return
+        except DaemonUnavailable as e:
+            print(f"Browser daemon not reachable ({e}), scraping in this process.")
+
+    form_cache = None
+    if args.form_cache:
+        form_cache = FormCache(args.form_cache, args.form_cache_days, args.form_fresh_hours)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    sink = make_sink(args.output_dir, args.run_id, args.resume)
+    fingerprints = None
+    if args.fingerprints:
+        fingerprints = VenueFingerprints(
+            args.fingerprints, 'G', sources=(__file__,), runner_column='Name', reuse_form=form_cache is None
+        )
+        sink = FingerprintSink(sink, fingerprints)
+    if args.sqlite:
+        sink = TeeSink(sink, RaceStore(args.sqlite, 'G'))
+    if args.stats:
+        sink = TeeSink(sink, RunnerStats(args.stats))
+    sink = MeteredSink(sink)
+    archive = SnapshotArchive(args.archive_dir) if args.archive_dir else None
+
+    if args.engine == "http":
+        engine = HttpEngine(make_backend(args.fetch_backend), args.lobby_url, record_dir=args.record_dir)
+        try:
+            australian_locations, _, _ = scrape_races_http(
+                engine,
+                lambda text: parse_australian_race_locations([text]),
+                lambda name, race_data, form_data: parse_venue(
+                    name, race_data, form_data, form_cache, archive, fingerprints
+                ),
+                sink,
+            )
+        finally:
+            engine.close()
+    elif args.engine == "cdp":
+        driver = driver or start_chrome(lean=not args.full_browser)
+        try:
+            australian_locations, _, _ = scrape_races_cdp(
+                debugger_address(driver), args.lobby_url,
+                lambda text: parse_australian_race_locations([text]),
+                lambda name, race_data, form_data: parse_venue(
+                    name, race_data, form_data, form_cache, archive, fingerprints
+                ),
+                sink, tabs=args.tabs,
+                need_form=lambda name, race_data: needs_full_form(name, race_data, form_cache),
+                blocked_urls=driver.blocked_urls,
+            )
+        finally:
+            driver.quit()
+    else:
+        # A browser daemon lends its own session, which is not ours to recycle
+        lent_driver = driver is not None
+        driver = driver or start_chrome(lean=not args.full_browser)
+        with METRICS.stage("lobby"):
+            australian_locations = load_lobby(driver, args.lobby_url)
+            race_urls = collect_race_urls(driver, australian_locations)
+            tile_texts = collect_tile_texts(driver, australian_locations)
+        print(f"Found direct links for {len(race_urls)}/{len(australian_locations)} venues")
+        scheduler = JumpScheduler()
+        for name in australian_locations:
+            if name not in sink.completed():
+                scheduler.add(name, tile_texts.get(name))
+        pending = scheduler.order()
+
+        if args.workers > 1:
+            driver.quit()
+            scrape_in_parallel(
+                make_driver=lambda: start_chrome(lean=not args.full_browser),
+                open_lobby=lambda d: load_lobby(d, args.lobby_url, report=False),
+                scrape_venue=lambda d, name: scrape_venue(
+                    d, name, args.lobby_url, race_urls.get(name), form_cache, archive, fingerprints=fingerprints,
+                    race_urls=race_urls
+                ),
+                locations=pending,
+                workers=args.workers,
+                min_interval=args.min_interval,
+                sink=sink,
+            )
+        elif args.follow_jumps:
+            try:
+                follow_jumps(
+                    scheduler,
+                    lambda name, with_form: scrape_venue(
+                        driver, name, args.lobby_url, race_urls.get(name), form_cache, archive, with_form,
+                        race_urls=race_urls
+                    ),
+                    lambda race_df: race_df['Race'].dropna().tolist(),
+                    sink,
+                )
+            finally:
+                driver.quit()
+        else:
+            watchdog = None
+            if (args.max_browser_mb or args.recycle_after) and not lent_driver:
+                watchdog = BrowserWatchdog(
+                    driver, lambda: start_chrome(lean=not args.full_browser), args.max_browser_mb, args.recycle_after
+                )
+            try:
+                scrape_races(
+                    driver, pending, args.lobby_url, race_urls, form_cache, sink, archive, fingerprints, watchdog
+                )
+            finally:
+                if watchdog is None:
+                    driver.quit()
+                else:
+                    watchdog.quit()
+                    watchdog.print_summary()
+                    watchdog.write_json(os.path.join(args.output_dir, 'browser_memory.json'))
+
+        RECORDER.print_summary()
+        RECORDER.write_json(os.path.join(args.output_dir, 'wait_latency.json'))
+        NAVIGATIONS.print_summary()
+        NAVIGATIONS.write_json(os.path.join(args.output_dir, 'navigation_metrics.json'))
+
+    sink.finalize(australian_locations)
+    if args.parquet_dir:
+        with METRICS.stage("parquet"):
+            write_typed_outputs(
+                os.path.join(args.output_dir, 'race_data.csv'), os.path.join(args.output_dir, 'full_form_data.csv'),
+                args.parquet_dir, 'G', datetime.now().strftime('%Y-%m-%d')
+            )
+    if args.race_results:
+        with METRICS.stage("race_results"):
+            write_race_results(
+                os.path.join(args.output_dir, 'full_form_data.csv'), os.path.join(args.output_dir, 'race_results.csv'),
+                os.path.join(args.output_dir, 'race_runs.csv'), 'G'
+            )
+    if form_cache is not None:
+        with METRICS.stage("form_cache_save"):
+            form_cache.save()
 
-    driver.quit()
+    METRICS.print_summary()
+    METRICS.write_json(os.path.join(args.output_dir, 'run_metrics.json'))
+    METRICS.write_prometheus(os.path.join(args.output_dir, 'run_metrics.prom'), code='G')
 
 
 if __name__ == "__main__":
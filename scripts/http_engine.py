@@ -0,0 +1,335 @@
+"""
+Browserless scraping engine: fetches lobby and race pages over plain HTTP and reads
+the same runner-card and FULL FORM text the browser engine does, without Chrome.
+
+Pages are fetched through a pluggable backend (`requests` with a pooled keep-alive
+session, or the standard library) and parsed with lxml. A page may be HTML that
+contains the rendered lobby/race markup, or a JSON document in the shape returned
+by `dom_extract.extract_page`, e.g. {"cards": [{"text": ...}], "forms": [...]}.
+
+The engine does not run JavaScript. Unibet's racing pages are a client-rendered
+single-page app, so a plain GET of the live site returns the app shell without
+lobby tiles or runner cards, and recording such a GET records the same shell. The
+engine only works against pages that already hold the rendered markup: the local
+fixture site of the benchmarks, or a prerendering proxy in front of the live site.
+`--record-dir` saves what it fetched from those, so a run can be replayed offline
+by `benchmarks/fixture_site.ReplaySite`. A lobby with no rendered lobby text is
+reported as such instead of being read as empty.
+"""
+import http.client
+import json
+import os
+import threading
+from urllib.parse import urljoin, urlsplit
+
+try:
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_html = None
+
+from run_metrics import METRICS
+
+LOBBY_SELECTOR = ".css-1kd0cbg"
+TILE_SELECTOR = ".sc-kVUOzj.knIZUY"
+CARD_SELECTOR = ".css-10arllf"
+FORM_SELECTOR = ".sc-jNwOwP.drZjiD"
+
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'dd', 'div', 'dl', 'dt', 'fieldset',
+    'figure', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header', 'hr',
+    'li', 'main', 'nav', 'ol', 'p', 'pre', 'section', 'table', 'tr', 'ul', 'button',
+}
+SKIP_TAGS = {'script', 'style', 'noscript', 'template'}
+
+
+class Response:
+    def __init__(self, url, status, content_type, body):
+        self.url = url
+        self.status = status
+        self.content_type = content_type
+        self.body = body
+
+    @property
+    def text(self):
+        return self.body.decode('utf-8', errors='replace')
+
+
+class RequestsBackend:
+    """
+    Fetches with a single `requests.Session`, which pools and keeps alive connections per host.
+    """
+
+    def __init__(self, pool_size=10, timeout=30):
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url):
+        r = self.session.get(url, timeout=self.timeout)
+        return Response(r.url, r.status_code, r.headers.get('Content-Type', ''), r.content)
+
+    def close(self):
+        self.session.close()
+
+
+class UrllibBackend:
+    """
+    Standard-library backend that keeps one persistent connection per host and thread.
+    """
+
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+        self._local = threading.local()
+        # Every thread's pool, so close() reaches connections opened by other threads
+        self._pools = []
+        self._lock = threading.Lock()
+
+    def _connection(self, scheme, netloc):
+        pool = getattr(self._local, 'pool', None)
+        if pool is None:
+            pool = self._local.pool = {}
+            with self._lock:
+                self._pools.append(pool)
+        key = (scheme, netloc)
+        if key not in pool:
+            cls = http.client.HTTPSConnection if scheme == 'https' else http.client.HTTPConnection
+            pool[key] = cls(netloc, timeout=self.timeout)
+        return pool[key]
+
+    def get(self, url):
+        parts = urlsplit(url)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        for attempt in range(2):
+            conn = self._connection(parts.scheme, parts.netloc)
+            try:
+                conn.request('GET', path, headers={'Connection': 'keep-alive'})
+                r = conn.getresponse()
+                return Response(url, r.status, r.getheader('Content-Type', ''), r.read())
+            except (http.client.HTTPException, ConnectionError):
+                # The server closed an idle keep-alive connection; reconnect once
+                conn.close()
+                self._local.pool.pop((parts.scheme, parts.netloc), None)
+                if attempt:
+                    raise
+
+    def close(self):
+        with self._lock:
+            pools, self._pools = self._pools, []
+        for pool in pools:
+            for conn in list(pool.values()):
+                conn.close()
+            pool.clear()
+
+
+BACKENDS = {
+    'requests': RequestsBackend,
+    'urllib': UrllibBackend,
+}
+
+
+def make_backend(name='requests', **kwargs):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown fetch backend '{name}', expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name](**kwargs)
+
+
+def css_to_xpath(css_selector):
+    """
+    Converts a compound class selector such as '.sc-jNwOwP.drZjiD' to XPath.
+    """
+    classes = [c for c in css_selector.split('.') if c]
+    if not classes or css_selector[0] != '.':
+        raise ValueError(f"Only class selectors are supported, got '{css_selector}'")
+    tests = " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {c} ')" for c in classes
+    )
+    return f"//*[{tests}]"
+
+
+def inner_text(element):
+    """
+    Approximates the browser's innerText: block elements and <br> break lines,
+    whitespace inside a line is collapsed and blank lines are dropped.
+    """
+    parts = []
+
+    def walk(el):
+        tag = el.tag if isinstance(el.tag, str) else None
+        if tag in SKIP_TAGS:
+            return
+        if tag == 'br' or tag in BLOCK_TAGS:
+            parts.append('\n')
+        if tag and el.text:
+            parts.append(el.text)
+        for child in el:
+            walk(child)
+            if child.tail:
+                parts.append(child.tail)
+        if tag in BLOCK_TAGS:
+            parts.append('\n')
+
+    walk(element)
+    lines = (' '.join(line.split()) for line in ''.join(parts).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+
+class Page:
+    """
+    A fetched page, queryable by class selector for text and links.
+    """
+
+    def __init__(self, response):
+        self.url = response.url
+        self.json = None
+        self.tree = None
+        if 'json' in response.content_type:
+            self.json = json.loads(response.body)
+        else:
+            if lxml_html is None:
+                raise ImportError("The HTTP engine needs lxml to parse HTML: pip install lxml")
+            self.tree = lxml_html.fromstring(response.body)
+
+    def texts(self, css_selector, key=None):
+        if self.json is not None:
+            return [item['text'] for item in self.json.get(key, []) if item.get('text')]
+        texts = (inner_text(el) for el in self.tree.xpath(css_to_xpath(css_selector)))
+        return [text for text in texts if text]
+
+    def links(self, css_selector, key=None):
+        """
+        Returns [(heading text, absolute href)] for each element matching `css_selector`.
+        """
+        if self.json is not None:
+            return [
+                (item.get('name', ''), urljoin(self.url, item.get('href', '')))
+                for item in self.json.get(key, []) if item.get('href')
+            ]
+        links = []
+        for el in self.tree.xpath(css_to_xpath(css_selector)):
+            heading = el.xpath('.//h5')
+            anchor = el.xpath('ancestor-or-self::a[@href] | .//a[@href]')
+            href = anchor[0].get('href') if anchor else el.get('data-href')
+            if heading and href:
+                links.append((inner_text(heading[0]), urljoin(self.url, href)))
+        return links
+
+
+class HttpEngine:
+    """
+    Reads the racing lobby and race pages over HTTP through `backend`.
+    Every fetched response is saved to `record_dir` when given, so it can be
+    replayed later by a local stand-in server.
+    """
+
+    def __init__(self, backend, lobby_url, form_suffix='', record_dir=None):
+        self.backend = backend
+        self.lobby_url = lobby_url
+        self.form_suffix = form_suffix
+        self.record_dir = record_dir
+
+    def fetch(self, url):
+        response = self.backend.get(url.split('#')[0])
+        if response.status != 200:
+            raise IOError(f"GET {url} returned HTTP {response.status}")
+        if self.record_dir:
+            record_response(self.record_dir, response)
+        return Page(response)
+
+    def lobby(self):
+        return self.fetch(self.lobby_url)
+
+    def lobby_text(self, lobby=None):
+        lobby = lobby or self.lobby()
+        return '\n'.join(lobby.texts(LOBBY_SELECTOR, key='lobby'))
+
+    def race_urls(self, locations, lobby=None):
+        lobby = lobby or self.lobby()
+        links = lobby.links(TILE_SELECTOR, key='tiles')
+        race_urls = {}
+        for location in locations:
+            for name, href in links:
+                if location in name:
+                    race_urls[location] = href
+                    break
+        return race_urls
+
+    def race_page(self, race_url):
+        """
+        Returns (runner lines, form blocks) for a race, shaped like `get_dog_form_elements`.
+        """
+        page = self.fetch(race_url)
+        runner_lines = '\n'.join(page.texts(CARD_SELECTOR, key='cards')).split('\n')
+        form_page = self.fetch(race_url + self.form_suffix) if self.form_suffix else page
+        return runner_lines, form_page.texts(FORM_SELECTOR, key='forms')
+
+    def close(self):
+        self.backend.close()
+
+
+def record_response(record_dir, response):
+    """
+    Saves a response body under `record_dir` and indexes it by URL path in index.json.
+    """
+    os.makedirs(record_dir, exist_ok=True)
+    parts = urlsplit(response.url)
+    key = parts.path + ('?' + parts.query if parts.query else '')
+    file_name = key.strip('/').replace('/', '_').replace('?', '_') or 'index'
+    with open(os.path.join(record_dir, file_name), 'wb') as f:
+        f.write(response.body)
+
+    index_path = os.path.join(record_dir, 'index.json')
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+    index[key] = {'file': file_name, 'content_type': response.content_type}
+    with open(index_path, 'w') as f:
+        json.dump(index, f, indent=2)
+
+
+def scrape_races_http(engine, parse_locations, parse_venue, sink=None):
+    """
+    Scrapes every venue of the lobby over HTTP.
+    `parse_locations(lobby_text)` picks the venues to scrape and
+    `parse_venue(race_name, race_data, form_data)` turns each page into (race_df, form_df).
+    With a `sink`, venues it has already completed are skipped and each venue is
+    written as soon as it is parsed.
+    Returns (locations, race DataFrames, form DataFrames).
+    """
+    lobby = engine.lobby()
+    lobby_text = engine.lobby_text(lobby)
+    if not lobby_text:
+        raise ValueError(
+            f"{engine.lobby_url} has no rendered lobby ({LOBBY_SELECTOR}). The http engine does not run "
+            "JavaScript; point --lobby-url at prerendered pages, or use --engine browser or cdp."
+        )
+    locations = parse_locations(lobby_text)
+    race_urls = engine.race_urls(locations, lobby)
+    completed = sink.completed() if sink is not None else set()
+
+    all_dfs, forms_dfs = [], []
+    for race_name in locations:
+        if race_name in completed:
+            continue
+        if race_name not in race_urls:
+            print(f"Skipping {race_name}, no race link in the lobby.")
+            continue
+        with METRICS.venue(race_name):
+            with METRICS.stage("fetch"):
+                race_data, form_data = engine.race_page(race_urls[race_name])
+            race_df, form_df = parse_venue(race_name, race_data, form_data)
+        if sink is not None:
+            sink.write_venue(race_name, race_df, form_df)
+            continue
+        if race_df is not None:
+            all_dfs.append(race_df)
+        if form_df is not None:
+            forms_dfs.append(form_df)
+    return locations, all_dfs, forms_dfs
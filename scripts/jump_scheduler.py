@@ -0,0 +1,190 @@
+"""
+Jump-time-aware scrape scheduling.
+
+Race labels like "20:20  Sale" carry the jump time. The scheduler keeps each venue's
+next due time and takes, of the venues already due, the one that jumps soonest; when
+none is due it waits for the earliest. Every venue is due at the start, so the races
+closest to jumping are scraped first. After
+each scrape a venue is re-queued with a refresh interval that shrinks as its jump
+approaches. A venue is dropped once its race has jumped, or when its page has no
+runners left (finished or abandoned). A venue whose scrape fails is retried after a
+growing delay, and dropped after repeated failures.
+"""
+import itertools
+import re
+import time
+from datetime import datetime, timedelta
+
+from selenium.common.exceptions import WebDriverException
+
+JUMP_TIME = re.compile(r'\b([01]?\d|2[0-3]):([0-5]\d)\b')
+
+# (time to jump above which the step applies, seconds between scrapes), checked in order
+REFRESH_STEPS = [
+    (timedelta(minutes=60), 1200),
+    (timedelta(minutes=30), 600),
+    (timedelta(minutes=10), 300),
+    (timedelta(minutes=2), 60),
+    (timedelta(0), 30),
+]
+
+# Seconds before each retry of a venue whose scrape failed; it is dropped after the last
+RETRY_BACKOFF = [30, 60, 120]
+
+
+def jump_datetime(label, now):
+    """
+    The jump time in `label` ("20:20  Sale") as a datetime on `now`'s date, or None.
+    A time more than 12 hours in the past is taken to be tomorrow's.
+    """
+    match = JUMP_TIME.search(label or '')
+    if not match:
+        return None
+    jump = now.replace(hour=int(match.group(1)), minute=int(match.group(2)), second=0, microsecond=0)
+    if jump < now - timedelta(hours=12):
+        jump += timedelta(days=1)
+    return jump
+
+
+def next_jump(labels, now, grace=timedelta(0)):
+    """The earliest jump in `labels` that has not passed by more than `grace`, or None."""
+    jumps = [jump_datetime(label, now) for label in labels]
+    upcoming = [jump for jump in jumps if jump is not None and jump >= now - grace]
+    return min(upcoming) if upcoming else None
+
+
+def refresh_interval(time_to_jump, steps=REFRESH_STEPS):
+    for threshold, seconds in steps:
+        if time_to_jump > threshold:
+            return seconds
+    return steps[-1][1]
+
+
+class JumpScheduler:
+    """
+    Queue of venues keyed by next due time, then jump time. Due times are read from the
+    clock as venues are added, so venues that are already due are ordered by jump time
+    alone rather than by the microseconds between their `add` calls.
+    """
+
+    def __init__(self, steps=REFRESH_STEPS, grace=timedelta(0), clock=datetime.now, retry_backoff=RETRY_BACKOFF):
+        self.steps = steps
+        self.grace = grace
+        self.clock = clock
+        self.retry_backoff = retry_backoff
+        self.jumps = {}
+        self.failures = {}
+        self._entry = {}
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._entry)
+
+    def _push(self, venue, due):
+        # Races that have already jumped, or whose jump time is unknown, go after the rest
+        jump = self.jumps.get(venue)
+        rank = jump if jump is not None and jump >= due - self.grace else datetime.max
+        self._entry[venue] = (due, rank, next(self._seq), venue)
+
+    def _key(self, entry, now):
+        due, rank, seq, _ = entry
+        return (max(due, now), rank, seq)
+
+    def add(self, venue, label=None):
+        """Queues a venue to be scraped now. `label` is any text with its jump time."""
+        now = self.clock()
+        self.jumps[venue] = jump_datetime(label, now) if label else None
+        self._push(venue, now)
+
+    def order(self):
+        """Venues in the order they will next be scraped."""
+        now = self.clock()
+        return [entry[3] for entry in sorted(self._entry.values(), key=lambda entry: self._key(entry, now))]
+
+    def drop(self, venue, reason):
+        # A venue is usually dropped right after pop() took it off the queue
+        self._entry.pop(venue, None)
+        print(f"Dropping {venue}: {reason}")
+
+    def reschedule(self, venue, labels):
+        """
+        Re-queues a venue after a scrape, using the race labels read from its card.
+        The venue is dropped when none of its races is still to jump.
+        """
+        now = self.clock()
+        jump = next_jump(labels, now, self.grace) or self.jumps.get(venue)
+        if jump is None:
+            self.drop(venue, "no jump time")
+            return False
+        if jump < now - self.grace:
+            self.drop(venue, f"jumped at {jump:%H:%M}")
+            return False
+        self.jumps[venue] = jump
+        self.failures.pop(venue, None)
+        self._push(venue, now + timedelta(seconds=refresh_interval(jump - now, self.steps)))
+        return True
+
+    def retry(self, venue, reason):
+        """
+        Re-queues a venue whose scrape failed after the next `retry_backoff` delay. It is
+        dropped after as many failures in a row as there are delays, or once it has jumped.
+        """
+        now = self.clock()
+        failures = self.failures.get(venue, 0) + 1
+        self.failures[venue] = failures
+        jump = self.jumps.get(venue)
+        if failures > len(self.retry_backoff):
+            self.drop(venue, f"{reason} ({failures} failures in a row)")
+            return False
+        if jump is not None and jump < now - self.grace:
+            self.drop(venue, f"{reason}, and it jumped at {jump:%H:%M}")
+            return False
+        delay = self.retry_backoff[failures - 1]
+        print(f"Retrying {venue} in {delay}s: {reason}")
+        self._push(venue, now + timedelta(seconds=delay))
+        return True
+
+    def pop(self, sleep=time.sleep):
+        """Waits until the next venue is due and returns it, or None when nothing is queued."""
+        if not self._entry:
+            return None
+        now = self.clock()
+        due, _, _, venue = min(self._entry.values(), key=lambda entry: self._key(entry, now))
+        del self._entry[venue]
+        wait = (due - now).total_seconds()
+        if wait > 0:
+            sleep(wait)
+        return venue
+
+
+def follow_jumps(scheduler, scrape_venue, race_labels, sink):
+    """
+    Scrapes venues in scheduler order until every race has jumped.
+
+    `scrape_venue(name, with_form)` returns (race_df, form_df) and `race_labels(race_df)`
+    the race labels of a card. FULL FORM is read on a venue's first scrape only; later
+    scrapes refresh the card and keep the form rows already written. A scrape that
+    times out or fails is retried with backoff (`JumpScheduler.retry`). Returns the
+    number of scrapes.
+    """
+    forms = {}
+    scrapes = 0
+    while len(scheduler):
+        venue = scheduler.pop()
+        first = venue not in forms
+        try:
+            race_df, form_df = scrape_venue(venue, first)
+        except (TimeoutError, WebDriverException) as e:
+            # One slow or broken card must not end the session for every other venue
+            reason = e.msg if isinstance(e, WebDriverException) else e
+            scheduler.retry(venue, f"{e.__class__.__name__}: {reason}")
+            continue
+        scrapes += 1
+        if first:
+            forms[venue] = form_df
+        if race_df is None:
+            scheduler.drop(venue, "no runners on the card (finished or abandoned)")
+            continue
+        sink.write_venue(venue, race_df, forms[venue])
+        scheduler.reschedule(venue, race_labels(race_df))
+    return scrapes
@@ -0,0 +1,192 @@
+"""
+A lean Chrome profile for the scrapers, plus per-navigation transfer and timing metrics.
+
+The scrapers only read text, so the lean profile runs headless with GPU, extensions
+and images off. Through DevTools (`Network.setBlockedURLs`) it also blocks image,
+font and media downloads and known analytics / advertising domains before they
+are requested. DevTools applies the block per tab, so tabs opened later go through
+`block_urls` as well. Every `driver.get` is metered: the time until the page has
+loaded, the bytes received (from Chrome's performance log) and how many requests
+were blocked. `NAVIGATIONS` collects these across all drivers, like readiness.RECORDER.
+"""
+import json
+import threading
+import time
+
+from selenium import webdriver
+
+BLOCKED_URL_PATTERNS = [
+    # Images, fonts and media
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3",
+    # Analytics, tag managers, ads and session recording
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*googlesyndication.com*",
+    "*facebook.net*", "*connect.facebook.com*", "*hotjar.com*", "*segment.io*", "*segment.com*",
+    "*optimizely.com*", "*newrelic.com*", "*nr-data.net*", "*adsrvr.org*", "*bing.com/bat*",
+    "*clarity.ms*", "*tiktok.com*", "*snapchat.com*", "*quantserve.com*", "*scorecardresearch.com*",
+]
+
+LEAN_ARGUMENTS = [
+    "--headless=new",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--mute-audio",
+    "--no-first-run",
+    "--blink-settings=imagesEnabled=false",
+    "--window-size=1366,900",
+]
+
+
+class NavigationLog:
+    """
+    Thread-safe record of every metered navigation: url, seconds until loaded,
+    bytes received, requests made and requests blocked.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.navigations = []
+
+    def add(self, navigation):
+        with self._lock:
+            self.navigations.append(navigation)
+
+    def reset(self):
+        with self._lock:
+            self.navigations = []
+
+    def summary(self):
+        with self._lock:
+            navigations = list(self.navigations)
+        if not navigations:
+            return {}
+        ready = sorted(n['ready_s'] for n in navigations)
+        return {
+            'navigations': len(navigations),
+            'bytes': sum(n['bytes'] for n in navigations),
+            'bytes_per_navigation': sum(n['bytes'] for n in navigations) // len(navigations),
+            'requests': sum(n['requests'] for n in navigations),
+            'blocked': sum(n['blocked'] for n in navigations),
+            'ready_p50_s': round(ready[len(ready) // 2], 3),
+            'ready_max_s': round(ready[-1], 3),
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print(
+            f"{summary['navigations']} navigations, {summary['bytes'] / 1e6:.2f} MB received "
+            f"({summary['bytes_per_navigation'] / 1e3:.0f} kB each), {summary['requests']} requests, "
+            f"{summary['blocked']} blocked, page ready p50 {summary['ready_p50_s']}s max {summary['ready_max_s']}s"
+        )
+
+    def write_json(self, path):
+        with self._lock:
+            navigations = list(self.navigations)
+        with open(path, 'w') as f:
+            json.dump({'summary': self.summary(), 'navigations': navigations}, f, indent=2)
+
+
+NAVIGATIONS = NavigationLog()
+
+
+class NavigationMeter:
+    """
+    Wraps `driver.get` and `driver.quit` so each navigation is timed, and the network
+    events Chrome logged until the next navigation are attributed to it.
+    """
+
+    def __init__(self, driver, log=NAVIGATIONS):
+        self.driver = driver
+        self.log = log
+        self.current = None
+        self._get, self._quit = driver.get, driver.quit
+        driver.get, driver.quit = self.get, self.quit
+        driver.navigation_meter = self
+
+    def _drain(self):
+        if self.current is None:
+            return
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception:
+            entries = []
+        for entry in entries:
+            message = json.loads(entry['message'])['message']
+            method, params = message.get('method'), message.get('params', {})
+            if method == 'Network.requestWillBeSent':
+                self.current['requests'] += 1
+            elif method == 'Network.loadingFinished':
+                self.current['bytes'] += int(params.get('encodedDataLength', 0))
+            elif method == 'Network.loadingFailed' and params.get('blockedReason'):
+                self.current['blocked'] += 1
+
+    def flush(self):
+        """Attributes logged network events to the current navigation and records it."""
+        self._drain()
+        if self.current is not None:
+            self.log.add(self.current)
+            self.current = None
+
+    def get(self, url):
+        self.flush()
+        start = time.perf_counter()
+        self._get(url)
+        self.current = {
+            'url': url, 'ready_s': round(time.perf_counter() - start, 3),
+            'bytes': 0, 'requests': 0, 'blocked': 0,
+        }
+
+    def quit(self):
+        self.flush()
+        self._quit()
+
+
+def chrome_options(lean=True, user_data_dir=None):
+    options = webdriver.ChromeOptions()
+    # Network events for the byte counts
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    if user_data_dir:
+        # A persistent profile keeps the HTTP cache and cookies between sessions
+        options.add_argument(f"--user-data-dir={user_data_dir}")
+    if lean:
+        for argument in LEAN_ARGUMENTS:
+            options.add_argument(argument)
+        options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.managed_default_content_settings.media_stream': 2,
+        })
+    return options
+
+
+def start_chrome(lean=True, blocked_urls=BLOCKED_URL_PATTERNS, log=NAVIGATIONS, user_data_dir=None):
+    """
+    Starts Chrome with the lean profile (or Chrome's defaults with `lean=False`),
+    with every navigation metered into `log`. With `user_data_dir`, Chrome keeps its
+    profile and cache there.
+    """
+    driver = webdriver.Chrome(options=chrome_options(lean, user_data_dir))
+    # Kept on the driver, so tabs opened later get the same blocking through block_urls()
+    driver.blocked_urls = list(blocked_urls or []) if lean else []
+    block_urls(driver)
+    NavigationMeter(driver, log)
+    return driver
+
+
+def block_urls(driver, blocked_urls=None):
+    """
+    Enables network events and blocks `blocked_urls` (by default the driver's own
+    list from start_chrome) in the driver's current tab. DevTools applies the block
+    per tab, so call it again after switching to every newly opened tab.
+    """
+    if blocked_urls is None:
+        blocked_urls = getattr(driver, 'blocked_urls', [])
+    driver.execute_cdp_cmd('Network.enable', {})
+    if blocked_urls:
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': list(blocked_urls)})
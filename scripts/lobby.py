@@ -0,0 +1,166 @@
+"""
+The racing lobby: venue tiles, their race links, and the lobby text parsed into
+structured entries.
+
+`parse_lobby` reads the lobby text in one pass into one entry per venue:
+
+    {'code': 'G', 'country': 'Australia', 'venue': 'Sale', 'next_jump': '19:42', 'status': 'open'}
+
+A venue's status comes from the words on its tile: 'abandoned' for an abandoned
+meeting, 'finished' for a resulted or closed one or one with no open races, and
+'open' otherwise. A tile lists a resulted or closed race above the next one still
+to run, so 'finished' only holds for a venue without a next jump time; only
+'abandoned' overrides one. `venues_to_scrape` leaves finished and abandoned meetings out, so
+they are never navigated to, and counts the venue visits saved in the run metrics.
+"""
+import re
+
+from jump_scheduler import JUMP_TIME
+from run_metrics import METRICS
+
+# Section headings of the lobby; the venues after one are that country's
+COUNTRIES = [
+    "Australia", "Brazil", "Canada", "Chile", "France", "Germany", "Italy", "Japan", "Korea",
+    "Malaysia", "New Zealand", "South Africa", "Turkey", "UK & Ireland", "United States",
+]
+HOME_COUNTRY = "Australia"
+# Tile words of meetings with no races left to run
+STATUS_WORDS = re.compile(r'\b(abandoned|resulted|finished|closed|no open races)\b', re.IGNORECASE)
+SKIPPED_STATUSES = ('finished', 'abandoned')
+
+TILE_SELECTOR = ".sc-kVUOzj.knIZUY"
+
+# Reads every venue tile in one call: its heading, the route it links to, if any,
+# and its full text (which carries the next jump time).
+RACE_LINKS_SCRIPT = """
+return Array.from(document.querySelectorAll(arguments[0])).map(function (tile) {
+  var heading = tile.querySelector('h5');
+  var link = tile.closest('a[href]') || tile.querySelector('a[href]');
+  var href = link ? link.href : (tile.getAttribute('data-href') || tile.getAttribute('href') || '');
+  return {name: heading ? heading.textContent.trim() : '', href: href, text: (tile.innerText || '').trim()};
+});
+"""
+
+
+def read_tiles(driver, tile_selector=TILE_SELECTOR):
+    """
+    Reads every venue tile of the lobby currently loaded in `driver`.
+    Returns [{'name': ..., 'href': ..., 'text': ...}, ...].
+    """
+    return driver.execute_script(RACE_LINKS_SCRIPT, tile_selector) or []
+
+
+def collect_race_urls(driver, locations, tile_selector=TILE_SELECTOR):
+    """
+    Reads the race page URL of each location from the lobby currently loaded in `driver`.
+    Returns {location: url}; locations whose tile exposes no link are left out.
+    """
+    return match_race_urls(read_tiles(driver, tile_selector), locations)
+
+
+def match_race_urls(tiles, locations):
+    """
+    Picks the race page URL of each location from tiles read by `read_tiles`.
+    Returns {location: url}; locations whose tile exposes no link are left out.
+    """
+    race_urls = {}
+    for location in locations:
+        for tile in tiles:
+            if location in tile['name'] and tile['href']:
+                race_urls[location] = tile['href']
+                break
+    return race_urls
+
+
+def remember_race_url(race_urls, location, url, lobby_url):
+    """
+    Records the race page a clicked tile led to, so later visits to `location` (the
+    next race of a followed meeting, a retry) open it directly instead of reloading
+    the lobby. A click that left the lobby URL unchanged records nothing.
+    Returns True if a URL was recorded.
+    """
+    if not url or url == lobby_url or location in race_urls:
+        return False
+    race_urls[location] = url
+    METRICS.count("race_urls_learned")
+    return True
+
+
+def collect_tile_texts(driver, locations, tile_selector=TILE_SELECTOR):
+    """
+    Returns {location: text of its tile}, e.g. the venue name and next jump time.
+    """
+    tiles = read_tiles(driver, tile_selector)
+    texts = {}
+    for location in locations:
+        for tile in tiles:
+            if location in tile['name']:
+                texts[location] = tile.get('text', '')
+                break
+    return texts
+
+
+def line_status(line):
+    """The status a tile line announces ('abandoned' or 'finished'), or None."""
+    match = STATUS_WORDS.search(line)
+    if not match:
+        return None
+    return 'abandoned' if match.group(1).lower() == 'abandoned' else 'finished'
+
+
+def parse_lobby(text, code):
+    """
+    Parses the lobby text into [{'code', 'country', 'venue', 'next_jump', 'status'}, ...],
+    in lobby order. Lines before the first country heading are ignored.
+    """
+    countries = {country.lower(): country for country in COUNTRIES}
+    entries = []
+    country = entry = None
+    for line in (text or '').split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if line.lower() in countries:
+            country, entry = countries[line.lower()], None
+            continue
+        if country is None:
+            continue
+        status = line_status(line)
+        if status is not None:
+            if entry is not None and entry['status'] != 'abandoned':
+                entry['status'] = status
+            continue
+        if line[0].isdigit() or line.startswith((':', '-', ',')):
+            match = JUMP_TIME.search(line)
+            if entry is not None and match and entry['next_jump'] is None:
+                entry['next_jump'] = match.group(0)
+            continue
+        entry = {'code': code, 'country': country, 'venue': line, 'next_jump': None, 'status': 'open'}
+        entries.append(entry)
+    for entry in entries:
+        # "R1 Resulted" above an open race's jump time: the meeting is still running
+        if entry['status'] == 'finished' and entry['next_jump'] is not None:
+            entry['status'] = 'open'
+    return entries
+
+
+def venues_to_scrape(entries, country=HOME_COUNTRY, report=True):
+    """
+    Names of `country`'s venues that still have races to run. With `report`, the
+    finished and abandoned meetings left out are counted and printed as visits saved.
+    """
+    entries = [entry for entry in entries if entry['country'] == country]
+    venues = [entry['venue'] for entry in entries if entry['status'] not in SKIPPED_STATUSES]
+    if report:
+        skipped = {status: sum(1 for entry in entries if entry['status'] == status) for status in SKIPPED_STATUSES}
+        for status, n in skipped.items():
+            if n:
+                METRICS.count(f"lobby_{status}", n)
+        saved = len(entries) - len(venues)
+        if saved:
+            METRICS.count("venue_visits_saved", saved)
+        print(
+            f"Lobby: {len(venues)} of {len(entries)} venues in {country} open, {skipped['finished']} finished "
+            f"and {skipped['abandoned']} abandoned skipped ({saved} venue visits saved)"
+        )
+    return venues
@@ -0,0 +1,208 @@
+"""
+Odds polling mode: keeps every Australian race page open in its own tab and re-reads
+only the Win/Place prices at a fixed interval, writing a tick whenever a price changes.
+
+Race pages are opened once. Each poll is one script call per tab that returns, for
+every runner card, its label line and trailing price lines. The runner metadata is
+never re-parsed and FULL FORM is never opened. Ticks are appended to a CSV:
+
+    python odds_poller.py --code G --interval 3 --duration 1800 --output ../data/odds_ticks.csv
+"""
+import argparse
+import csv
+import os
+import time
+from datetime import datetime
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from lean_browser import block_urls, start_chrome
+from lobby import collect_race_urls
+from readiness import RECORDER, wait_until
+from scraper_loader import SCRAPER_FILES, load_scraper
+
+CARD_SELECTOR = ".css-10arllf"
+TICK_COLUMNS = ['captured_at', 'code', 'venue', 'race', 'runner', 'win', 'place', 'status']
+
+# For each runner card: the race it belongs to, its label ("Name (3)" / "1. Name (3)")
+# and the numeric lines it ends with, the last two of which are its Win and Place prices.
+ODDS_SCRIPT = """
+var race = null, rows = [];
+Array.from(document.querySelectorAll(arguments[0])).forEach(function (card) {
+  var lines = (card.innerText || '').split('\\n').map(function (l) { return l.trim(); })
+    .filter(function (l) { return l; });
+  lines.forEach(function (l) { if (/^\\d{2}:\\d{2}\\s/.test(l)) { race = l; } });
+  var label = lines.find(function (l) { return /\\(\\d+\\)$/.test(l); });
+  if (!label) { return; }
+  var prices = [];
+  for (var i = lines.length - 1; i >= 0 && /^\\d+(\\.\\d+)?$/.test(lines[i]); i--) { prices.unshift(lines[i]); }
+  // Like the card parsers: the last two numbers are Win and Place
+  var n = prices.length;
+  rows.push([race, label, n >= 2 ? prices[n - 2] : (n ? prices[0] : null), n >= 2 ? prices[n - 1] : null,
+             lines.indexOf('Scratched') >= 0 ? 'Scratched' : 'Active']);
+});
+return rows;
+"""
+
+
+class OddsTickStore:
+    """
+    Append-only CSV of price changes. Only rows whose (win, place, status) differ from
+    the last value seen for that runner are written.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.last = {}
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', newline='')
+        self._writer = csv.writer(self._file)
+        if new_file:
+            self._writer.writerow(TICK_COLUMNS)
+
+    def record(self, captured_at, code, venue, rows):
+        """Writes the changed rows of one tab read. Returns how many were written."""
+        written = 0
+        for race, runner, win, place, status in rows:
+            key = (code, venue, race, runner)
+            if self.last.get(key) == (win, place, status):
+                continue
+            self.last[key] = (win, place, status)
+            self._writer.writerow([captured_at, code, venue, race, runner, win, place, status])
+            written += 1
+        if written:
+            self._file.flush()
+        return written
+
+    def close(self):
+        self._file.close()
+
+
+class OddsPoller:
+    """
+    Holds one tab per race page in a single browser and polls their prices.
+    """
+
+    def __init__(self, driver, code, store, card_selector=CARD_SELECTOR):
+        self.driver = driver
+        self.code = code
+        self.store = store
+        self.card_selector = card_selector
+        self.tabs = {}
+
+    def read_odds(self):
+        return self.driver.execute_script(ODDS_SCRIPT, self.card_selector) or []
+
+    def open(self, race_urls, timeout=45):
+        """Opens each venue's race page in its own tab and waits for its runner cards."""
+        for venue, url in race_urls.items():
+            if self.tabs:
+                self.new_tab()
+            self.driver.get(url)
+            try:
+                wait_until(self.driver, "odds_cards", lambda d: self.read_odds(), timeout)
+            except TimeoutException:
+                print(f"No runner cards for {venue} within {timeout} seconds, not polling it.")
+                continue
+            self.tabs[venue] = (self.driver.current_window_handle, url)
+        print(f"Polling odds in {len(self.tabs)} tabs")
+
+    def new_tab(self):
+        """Opens a tab, with the lean profile's URL blocking, and switches to it."""
+        handles = self.driver.window_handles
+        if handles:
+            # New Window needs a live current window; the current one may be the tab that died
+            self.driver.switch_to.window(handles[-1])
+        self.driver.switch_to.new_window('tab')
+        block_urls(self.driver)
+
+    def reopen(self, venue, url, in_place):
+        """
+        Reloads a venue's page after a failed read: in its own tab when that tab is still
+        the current one (`in_place`), otherwise in a new tab, so no other venue's tab is
+        navigated away. A failure is reported and retried on the next cycle.
+        """
+        try:
+            if not in_place:
+                self.new_tab()
+                # Kept before loading, so a failed load is retried in this tab, not yet another one
+                self.tabs[venue] = (self.driver.current_window_handle, url)
+            self.driver.get(url)
+        except WebDriverException as e:
+            print(f"Could not reopen {venue} ({e.__class__.__name__}), retrying next cycle")
+
+    def poll_once(self):
+        """Reads every tab once. Returns the number of ticks written."""
+        written = 0
+        for venue, (handle, url) in list(self.tabs.items()):
+            switched = False
+            try:
+                self.driver.switch_to.window(handle)
+                switched = True
+                rows = self.read_odds()
+            except WebDriverException as e:
+                print(f"Reopening {venue} after failed read: {e.__class__.__name__}")
+                self.reopen(venue, url, in_place=switched)
+                continue
+            captured_at = datetime.now().isoformat(timespec='milliseconds')
+            written += self.store.record(captured_at, self.code, venue, rows)
+        return written
+
+    def run(self, interval=3.0, duration=None):
+        """
+        Polls every `interval` seconds until `duration` seconds have passed (or forever).
+        Cycle times are recorded as the "odds_cycle" wait; a cycle longer than the
+        interval is reported because it means the refresh target is not being met.
+        """
+        started = time.monotonic()
+        cycles = ticks = 0
+        while duration is None or time.monotonic() - started < duration:
+            cycle_start = time.monotonic()
+            with RECORDER.record("odds_cycle"):
+                ticks += self.poll_once()
+            cycles += 1
+            elapsed = time.monotonic() - cycle_start
+            if elapsed > interval:
+                print(f"Poll cycle took {elapsed:.2f}s across {len(self.tabs)} tabs, over the {interval}s interval")
+            time.sleep(max(0.0, interval - elapsed))
+        print(f"{cycles} poll cycles, {ticks} price changes written")
+        return cycles, ticks
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Poll Win/Place odds of every open Australian race.")
+    parser.add_argument("--code", choices=sorted(SCRAPER_FILES), default="G", help="Racing code.")
+    parser.add_argument("--lobby-url", help="Racing lobby to read the race pages from.")
+    parser.add_argument("--interval", type=float, default=3.0, help="Seconds between polls of each race.")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds (default: run until stopped).")
+    parser.add_argument("--output", default="../data/odds_ticks.csv", help="Append-only CSV of price changes.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    scraper = load_scraper(args.code)
+    lobby_url = args.lobby_url or scraper.LOBBY_URL
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    store = OddsTickStore(args.output)
+    driver = start_chrome()
+    try:
+        locations = scraper.load_lobby(driver, lobby_url)
+        race_urls = collect_race_urls(driver, locations)
+        missing = [name for name in locations if name not in race_urls]
+        if missing:
+            print(f"No direct race link for {', '.join(missing)}, not polling them.")
+        poller = OddsPoller(driver, args.code, store)
+        poller.open(race_urls)
+        poller.run(args.interval, args.duration)
+    except KeyboardInterrupt:
+        print("Stopped.")
+    finally:
+        driver.quit()
+        store.close()
+        RECORDER.print_summary()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Normalized race results: each historical race once, plus slim per-runner runs.
+
+Every runner in a historical race has its own form row repeating the race's date,
+track, distance, class and placings. `normalize_form` folds those rows into one
+row per race in a races table and keeps, per form row, only what belongs to the
+runner (finish, margin, box or barrier, In Run, price, times) and a `race_id`:
+
+    races, runs = normalize_form(form_df, 'G')
+    runs.merge(races, on='race_id')        # back to the full form rows
+
+Rows are the same race when date, track, distance, class and field size match and
+their placings agree. A runner's Placing block leaves out the runner itself, so
+its own Plc position is added before comparing, and the race keeps the union of
+all its rows' placings. Heats run on the same day over the same distance and class
+differ in their placings, so they stay separate races. `race_id` is a hash of the
+race's key and winner, so it is stable between runs. Rows of the same key and
+winner whose placings conflict (a dead heat, a corrected result) are the same race
+under that id; they are merged into one race that keeps every placing line.
+"""
+import hashlib
+import os
+import re
+
+import pandas as pd
+
+PLACING_LINE = re.compile(r'^(\d+)\.\s*(.*)$')
+RUNNER_COLUMN = {'G': 'Greyhound', 'T': 'Horse'}
+RACE_COLUMNS = ['Date', 'Track', 'Distance', 'Class']
+# Race-level columns besides the key, per code
+RACE_EXTRA_COLUMNS = {'G': [], 'T': ['Cond']}
+
+
+def placing_map(placing, plc, runner):
+    """{position: name} from a Placing block, with the runner at its own Plc position."""
+    positions = {}
+    if placing and placing != 'N/A':
+        for line in placing.split('\n'):
+            match = PLACING_LINE.match(line.strip())
+            if match:
+                positions[int(match.group(1))] = match.group(2)
+    finish = plc.split('/', 1)[0]
+    if finish.isdigit():
+        positions.setdefault(int(finish), runner)
+    return positions
+
+
+def _consistent(a, b):
+    if any(a[position] != b[position] for position in a.keys() & b.keys()):
+        return False
+    names_a = {name: position for position, name in a.items()}
+    return all(names_a.get(name, position) == position for position, name in b.items())
+
+
+def race_id(code, key, positions):
+    winner = positions[min(positions)] if positions else ''
+    text = '|'.join([code, *map(str, key), winner])
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:12]
+
+
+def normalize_form(form_df, code):
+    """
+    Splits form rows into (races, runs). `races` has one row per historical race:
+    race_id, the key columns, Field Size and the merged Placing (winner first). `runs` is
+    `form_df` without the race-level columns, plus race_id.
+    """
+    runner_column = RUNNER_COLUMN[code]
+    race_columns = RACE_COLUMNS + [c for c in RACE_EXTRA_COLUMNS[code] if c in form_df]
+    field_size = form_df['Plc'].str.extract(r'/(\d+)$', expand=False).fillna('')
+    keys = list(zip(*(form_df[column] for column in RACE_COLUMNS), field_size))
+
+    # Per key, the races found so far: [positions, row of the first run]
+    candidates = {}
+    assigned = []
+    for row, (key, placing, plc, runner) in enumerate(
+        zip(keys, form_df['Placing'], form_df['Plc'], form_df[runner_column])
+    ):
+        positions = placing_map(placing, plc, runner)
+        races = candidates.setdefault(key, [])
+        for race in races:
+            if _consistent(race[0], positions):
+                race[0].update(positions)
+                assigned.append(race)
+                break
+        else:
+            race = [positions, row]
+            races.append(race)
+            assigned.append(race)
+
+    # Races of one key that share a winner share an id, so their placings are merged
+    merged = {}
+    race_of_row = {}
+    for key, races in candidates.items():
+        for positions, first_row in races:
+            identifier = race_id(code, key, positions)
+            if identifier not in merged:
+                merged[identifier] = [key, first_row, {}]
+            lines = merged[identifier][2]
+            for position, name in sorted(positions.items()):
+                lines.setdefault((position, name), None)
+            race_of_row[first_row] = identifier
+
+    first_rows, identifiers, field_sizes, placings = [], [], [], []
+    for identifier, (key, first_row, lines) in merged.items():
+        first_rows.append(first_row)
+        identifiers.append(identifier)
+        field_sizes.append(key[-1])
+        ordered = sorted(lines, key=lambda line: line[0])
+        placings.append('\n'.join(f"{position}. {name}" for position, name in ordered) or 'N/A')
+    races = form_df[race_columns].iloc[first_rows].reset_index(drop=True)
+    races.insert(0, 'race_id', identifiers)
+    races['Field Size'] = field_sizes
+    races['Placing'] = placings
+
+    runs = form_df.drop(columns=race_columns + ['Placing'])
+    runs.insert(0, 'race_id', [race_of_row[race[1]] for race in assigned])
+    return races, runs.reset_index(drop=True)
+
+
+def head_to_head(runs, first, second, runner_column):
+    """The races both runners ran in, with each one's Plc: who beat whom."""
+    indexed = runs.set_index(runner_column)
+    a = indexed.loc[[first], ['race_id', 'Plc']] if first in indexed.index else None
+    b = indexed.loc[[second], ['race_id', 'Plc']] if second in indexed.index else None
+    if a is None or b is None:
+        return pd.DataFrame(columns=['race_id', first, second])
+    joined = a.merge(b, on='race_id', suffixes=('_a', '_b'))
+    return joined.rename(columns={'Plc_a': first, 'Plc_b': second})
+
+
+def write_race_results(form_csv, races_csv, runs_csv, code):
+    """Normalizes the final form CSV into a races CSV and a runs CSV."""
+    form_df = pd.read_csv(form_csv, dtype=str, keep_default_na=False)
+    races, runs = normalize_form(form_df, code)
+    races.to_csv(races_csv, index=False)
+    runs.to_csv(runs_csv, index=False)
+    before = os.path.getsize(form_csv)
+    after = os.path.getsize(races_csv) + os.path.getsize(runs_csv)
+    print(
+        f"Normalized {len(form_df)} form rows into {len(races)} races and {len(runs)} runs "
+        f"({after / 1024:.0f} KB instead of {before / 1024:.0f} KB)"
+    )
+    return races, runs
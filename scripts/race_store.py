@@ -0,0 +1,244 @@
+"""
+Embedded SQLite store for meetings, races, runners, odds snapshots and form runs.
+
+Every venue is upserted in one transaction, so scraping the same venue again
+updates rows in place instead of duplicating them. Form runs are keyed like the
+form cache, by code, runner, date and track. They are indexed by runner, date and
+track/distance, so a query such as "all runs by this dog at Sale over 435 m" is an
+index lookup:
+
+    store = RaceStore('../data/racing.sqlite')
+    store.runs('Chorus Line', track='Sale', distance=435, code='G')
+
+An odds snapshot is only added when a runner's prices differ from its latest one.
+"""
+import sqlite3
+import threading
+from datetime import datetime
+
+from typed_columns import to_int, to_number
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    meeting_id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL,
+    meeting_date TEXT NOT NULL,
+    venue TEXT NOT NULL,
+    UNIQUE (code, meeting_date, venue)
+);
+CREATE TABLE IF NOT EXISTS races (
+    race_id INTEGER PRIMARY KEY,
+    meeting_id INTEGER NOT NULL REFERENCES meetings (meeting_id),
+    race_label TEXT NOT NULL,
+    race_name TEXT,
+    UNIQUE (meeting_id, race_label)
+);
+CREATE TABLE IF NOT EXISTS runners (
+    runner_id INTEGER PRIMARY KEY,
+    race_id INTEGER NOT NULL REFERENCES races (race_id),
+    name TEXT NOT NULL,
+    number INTEGER,
+    barrier INTEGER,
+    jockey TEXT,
+    trainer TEXT,
+    form TEXT,
+    age_sex TEXT,
+    status TEXT,
+    UNIQUE (race_id, name)
+);
+CREATE TABLE IF NOT EXISTS odds_snapshots (
+    runner_id INTEGER NOT NULL REFERENCES runners (runner_id),
+    captured_at TEXT NOT NULL,
+    win REAL,
+    place REAL,
+    PRIMARY KEY (runner_id, captured_at)
+);
+CREATE TABLE IF NOT EXISTS form_runs (
+    code TEXT NOT NULL,
+    runner TEXT NOT NULL,
+    date TEXT NOT NULL,
+    track TEXT NOT NULL,
+    plc TEXT,
+    days INTEGER,
+    distance INTEGER,
+    margin REAL,
+    class TEXT,
+    box INTEGER,
+    in_run TEXT,
+    cond TEXT,
+    jockey TEXT,
+    weight REAL,
+    price REAL,
+    sect REAL,
+    time REAL,
+    best REAL,
+    placing TEXT,
+    PRIMARY KEY (code, runner, date, track)
+);
+CREATE INDEX IF NOT EXISTS idx_form_runs_runner ON form_runs (runner, track, distance);
+CREATE INDEX IF NOT EXISTS idx_form_runs_date ON form_runs (date);
+CREATE INDEX IF NOT EXISTS idx_form_runs_track_distance ON form_runs (track, distance);
+CREATE INDEX IF NOT EXISTS idx_runners_name ON runners (name);
+"""
+
+# Output column -> store column, for whichever code's columns are present
+RUNNER_COLUMNS = {
+    'name': ['Name', 'Horse Name'],
+    'number': ['Dog number', 'Horse Number'],
+    'barrier': ['Barrier'],
+    'jockey': ['Jockey'],
+    'trainer': ['Trainer'],
+    'form': ['Form'],
+    'age_sex': ['Age/Sex'],
+    'status': ['Status'],
+}
+FORM_COLUMNS = {
+    'runner': ['Greyhound', 'Horse'],
+    'plc': ['Plc'], 'date': ['Date'], 'track': ['Track'], 'days': ['Days'],
+    'distance': ['Distance'], 'margin': ['Mgn'], 'class': ['Class'], 'box': ['Box', 'Bar'],
+    'in_run': ['In Run'], 'cond': ['Cond'], 'jockey': ['Jockey'], 'weight': ['Wgt'],
+    'price': ['Price'], 'sect': ['Sect'], 'time': ['Time'], 'best': ['Best'], 'placing': ['Placing'],
+}
+INTEGER_COLUMNS = {'number', 'barrier', 'days', 'distance', 'box'}
+REAL_COLUMNS = {'margin', 'weight', 'price', 'sect', 'time', 'best', 'win', 'place'}
+
+
+def _column(df, names):
+    for name in names:
+        if name in df:
+            return df[name]
+    return None
+
+
+def store_rows(df, mapping):
+    """
+    Maps an output DataFrame onto store columns, typing the numeric ones.
+    Returns (columns, rows) with None for missing values.
+    """
+    columns, series = [], []
+    for column, names in mapping.items():
+        values = _column(df, names)
+        if values is None:
+            continue
+        if column in INTEGER_COLUMNS:
+            values = to_int(values, 'Int64')
+        elif column in REAL_COLUMNS:
+            values = to_number(values)
+        else:
+            values = values.astype('string').replace({'': None, 'N/A': None})
+        columns.append(column)
+        series.append(values.astype(object).where(values.notna(), None))
+    return columns, list(zip(*series))
+
+
+class RaceStore:
+    """
+    SQLite store usable as a venue sink: `write_venue(venue, race_df, form_df)` upserts
+    one venue for `code` and `meeting_date` in a single transaction.
+    """
+
+    def __init__(self, path, code=None, meeting_date=None):
+        self.path = path
+        self.code = code
+        self.meeting_date = meeting_date or datetime.now().strftime('%Y-%m-%d')
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def completed(self):
+        # Resuming is decided by the CSV sink; the store only ever upserts
+        return set()
+
+    def _meeting_id(self, venue):
+        self.conn.execute(
+            "INSERT INTO meetings (code, meeting_date, venue) VALUES (?, ?, ?) ON CONFLICT DO NOTHING",
+            (self.code, self.meeting_date, venue)
+        )
+        return self.conn.execute(
+            "SELECT meeting_id FROM meetings WHERE code = ? AND meeting_date = ? AND venue = ?",
+            (self.code, self.meeting_date, venue)
+        ).fetchone()[0]
+
+    def _race_id(self, meeting_id, label, race_name):
+        self.conn.execute(
+            "INSERT INTO races (meeting_id, race_label, race_name) VALUES (?, ?, ?) "
+            "ON CONFLICT (meeting_id, race_label) DO UPDATE SET race_name = excluded.race_name",
+            (meeting_id, label, race_name)
+        )
+        return self.conn.execute(
+            "SELECT race_id FROM races WHERE meeting_id = ? AND race_label = ?", (meeting_id, label)
+        ).fetchone()[0]
+
+    def _write_runners(self, meeting_id, race_df, captured_at):
+        labels = _column(race_df, ['Race', 'Race Time']).fillna('').astype(str)
+        race_names = _column(race_df, ['Race Name'])
+        columns, rows = store_rows(race_df, RUNNER_COLUMNS)
+        odds_columns, odds = store_rows(race_df, {'win': ['Win', 'Win Odds'], 'place': ['Place', 'Place Odds']})
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column != 'name')
+
+        race_ids = {}
+        for position, (label, row) in enumerate(zip(labels, rows)):
+            if label not in race_ids:
+                name = race_names.iloc[position] if race_names is not None else None
+                race_ids[label] = self._race_id(meeting_id, label, name)
+            runner_id = self.conn.execute(
+                f"INSERT INTO runners (race_id, {', '.join(columns)}) VALUES (?{', ?' * len(columns)}) "
+                f"ON CONFLICT (race_id, name) DO UPDATE SET {updates} RETURNING runner_id",
+                (race_ids[label], *row)
+            ).fetchone()[0]
+            win, place = odds[position] if odds_columns == ['win', 'place'] else (None, None)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO odds_snapshots (runner_id, captured_at, win, place) "
+                "SELECT ?, ?, ?, ? WHERE NOT EXISTS ("
+                "  SELECT 1 FROM odds_snapshots WHERE runner_id = ? AND win IS ? AND place IS ?"
+                "  AND captured_at = (SELECT MAX(captured_at) FROM odds_snapshots WHERE runner_id = ?))",
+                (runner_id, captured_at, win, place, runner_id, win, place, runner_id)
+            )
+        return len(rows)
+
+    def _write_form(self, form_df):
+        columns, rows = store_rows(form_df, FORM_COLUMNS)
+        keys = ('runner', 'date', 'track')
+        updates = ", ".join(f"{column} = excluded.{column}" for column in columns if column not in keys)
+        rows = [row for row in rows if all(row[columns.index(key)] is not None for key in keys)]
+        self.conn.executemany(
+            f"INSERT INTO form_runs (code, {', '.join(columns)}) VALUES (?{', ?' * len(columns)}) "
+            f"ON CONFLICT (code, runner, date, track) DO UPDATE SET {updates}",
+            [(self.code, *row) for row in rows]
+        )
+        return len(rows)
+
+    def write_venue(self, venue, race_df, form_df):
+        """Upserts one venue's runners, odds and form runs in a single transaction."""
+        captured_at = datetime.now().isoformat(timespec='milliseconds')
+        with self._lock, self.conn:
+            meeting_id = self._meeting_id(venue)
+            if race_df is not None and not race_df.empty:
+                self._write_runners(meeting_id, race_df, captured_at)
+            if form_df is not None and not form_df.empty:
+                self._write_form(form_df)
+
+    def finalize(self, order=None):
+        with self._lock:
+            counts = [
+                self.conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                for table in ('runners', 'form_runs')
+            ]
+        print(f"SQLite store {self.path} holds {counts[0]} runners and {counts[1]} form runs")
+        return tuple(counts)
+
+    def runs(self, runner, track=None, distance=None, code=None):
+        """Form runs of `runner`, newest first, optionally at one track and distance."""
+        query, params = "SELECT * FROM form_runs WHERE runner = ?", [runner]
+        for column, value in [('code', code), ('track', track), ('distance', distance)]:
+            if value is not None:
+                query += f" AND {column} = ?"
+                params.append(value)
+        cursor = self.conn.execute(query + " ORDER BY date DESC", params)
+        columns = [d[0] for d in cursor.description]
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,110 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+
+# Resolves once at least `minCount` elements match `selector` and the DOM has seen
+# no mutations for `quietMs`, so the caller reads a fully rendered list.
+DOM_QUIET_SCRIPT = """
+var selector = arguments[0], minCount = arguments[1], quietMs = arguments[2];
+var done = arguments[arguments.length - 1];
+var timer = null;
+function count() { return document.querySelectorAll(selector).length; }
+function settle() {
+  clearTimeout(timer);
+  timer = setTimeout(function () {
+    if (count() >= minCount) { observer.disconnect(); done(count()); }
+  }, quietMs);
+}
+var observer = new MutationObserver(function () { if (count() >= minCount) settle(); });
+observer.observe(document, {childList: true, subtree: true, characterData: true});
+if (count() >= minCount) settle();
+"""
+
+
+class WaitRecorder:
+    """
+    Records how long each named wait took, so timeouts can be tuned from real runs.
+    """
+
+    def __init__(self):
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def record(self, name):
+        start = time.perf_counter()
+        outcome = "ok"
+        try:
+            yield
+        except (TimeoutException, TimeoutError):
+            outcome = "timeout"
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._samples.setdefault(name, []).append((elapsed, outcome))
+
+    def reset(self):
+        with self._lock:
+            self._samples = {}
+
+    def summary(self):
+        """
+        Returns {wait name: {count, timeouts, p50, p95, max}} with latencies in seconds.
+        """
+        with self._lock:
+            samples = {name: list(values) for name, values in self._samples.items()}
+
+        report = {}
+        for name, values in samples.items():
+            latencies = sorted(elapsed for elapsed, _ in values)
+            report[name] = {
+                'count': len(values),
+                'timeouts': sum(1 for _, outcome in values if outcome == "timeout"),
+                'p50': round(latencies[len(latencies) // 2], 3),
+                'p95': round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+                'max': round(latencies[-1], 3),
+            }
+        return report
+
+    def print_summary(self):
+        for name, stats in sorted(self.summary().items()):
+            print(
+                f"{name:<16} n={stats['count']:<4} p50={stats['p50']:.2f}s "
+                f"p95={stats['p95']:.2f}s max={stats['max']:.2f}s timeouts={stats['timeouts']}"
+            )
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+RECORDER = WaitRecorder()
+
+
+def wait_until(driver, name, condition, timeout, poll_frequency=0.1, recorder=RECORDER):
+    """
+    WebDriverWait(...).until(condition), recorded under `name`.
+    """
+    with recorder.record(name):
+        return WebDriverWait(driver, timeout, poll_frequency=poll_frequency).until(condition)
+
+
+def wait_for_dom_quiet(driver, name, css_selector, timeout, min_count=1, quiet_ms=250, recorder=RECORDER):
+    """
+    Waits until `min_count` elements match `css_selector` and the page has stopped
+    mutating for `quiet_ms`. Returns the number of matching elements.
+    Raises TimeoutException if that does not happen within `timeout` seconds.
+    """
+    with recorder.record(name):
+        driver.set_script_timeout(timeout)
+        try:
+            return driver.execute_async_script(DOM_QUIET_SCRIPT, css_selector, min_count, quiet_ms)
+        except TimeoutException as e:
+            raise TimeoutException(
+                f"{css_selector} did not settle with {min_count}+ elements within {timeout} seconds"
+            ) from e
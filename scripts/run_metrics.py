@@ -0,0 +1,242 @@
+"""
+Per-stage run metrics: how long each stage of a run took, how often it retried or
+timed out, and how many rows each venue produced.
+
+Stages are timed with `METRICS.stage(name)`, a context manager that costs two
+`perf_counter` calls and one list append, so it stays on in production. Inside
+`METRICS.venue(name)` every stage, retry and row count is also attributed to that
+venue (per thread or asyncio task, so concurrent workers do not mix venues). At the end of a run the
+report is written as JSON and in the Prometheus text format, e.g. for the node
+exporter's textfile collector:
+
+    METRICS.write_json('../data/run_metrics.json')
+    METRICS.write_prometheus('../data/run_metrics.prom', code='G')
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from selenium.common.exceptions import TimeoutException
+
+
+def _quantile(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_label_value(value)}"' for key, value in labels.items()) + '}'
+
+
+class RunMetrics:
+    """
+    Thread-safe collector of stage durations and outcomes, counters and per-venue rows.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._current_venue = contextvars.ContextVar('venue', default=None)
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._start = time.perf_counter()
+        self._stages = {}
+        self._counters = {}
+        self._venues = {}
+
+    def reset(self):
+        """Starts a new run, e.g. for the next job of a long-lived process."""
+        with self._lock:
+            self.started_at = datetime.now().isoformat(timespec='seconds')
+            self._start = time.perf_counter()
+            self._stages = {}
+            self._counters = {}
+            self._venues = {}
+
+    def _venue(self, venue):
+        # Must be called with the lock held
+        return self._venues.setdefault(venue, {'stages': {}, 'counters': {}, 'race_rows': 0, 'form_rows': 0})
+
+    @property
+    def current_venue(self):
+        return self._current_venue.get()
+
+    @contextmanager
+    def venue(self, name):
+        """Attributes everything recorded inside the block, on this thread or task, to venue `name`."""
+        token = self._current_venue.set(name)
+        try:
+            with self.stage('venue'):
+                yield
+        finally:
+            self._current_venue.reset(token)
+
+    @contextmanager
+    def stage(self, name, venue=None):
+        """
+        Times the block as stage `name`, for `venue` or else the current venue.
+        An exception marks it as a timeout or an error.
+        """
+        start = time.perf_counter()
+        outcome = 'ok'
+        try:
+            yield
+        except (TimeoutException, TimeoutError):
+            outcome = 'timeout'
+            raise
+        except BaseException:
+            outcome = 'error'
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            venue = venue or self.current_venue
+            with self._lock:
+                self._stages.setdefault(name, []).append((elapsed, outcome))
+                if venue is not None:
+                    stages = self._venue(venue)['stages']
+                    stages[name] = stages.get(name, 0.0) + elapsed
+
+    def count(self, name, n=1):
+        """Adds `n` to counter `name`, e.g. a retry, for the run and the current venue."""
+        venue = self.current_venue
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+            if venue is not None:
+                counters = self._venue(venue)['counters']
+                counters[name] = counters.get(name, 0) + n
+
+    def rows(self, venue, race_rows, form_rows):
+        """Records the rows written for `venue`."""
+        with self._lock:
+            entry = self._venue(venue)
+            entry['race_rows'] += race_rows
+            entry['form_rows'] += form_rows
+
+    def summary(self):
+        """
+        Returns {'run': ..., 'stages': {name: {count, total, p50, p95, max, timeouts, errors}},
+        'counters': ..., 'venues': {venue: {stages, counters, race_rows, form_rows}}}
+        with durations in seconds.
+        """
+        with self._lock:
+            stages = {name: list(values) for name, values in self._stages.items()}
+            counters = dict(self._counters)
+            venues = json.loads(json.dumps(self._venues))
+
+        report = {}
+        for name, values in stages.items():
+            durations = sorted(elapsed for elapsed, _ in values)
+            report[name] = {
+                'count': len(values),
+                'total': round(sum(durations), 3),
+                'p50': round(_quantile(durations, 0.5), 3),
+                'p95': round(_quantile(durations, 0.95), 3),
+                'max': round(durations[-1], 3),
+                'timeouts': sum(1 for _, outcome in values if outcome == 'timeout'),
+                'errors': sum(1 for _, outcome in values if outcome == 'error'),
+            }
+        for entry in venues.values():
+            entry['stages'] = {name: round(total, 3) for name, total in entry['stages'].items()}
+        return {
+            'run': {'started_at': self.started_at, 'seconds': round(time.perf_counter() - self._start, 3)},
+            'stages': report,
+            'counters': counters,
+            'venues': venues,
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        run_seconds = summary['run']['seconds'] or 1
+        for name, stats in sorted(summary['stages'].items(), key=lambda item: -item[1]['total']):
+            print(
+                f"{name:<16} n={stats['count']:<4} total={stats['total']:.2f}s "
+                f"({stats['total'] / run_seconds:.0%}) p50={stats['p50']:.2f}s max={stats['max']:.2f}s "
+                f"timeouts={stats['timeouts']} errors={stats['errors']}"
+            )
+        rows = sum(entry['race_rows'] for entry in summary['venues'].values())
+        forms = sum(entry['form_rows'] for entry in summary['venues'].values())
+        print(f"{len(summary['venues'])} venues, {rows} runners, {forms} form rows in {run_seconds:.1f}s")
+
+    def write_json(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def prometheus(self, **labels):
+        """The report in the Prometheus text exposition format; `labels` are added to every sample."""
+        summary = self.summary()
+        lines = [
+            '# HELP scraper_run_seconds Wall time of the run so far.',
+            '# TYPE scraper_run_seconds gauge',
+            f"scraper_run_seconds{_labels(**labels)} {summary['run']['seconds']}",
+            '# HELP scraper_stage_seconds Time spent in each stage.',
+            '# TYPE scraper_stage_seconds summary',
+        ]
+        for name, stats in sorted(summary['stages'].items()):
+            for quantile, key in (('0.5', 'p50'), ('0.95', 'p95'), ('1', 'max')):
+                lines.append(f"scraper_stage_seconds{_labels(**labels, stage=name, quantile=quantile)} {stats[key]}")
+            lines.append(f"scraper_stage_seconds_sum{_labels(**labels, stage=name)} {stats['total']}")
+            lines.append(f"scraper_stage_seconds_count{_labels(**labels, stage=name)} {stats['count']}")
+        for metric, key, help_text in (
+            ('scraper_stage_timeouts_total', 'timeouts', 'Stage runs that ended in a timeout.'),
+            ('scraper_stage_errors_total', 'errors', 'Stage runs that raised another error.'),
+        ):
+            lines += [f'# HELP {metric} {help_text}', f'# TYPE {metric} counter']
+            lines += [
+                f"{metric}{_labels(**labels, stage=name)} {stats[key]}"
+                for name, stats in sorted(summary['stages'].items())
+            ]
+        lines += ['# HELP scraper_events_total Retries and other counted events.', '# TYPE scraper_events_total counter']
+        lines += [
+            f"scraper_events_total{_labels(**labels, event=name)} {value}"
+            for name, value in sorted(summary['counters'].items())
+        ]
+        lines += ['# HELP scraper_venue_rows Rows written per venue.', '# TYPE scraper_venue_rows gauge']
+        for venue, entry in sorted(summary['venues'].items()):
+            lines.append(f"scraper_venue_rows{_labels(**labels, venue=venue, table='race')} {entry['race_rows']}")
+            lines.append(f"scraper_venue_rows{_labels(**labels, venue=venue, table='form')} {entry['form_rows']}")
+        lines += ['# HELP scraper_venue_seconds Time spent per venue.', '# TYPE scraper_venue_seconds gauge']
+        lines += [
+            f"scraper_venue_seconds{_labels(**labels, venue=venue)} {entry['stages'].get('venue', 0.0)}"
+            for venue, entry in sorted(summary['venues'].items())
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path, **labels):
+        # Written atomically so a textfile collector never reads half a file
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.prometheus(**labels))
+        os.replace(tmp_path, path)
+
+
+METRICS = RunMetrics()
+
+
+class MeteredSink:
+    """
+    Wraps a venue sink so every write is timed as the "write" stage and its rows counted.
+    """
+
+    def __init__(self, sink, metrics=METRICS):
+        self.sink = sink
+        self.metrics = metrics
+
+    def completed(self):
+        return self.sink.completed()
+
+    def write_venue(self, venue, race_df, form_df):
+        with self.metrics.stage('write', venue):
+            self.sink.write_venue(venue, race_df, form_df)
+        self.metrics.rows(
+            venue, 0 if race_df is None else len(race_df), 0 if form_df is None else len(form_df)
+        )
+
+    def finalize(self, order=None):
+        with self.metrics.stage('finalize'):
+            return self.sink.finalize(order)
+
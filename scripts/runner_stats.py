@@ -0,0 +1,185 @@
+"""
+Per-runner statistics, kept up to date from the form rows of every scrape.
+
+Instead of grouping the whole form CSV again for every question, the index keeps
+each runner's runs (keyed by date and track, like the form cache) together with
+their statistics, already computed: starts, wins, places, win and place rates,
+average finish, average first-section position from In Run, last start, and best
+time by track and distance. A scrape only recomputes the runners in its form rows,
+and lookups are dictionary reads:
+
+    stats = RunnerStats('../data/runner_stats_G.json')
+    stats.runner('Chorus Line')['win_rate']
+    stats.best_time('Chorus Line', 'Sale', 435)
+    stats.race(['Chorus Line', 'Amron Lucy'], track='Sale', distance=435)
+    stats.card(race_df, 'Name', 'Race')   # the stats of every runner on a card
+
+The index is also a venue sink, so the scrapers update it with `--stats`.
+"""
+import json
+import os
+import threading
+from datetime import date
+
+import pandas as pd
+
+from typed_columns import first_section_position, plc_features, to_int, to_number
+
+RUNNER_COLUMNS = ['Greyhound', 'Horse']
+# Fields of a stored run, in order
+RUN_FIELDS = ('date', 'track', 'distance', 'finish', 'field_size', 'time', 'first_position')
+
+
+def _value(value):
+    return None if pd.isna(value) else value
+
+
+def _mean(values):
+    return round(sum(values) / len(values), 3) if values else None
+
+
+def run_rows(form_df):
+    """
+    (runner, run key, run) for every form row with a runner, date and track. The
+    numeric fields are converted column by column.
+    """
+    runner = next((form_df[column] for column in RUNNER_COLUMNS if column in form_df), None)
+    if runner is None or form_df.empty:
+        return []
+    finish, field_size = plc_features(form_df['Plc'])
+    columns = [
+        form_df['Date'], form_df['Track'], to_int(form_df['Distance']), finish, field_size,
+        to_number(form_df['Time']), first_section_position(form_df['In Run']),
+    ]
+    rows = []
+    for name, *run in zip(runner, *(column.astype(object) for column in columns)):
+        run = [_value(value) for value in run]
+        if name and run[0] and run[1] and run[0] != 'N/A':
+            rows.append((name, f"{run[0]}|{run[1]}", run))
+    return rows
+
+
+def summarize(runs):
+    """The statistics of one runner's runs ({key: run})."""
+    runs = [dict(zip(RUN_FIELDS, run)) for run in runs.values()]
+    finishes = [run['finish'] for run in runs if run['finish'] is not None]
+    best_times = {}
+    for run in runs:
+        if run['time'] is None or run['time'] <= 0 or run['distance'] is None:
+            continue
+        key = f"{run['track']}|{run['distance']}"
+        best_times[key] = min(best_times.get(key, run['time']), run['time'])
+    wins = sum(1 for finish in finishes if finish == 1)
+    places = sum(1 for finish in finishes if finish <= 3)
+    return {
+        'starts': len(runs),
+        'wins': wins,
+        'places': places,
+        'win_rate': round(wins / len(finishes), 3) if finishes else None,
+        'place_rate': round(places / len(finishes), 3) if finishes else None,
+        'avg_finish': _mean(finishes),
+        'avg_first_position': _mean([run['first_position'] for run in runs if run['first_position'] is not None]),
+        'last_start': max(run['date'] for run in runs) if runs else None,
+        'best_times': best_times,
+    }
+
+
+class RunnerStats:
+    """
+    Runs and materialized statistics per runner, stored as JSON at `path`.
+    Usable as a venue sink: `write_venue` adds the venue's form rows.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.runs = {}
+        self.stats = {}
+        self.updated = set()
+        if os.path.exists(path):
+            with open(path) as f:
+                saved = json.load(f)
+            self.runs = saved.get('runs', {})
+            self.stats = saved.get('stats', {})
+
+    def update(self, form_df):
+        """Adds the runs in `form_df` and recomputes the statistics of their runners only."""
+        touched = {}
+        for name, key, run in run_rows(form_df):
+            touched.setdefault(name, {})[key] = run
+        with self._lock:
+            for name, new_runs in touched.items():
+                runs = self.runs.setdefault(name, {})
+                runs.update(new_runs)
+                self.stats[name] = summarize(runs)
+            self.updated.update(touched)
+        return len(touched)
+
+    def runner(self, name):
+        """The statistics of `name`, or None. The dict is shared; do not modify it."""
+        return self.stats.get(name)
+
+    def best_time(self, name, track, distance):
+        stats = self.stats.get(name)
+        return stats['best_times'].get(f"{track}|{distance}") if stats else None
+
+    def days_since_last_start(self, name, on=None):
+        stats = self.stats.get(name)
+        if not stats or not stats['last_start']:
+            return None
+        try:
+            last = date.fromisoformat(stats['last_start'])
+        except ValueError:
+            return None
+        return ((on or date.today()) - last).days
+
+    def race(self, names, track=None, distance=None, on=None):
+        """
+        {name: statistics} for the runners of one race, with 'days_since_last_start'
+        and, given a track and distance, 'best_time_here'. Unknown runners map to None.
+        """
+        on = on or date.today()
+        result = {}
+        for name in names:
+            stats = self.stats.get(name)
+            if stats is None:
+                result[name] = None
+                continue
+            entry = dict(stats, days_since_last_start=self.days_since_last_start(name, on))
+            if track is not None and distance is not None:
+                entry['best_time_here'] = stats['best_times'].get(f"{track}|{distance}")
+            result[name] = entry
+        return result
+
+    def card(self, race_df, runner_column, race_column=None, on=None):
+        """A DataFrame of the card's runners with their statistics, e.g. to score a race card."""
+        on = on or date.today()
+        rows = []
+        for position, name in enumerate(race_df[runner_column]):
+            stats = self.stats.get(name) or {}
+            row = {runner_column: name}
+            if race_column is not None:
+                row[race_column] = race_df[race_column].iloc[position]
+            row.update({key: value for key, value in stats.items() if key != 'best_times'})
+            row['days_since_last_start'] = self.days_since_last_start(name, on)
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def completed(self):
+        return set()
+
+    def write_venue(self, venue, race_df, form_df):
+        if form_df is not None and not form_df.empty:
+            self.update(form_df)
+
+    def save(self):
+        tmp_path = self.path + '.tmp'
+        with self._lock:
+            with open(tmp_path, 'w') as f:
+                json.dump({'runs': self.runs, 'stats': self.stats}, f)
+        os.replace(tmp_path, self.path)
+
+    def finalize(self, order=None):
+        self.save()
+        print(f"Runner stats {self.path}: {len(self.updated)} of {len(self.stats)} runners updated")
+        return len(self.updated)
@@ -0,0 +1,33 @@
+import importlib.util
+import os
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SCRAPER_FILES = {
+    'G': 'greyhound-web-scraper.py',
+    'T': 'thoroughbred-web-scraper.py',
+}
+
+
+def load_scraper(code):
+    """
+    Imports one of the scraper scripts as a module by racing code ('G' or 'T').
+    The scripts have hyphenated file names, so they cannot be imported directly.
+    """
+    if code not in SCRAPER_FILES:
+        raise ValueError(f"Unknown racing code '{code}', expected one of {sorted(SCRAPER_FILES)}")
+
+    module_name = f"scraper_{code.lower()}"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    if SCRIPTS_DIR not in sys.path:
+        sys.path.insert(0, SCRIPTS_DIR)
+
+    path = os.path.join(SCRIPTS_DIR, SCRAPER_FILES[code])
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
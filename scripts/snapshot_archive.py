@@ -0,0 +1,190 @@
+"""
+Compressed archive of the raw page text each venue was parsed from, and an offline
+re-parse of an archive into fresh outputs.
+
+Every snapshot holds a venue's runner-list lines and FULL FORM blocks exactly as
+captured, gzipped at `<root>/<code>/<day>/<venue>-<time>.json.gz`. `index.jsonl`
+lists each snapshot with its code, venue and capture time, so an archive can be
+selected without opening the snapshots. After a parser fix, rebuild the outputs
+from the archive instead of scraping again:
+
+    python snapshot_archive.py reparse ../archive --output-dir ../rebuild --processes 4
+"""
+import argparse
+import gzip
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from scraper_loader import SCRAPER_FILES, load_scraper
+from venue_sink import venue_slug
+
+INDEX_FILE = 'index.jsonl'
+
+
+class SnapshotArchive:
+    """
+    Append-only store of raw venue snapshots under `root`.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def add(self, code, venue, race_data, form_data, captured_at=None):
+        """
+        Stores one venue's runner-list lines and form blocks. Returns the index entry.
+        """
+        captured_at = captured_at or datetime.now()
+        day = captured_at.strftime('%Y-%m-%d')
+        path = os.path.join(code, day, f"{venue_slug(venue)}-{captured_at.strftime('%H%M%S%f')}.json.gz")
+        snapshot = {
+            'code': code,
+            'venue': venue,
+            'captured_at': captured_at.isoformat(timespec='seconds'),
+            'race_data': list(race_data),
+            'form_data': list(form_data),
+        }
+
+        full_path = os.path.join(self.root, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with gzip.open(full_path + '.tmp', 'wt', encoding='utf-8') as f:
+            json.dump(snapshot, f)
+        os.replace(full_path + '.tmp', full_path)
+
+        entry = {
+            'code': code,
+            'venue': venue,
+            'day': day,
+            'captured_at': snapshot['captured_at'],
+            'path': path,
+            'race_lines': len(snapshot['race_data']),
+            'form_entries': len(snapshot['form_data']),
+        }
+        with self._lock:
+            with open(self.index_path, 'a') as f:
+                f.write(json.dumps(entry) + '\n')
+        return entry
+
+    def entries(self, code=None, venue=None, day=None):
+        """Index entries in capture order, optionally filtered by code, venue and day."""
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path) as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+        return [
+            entry for entry in entries
+            if (code is None or entry['code'] == code)
+            and (venue is None or entry['venue'] == venue)
+            and (day is None or entry['day'] == day)
+        ]
+
+    def latest(self, code=None, day=None):
+        """
+        The newest snapshot of each (code, day, venue). Re-scrapes often skip FULL FORM
+        (follow-jumps refreshes, a fresh form cache), so when the newest snapshot has no
+        form blocks, `form_path` points at the newest one of that venue and day that has.
+        """
+        latest, with_form = {}, {}
+        for entry in self.entries(code=code, day=day):
+            key = (entry['code'], entry['day'], entry['venue'])
+            latest[key] = entry
+            if entry['form_entries']:
+                with_form[key] = entry
+        return [
+            dict(entry, form_path=with_form[key]['path']) if not entry['form_entries'] and key in with_form else entry
+            for key, entry in latest.items()
+        ]
+
+    def load(self, entry):
+        """
+        The snapshot of `entry`, with the form blocks of `entry['form_path']` when set.
+        """
+        snapshot = self._read(entry['path'])
+        if entry.get('form_path'):
+            snapshot['form_data'] = self._read(entry['form_path'])['form_data']
+        return snapshot
+
+    def _read(self, path):
+        with gzip.open(os.path.join(self.root, path), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+
+def _reparse(root, entry):
+    snapshot = SnapshotArchive(root).load(entry)
+    scraper = load_scraper(snapshot['code'])
+    race_df, form_df = scraper.parse_venue(snapshot['venue'], snapshot['race_data'], snapshot['form_data'])
+    return entry, race_df, form_df
+
+
+def reparse(root, output_dir, code=None, day=None, processes=None, every_snapshot=False):
+    """
+    Re-parses archived snapshots across a process pool with the current parsers.
+
+    By default only the newest snapshot of each venue and day is used, with the form
+    blocks of the newest snapshot that has any (see `SnapshotArchive.latest`). Outputs are
+    written like a scrape, to `<output_dir>/<day>/` with the scrapers' file names.
+    Returns the number of snapshots parsed.
+    """
+    archive = SnapshotArchive(root)
+    entries = archive.entries(code=code, day=day) if every_snapshot else archive.latest(code=code, day=day)
+
+    sinks = {}
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = [executor.submit(_reparse, root, entry) for entry in entries]
+        for future in futures:
+            entry, race_df, form_df = future.result()
+            key = (entry['code'], entry['day'])
+            if key not in sinks:
+                out_dir = os.path.join(output_dir, entry['day'])
+                os.makedirs(out_dir, exist_ok=True)
+                sinks[key] = load_scraper(entry['code']).make_sink(out_dir, run_id=f"reparse-{entry['day']}")
+            venue = entry['venue'] if not every_snapshot else f"{entry['venue']} {entry['captured_at']}"
+            sinks[key].write_venue(venue, race_df, form_df)
+
+    for sink in sinks.values():
+        sink.finalize()
+    return len(entries)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Work with an archive of raw venue snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    listing = commands.add_parser("list", help="List archived snapshots.")
+    listing.add_argument("archive_dir")
+    listing.add_argument("--code", choices=sorted(SCRAPER_FILES))
+    listing.add_argument("--day", help="Capture day, YYYY-MM-DD.")
+
+    rebuild = commands.add_parser("reparse", help="Re-parse snapshots into fresh outputs.")
+    rebuild.add_argument("archive_dir")
+    rebuild.add_argument("--output-dir", required=True, help="Outputs are written to <output-dir>/<day>/.")
+    rebuild.add_argument("--code", choices=sorted(SCRAPER_FILES))
+    rebuild.add_argument("--day", help="Only re-parse snapshots captured on this day, YYYY-MM-DD.")
+    rebuild.add_argument("--processes", type=int, help="Parser processes (default: one per CPU).")
+    rebuild.add_argument(
+        "--every-snapshot", action="store_true",
+        help="Parse every snapshot, not just the newest per venue and day."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.command == "list":
+        for entry in SnapshotArchive(args.archive_dir).entries(code=args.code, day=args.day):
+            print(f"{entry['captured_at']}  {entry['code']}  {entry['venue']:<30}"
+                  f"{entry['race_lines']:>6} lines{entry['form_entries']:>5} form")
+    else:
+        count = reparse(
+            args.archive_dir, args.output_dir, args.code, args.day, args.processes, args.every_snapshot
+        )
+        print(f"Re-parsed {count} snapshots into {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,269 +1,57 @@
+import argparse
 import os
-import re
+import sys
 import time
 import pandas as pd
 from datetime import datetime
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException, WebDriverException
+
+from browser_daemon import DEFAULT_DIR as DAEMON_DIR, DaemonUnavailable, submit
+from browser_watchdog import BrowserWatchdog
+from cdp_tabs import debugger_address, scrape_races_cdp
+from dom_extract import extract_texts
+from form_cache import FormCache
+from form_engine import form_frame, horse_card_records, horse_form_columns
+from http_engine import BACKENDS, HttpEngine, make_backend, scrape_races_http
+from jump_scheduler import JumpScheduler, follow_jumps
+from lean_browser import NAVIGATIONS, start_chrome
+from lobby import HOME_COUNTRY, collect_race_urls, collect_tile_texts, parse_lobby, remember_race_url, venues_to_scrape
+from race_results import write_race_results
+from race_store import RaceStore
+from readiness import RECORDER, wait_for_dom_quiet, wait_until
+from run_metrics import METRICS, MeteredSink
+from runner_stats import RunnerStats
+from snapshot_archive import SnapshotArchive
+from typed_columns import write_typed_outputs
+from venue_fingerprints import FingerprintSink, VenueFingerprints
+from venue_pool import scrape_in_parallel
+from venue_sink import CsvVenueSink, TeeSink
+
+LOBBY_URL = "https://www.unibet.com.au/racing#/lobby/T"
+# Reads of the lobby before a run gives up on finding Australian meetings
+LOBBY_ATTEMPTS = 3
 
 
 # ------------------------------
 # Parsing Functions
 # ------------------------------
 
-def parse_australian_race_locations(data_list):
-    data = data_list[0].strip().split('\n')
-    australian_locations = []
-    in_australia_section = False
-
-    for line in data:
-        line = line.strip()
-        if line.lower() == "australia":
-            in_australia_section = True
-            continue
-        elif line in [
-            "Brazil", "Chile", "Italy", "New Zealand", "France", "Germany", "Japan",
-            "Korea", "Malaysia", "South Africa", "Turkey", "UK & Ireland",
-            "United States", "Canada"
-        ]:
-            in_australia_section = False
-            continue
-
-        if (
-            in_australia_section and line
-            and not any(char.isdigit() for char in line[0])
-            and not line.startswith((':', '-', ','))
-        ):
-            australian_locations.append(line)
-
-    return australian_locations
-
-
-def is_number(s):
-    try:
-        float(s)
-        return True
-    except ValueError:
-        return False
+def parse_australian_race_locations(data_list, report=True):
+    """
+    Extracts the Australian race locations that still have races to run from the lobby text.
+    Finished and abandoned meetings are left out (and, with `report`, counted as visits saved).
+    """
+    return venues_to_scrape(parse_lobby(data_list[0], 'T'), report=report)
 
 
 def parse_horse_data(data):
-    records = []
-    i = 0
-    current_race, current_race_name, current_distance, current_track = None, None, None, None
-
-    while i < len(data):
-        # Detect race start (time + venue)
-        if re.match(r"\d{2}:\d{2}\s+", data[i]):
-            current_race = data[i].strip()
-            current_race_name = data[i + 1].strip() if i + 1 < len(data) else None
-            current_distance = data[i + 2].strip() if i + 2 < len(data) else None
-            current_track = data[i + 3].strip() if i + 3 < len(data) else None
-            i += 4
-            continue
-
-        # Detect runner line: "1. HorseName (3)"
-        runner_match = re.match(r"^(\d+)\.\s+(.*?)\s+\((\d+)\)$", data[i].strip())
-        if runner_match:
-            horse_num = runner_match.group(1)
-            horse_name = runner_match.group(2).strip()
-            barrier = runner_match.group(3).strip()
-
-            jockey, trainer, form, age_sex = None, None, None, None
-            odds, win, place = [], None, None
-
-            # Look ahead
-            j = i + 1
-            while j < len(data):
-                line = data[j].strip()
-
-                if line == 'J' and j + 1 < len(data):
-                    jockey = data[j + 1].strip()
-                    j += 2
-                    continue
-                if line == 'T' and j + 1 < len(data):
-                    trainer = data[j + 1].strip()
-                    j += 2
-                    continue
-                if re.match(r"^[\dX\-]+$", line):
-                    form = line
-                    j += 1
-                    continue
-                if re.match(r"^\d+yo\s+[A-Z]$", line):
-                    age_sex = line
-                    j += 1
-                    continue
-
-                # Scratched runner
-                if line == "Scratched":
-                    records.append([
-                        current_race, current_race_name, horse_num, horse_name, barrier,
-                        jockey, trainer, form, age_sex, None, None, "Scratched"
-                    ])
-                    j += 1
-                    break
-
-                # Odds
-                if is_number(line):
-                    odds.append(line)
-                    j += 1
-                    continue
-
-                # End of runner if new runner/race detected
-                if re.match(r"^\d+\.\s+", line) or re.match(r"\d{2}:\d{2}\s+", line):
-                    break
-
-                j += 1
-
-            if odds:
-                win, place = (odds[-2], odds[-1]) if len(odds) >= 2 else (odds[-1], None)
-
-            required_fields = [barrier, jockey, trainer, form, age_sex, win, place]
-            if all(field is not None for field in required_fields):
-                records.append([
-                    current_race, current_race_name, horse_num, horse_name, barrier,
-                    jockey, trainer, form, age_sex, win, place, "Active"
-                ])
-            i = j
-        else:
-            i += 1
-
-    return records
+    return horse_card_records(data)
 
 
 def parse_horse_form(data_list):
-    rows = []
-
-    for entry in data_list:
-        if 'Race History' not in entry:
-            continue
-
-        parts = [p.strip() for p in entry.split('\n') if p.strip()]
-
-        # Horse name = first valid text before "Race History"
-        horse_name = None
-        for p in parts:
-            if p in ["T:", "Race History"]:
-                break
-            if not p.isdigit() and p != ",":
-                horse_name = p
-                break
-
-        if not horse_name:
-            continue
-
-        race_history_section = entry[entry.find('Race History'):]
-        lines = [l.strip() for l in race_history_section.split('\n') if l.strip()]
-        i = lines.index('Plc') + 1 if 'Plc' in lines else len(lines)
-
-        while i < len(lines):
-            line = lines[i]
-            if not re.fullmatch(r'\d+/\d+', line):
-                i += 1
-                continue
-
-            race_data = {
-                'Horse': horse_name,
-                'Plc': line,
-                'Date': 'N/A',
-                'Track': '',
-                'Days': 'N/A',
-                'Time': 'N/A',
-                'Distance': '',
-                'Mgn': '',
-                'Class': 'N/A',
-                'Cond': 'N/A',
-                'Bar': '',
-                'In Run': '',
-                'Jockey': '',
-                'Wgt': '',
-                'Price': '',
-                'Placing': ''
-            }
-
-            # Date
-            i += 1
-            if i < len(lines):
-                try:
-                    race_data['Date'] = datetime.strptime(lines[i], '%d/%m/%Y').strftime('%Y-%m-%d')
-                except ValueError:
-                    race_data['Date'] = lines[i]
-                i += 1
-
-            # Track + numeric values until Cond
-            parts = []
-            while i < len(lines) and lines[i] not in ['S', 'G', 'H'] and not lines[i].startswith('$'):
-                parts.append(lines[i])
-                i += 1
-
-            # Split track vs numeric section
-            j = 0
-            while j < len(parts) and not re.fullmatch(r"^\d+(\.\d+)?$", parts[j]):
-                j += 1
-            race_data['Track'] = " ".join(parts[:j])
-            values = parts[j:]
-
-            # Map values
-            if len(values) == 5:
-                race_data['Days'], race_data['Time'], race_data['Distance'], race_data['Mgn'], race_data['Class'] = values
-            elif len(values) == 4:
-                if re.fullmatch(r"^\d+(\.\d+)?$", values[-1]):
-                    race_data['Days'], race_data['Time'], race_data['Distance'], race_data['Mgn'] = values
-                else:
-                    race_data['Time'], race_data['Distance'], race_data['Mgn'], race_data['Class'] = values
-            elif len(values) == 3:
-                race_data['Time'], race_data['Distance'], race_data['Mgn'] = values
-
-            # Cond
-            if i < len(lines) and lines[i] in ['S', 'G', 'H']:
-                race_data['Cond'] = lines[i]
-                i += 1
-
-            # Bar
-            if i < len(lines) and re.fullmatch(r"\d+", lines[i]):
-                race_data['Bar'] = lines[i]
-                i += 1
-
-            # In Run
-            if i < len(lines) and (',' in lines[i] or re.fullmatch(r"(\d+,)*\d+", lines[i])):
-                race_data['In Run'] = lines[i]
-                i += 1
-
-            # Jockey
-            if i < len(lines):
-                race_data['Jockey'] = lines[i]
-                i += 1
-
-            # Wgt
-            if i < len(lines) and re.fullmatch(r"\d+(\.\d+)?", lines[i]):
-                race_data['Wgt'] = lines[i]
-                i += 1
-
-            # Price
-            if i < len(lines) and lines[i].startswith('$'):
-                race_data['Price'] = lines[i]
-                i += 1
-
-            # Placing
-            placing_lines = []
-            while i < len(lines):
-                l = lines[i]
-                if re.fullmatch(r'\d+/\d+', l) or l in ['Race History', 'Back to top']:
-                    break
-                if l[0].isdigit() and '.' in l:
-                    placing_lines.append(l)
-                i += 1
-
-            race_data['Placing'] = "\n".join(placing_lines) if placing_lines else 'N/A'
-            rows.append(race_data)
-
-    return pd.DataFrame(rows, columns=[
-        'Horse', 'Plc', 'Date', 'Track', 'Days', 'Time', 'Distance',
-        'Mgn', 'Class', 'Cond', 'Bar', 'In Run', 'Jockey', 'Wgt', 'Price', 'Placing'
-    ])
+    return form_frame(horse_form_columns(data_list))
 
 
 # ------------------------------
@@ -274,56 +62,74 @@ def click_race(driver, race_name, timeout=15, post_click_wait=3, max_retries=1):
     xpath = f"//div[contains(@class, 'sc-kVUOzj knIZUY') and .//h5[contains(text(), '{race_name}')]]"
     for attempt in range(max_retries):
         try:
-            WebDriverWait(driver, timeout).until(
-                lambda d: d.find_element("xpath", xpath).is_displayed()
+            wait_until(
+                driver, "lobby_tile",
+                lambda d: d.find_element("xpath", xpath).is_displayed(), timeout
             )
             race_div = driver.find_element("xpath", xpath)
             driver.execute_script("arguments[0].click();", race_div)
             print(f"Clicked on {race_name}")
-            time.sleep(post_click_wait)
+            try:
+                wait_until(driver, "race_page", EC.staleness_of(race_div), post_click_wait)
+            except TimeoutException:
+                pass
             return True
         except (StaleElementReferenceException, TimeoutException):
             print(f"Attempt {attempt + 1} failed for {race_name}")
+            METRICS.count("click_retries")
     print(f"Could not click on race '{race_name}' after {max_retries} retries")
     return False
 
 
-def get_horse_form_elements(driver, homepage_url="https://www.unibet.com.au/racing#/lobby/T",
-                            css_selector=".css-10arllf", timeout=45):
-    start = time.time()
-    dog_list = []
+def open_race(driver, race_name, race_url=None, homepage_url=LOBBY_URL, css_selector=".css-10arllf", timeout=45):
+    previous_cards = driver.find_elements(By.CSS_SELECTOR, css_selector)
+
+    # Go straight to the race page when the lobby exposed its URL, otherwise click the tile
+    if race_url:
+        driver.get(race_url)
+        print(f"Opened {race_name} at {race_url}")
+    else:
+        if driver.current_url != homepage_url:
+            driver.get(homepage_url)
+        if not click_race(driver, race_name):
+            return False
 
-    while len(dog_list) < 10:
-        if time.time() - start > timeout:
-            raise TimeoutError(f"Dog list did not reach 10 items within {timeout} seconds")
+    if previous_cards:
         try:
-            elements = WebDriverWait(driver, 5).until(
-                EC.presence_of_all_elements_located((By.CSS_SELECTOR, css_selector))
-            )
-            dog_list = [el.text.strip() for el in elements if el.text.strip()]
-            dog_list = '\n'.join(dog_list).split('\n')
+            wait_until(driver, "race_page", EC.staleness_of(previous_cards[0]), timeout)
         except TimeoutException:
-            time.sleep(0.5)
+            print(f"Race page for {race_name} did not replace the previous race within {timeout} seconds")
+            return False
 
-    button = WebDriverWait(driver, 45).until(
-        EC.element_to_be_clickable((By.XPATH, "//button[span[normalize-space()='FULL FORM']]"))
-    )
-    driver.execute_script("arguments[0].click();", button)
+    return True
+
+
+def runner_lines(driver, css_selector, min_lines=10):
+    lines = '\n'.join(extract_texts(driver, css_selector)).split('\n')
+    return lines if len(lines) >= min_lines else False
 
-    elements = WebDriverWait(driver, 45).until(
-        EC.presence_of_all_elements_located((By.CSS_SELECTOR, ".sc-jNwOwP.drZjiD"))
-    )
-    form_list = [el.text.strip() for el in elements if el.text.strip()]
 
-    driver.back()
-    print("Back navigation triggered...")
+def get_horse_list(driver, css_selector=".css-10arllf", timeout=45):
     try:
-        WebDriverWait(driver, timeout).until(lambda d: d.current_url == homepage_url)
-        print("Back to homepage successfully")
+        return wait_until(driver, "runner_list", lambda d: runner_lines(d, css_selector), timeout)
     except TimeoutException:
-        print(f"Failed to return to homepage within {timeout} seconds (current_url: {driver.current_url})")
+        raise TimeoutError(f"Dog list did not reach 10 items within {timeout} seconds")
 
-    time.sleep(2)
+
+def get_full_form(driver, timeout=45):
+    button = wait_until(
+        driver, "full_form_button",
+        EC.element_to_be_clickable((By.XPATH, "//button[span[normalize-space()='FULL FORM']]")), timeout
+    )
+    driver.execute_script("arguments[0].click();", button)
+
+    wait_for_dom_quiet(driver, "full_form", ".sc-jNwOwP.drZjiD", timeout)
+    return extract_texts(driver, ".sc-jNwOwP.drZjiD")
+
+
+def get_horse_form_elements(driver, css_selector=".css-10arllf", timeout=45):
+    dog_list = get_horse_list(driver, css_selector, timeout)
+    form_list = get_full_form(driver, timeout)
     return dog_list, form_list
 
 
@@ -338,31 +144,155 @@ def build_dataframe(records):
     return df
 
 
-def scrape_races(driver, australian_locations):
-    all_dfs, forms_dfs = [], []
-    for race_name in australian_locations:
-        click = click_race(driver, race_name)
-        if not click:
-            print(f"Skipping {race_name} as it could not be clicked.")
-            
-            continue
-
-        race_data, form_data = get_horse_form_elements(driver)
-
-        race_df = build_dataframe(parse_horse_data(race_data))
-        if not race_df.empty:
-            print(race_df)
-            all_dfs.append(race_df)
+def load_lobby(driver, url=LOBBY_URL, report=True, attempts=LOBBY_ATTEMPTS):
+    driver.get(url)
+
+    australian_entries = []
+
+    for attempt in range(1, attempts + 1):
+        try:
+            wait_for_dom_quiet(driver, "lobby", ".css-1kd0cbg", 60)
+            element = driver.find_element(By.CSS_SELECTOR, ".css-1kd0cbg")
+            entries = parse_lobby(element.text.strip(), 'T')
+            australian_entries = [entry for entry in entries if entry['country'] == HOME_COUNTRY]
+        except Exception:
+            australian_entries = []
+        if australian_entries:
+            break
+        if attempt < attempts:
+            time.sleep(2)
+    else:
+        # Late at night or off-season the lobby has no Australian meetings at all
+        print(f"No Australian meetings in the lobby after {attempts} attempts")
+        return []
+
+    # An empty list when every meeting has finished, instead of waiting for venues forever
+    return venues_to_scrape(australian_entries, report=report)
+
+
+def scrape_venue(driver, race_name, homepage_url=LOBBY_URL, race_url=None, form_cache=None, archive=None,
+                 with_form=True, fingerprints=None, race_urls=None):
+    with METRICS.venue(race_name):
+        with METRICS.stage("open_race"):
+            opened = open_race(driver, race_name, race_url, homepage_url)
+        if not opened:
+            print(f"Skipping {race_name} as it could not be opened.")
+            return None, None
+        if race_url is None and race_urls is not None:
+            remember_race_url(race_urls, race_name, driver.current_url, homepage_url)
+
+        with METRICS.stage("runner_list"):
+            race_data = get_horse_list(driver)
+        if not with_form or not needs_full_form(race_name, race_data, form_cache):
+            form_data = []
         else:
-            print(f"No data found for {race_name}, skipping.")
+            with METRICS.stage("full_form"):
+                form_data = get_full_form(driver)
+        return parse_venue(race_name, race_data, form_data, form_cache, archive, fingerprints)
+
+
+def needs_full_form(race_name, race_data, form_cache=None):
+    # Every runner's history is already cached and fresh, so the FULL FORM view has nothing new
+    if form_cache is not None and form_cache.all_fresh(runner_names(parse_horse_data(race_data))):
+        print(f"Form for every runner at {race_name} is cached, skipping FULL FORM.")
+        METRICS.count("full_form_skipped")
+        return False
+    return True
+
+
+def runner_names(records):
+    return [record[3] for record in records]
 
+
+def form_runner_name(entry):
+    # Same rule as parse_horse_form: first text before "T:" / "Race History"
+    for p in (p.strip() for p in entry.split('\n')):
+        if p in ["T:", "Race History"]:
+            break
+        if p and not p.isdigit() and p != ",":
+            return p
+    return None
+
+
+def parse_venue(race_name, race_data, form_data, form_cache=None, archive=None, fingerprints=None):
+    if archive is not None:
+        with METRICS.stage("archive"):
+            archive.add('T', race_name, race_data, form_data)
+
+    if fingerprints is not None and fingerprints.unchanged(race_name, race_data, form_data, form_cache):
+        print(f"{race_name} is unchanged since the last run, reusing its rows.")
+        if form_cache is not None:
+            form_cache.touch(fingerprints.runners(race_name))
+        return None, None
+
+    with METRICS.stage("parse_card"):
+        records = parse_horse_data(race_data)
+        race_df = build_dataframe(records)
+    if not race_df.empty:
+        print(f"{race_name}: {len(race_df)} runners in {race_df['Race Time'].nunique()} races")
+    else:
+        print(f"No data found for {race_name}, skipping.")
+        race_df = None
+
+    if form_cache is not None:
+        form_data = [form_cache.trim_entry(form_runner_name(entry), entry) for entry in form_data]
+
+    with METRICS.stage("parse_form"):
         form_df = parse_horse_form(form_data)
         form_df = form_df[form_df['Jockey'] != 'N/A']
-        if not form_df.empty:
-            print(form_df)
-            forms_dfs.append(form_df)
+
+    if form_cache is not None:
+        form_df = form_cache.new_rows(form_df, 'Horse')
+        form_cache.mark_checked(form_runner_name(entry) for entry in form_data)
+        form_cache.touch(runner_names(records))
+
+    if not form_df.empty:
+        print(f"{race_name}: {len(form_df)} form rows")
+    else:
+        print(f"No form data found for {race_name}, skipping.")
+        form_df = None
+
+    return race_df, form_df
+
+
+def scrape_races(driver, australian_locations, homepage_url=LOBBY_URL, race_urls=None, form_cache=None, sink=None,
+                 archive=None, fingerprints=None, watchdog=None):
+    all_dfs, forms_dfs = [], []
+    if race_urls is None:
+        race_urls = collect_race_urls(driver, australian_locations)
+
+    for race_name in australian_locations:
+        def scrape(driver):
+            return scrape_venue(
+                driver, race_name, homepage_url, race_urls.get(race_name), form_cache, archive,
+                fingerprints=fingerprints, race_urls=race_urls
+            )
+
+        try:
+            race_df, form_df = scrape(driver)
+        except (TimeoutError, WebDriverException) as e:
+            if watchdog is None:
+                raise
+            try:
+                if not watchdog.session_died(e):
+                    raise
+                driver = watchdog.recycle(f"the session died at {race_name} ({e.__class__.__name__})", race_name)
+                race_df, form_df = scrape(driver)
+            except (TimeoutError, WebDriverException) as skipped:
+                # A slow FULL FORM render is not worth a new browser; carry on at the next venue
+                reason = skipped.msg if isinstance(skipped, WebDriverException) else skipped
+                print(f"Skipping {race_name}: {skipped.__class__.__name__}: {reason}")
+                driver = watchdog.check(race_name)
+                continue
+        if sink is not None:
+            sink.write_venue(race_name, race_df, form_df)
         else:
-            print(f"No form data found for {race_name}, skipping.")
+            if race_df is not None:
+                all_dfs.append(race_df)
+            if form_df is not None:
+                forms_dfs.append(form_df)
+        if watchdog is not None:
+            driver = watchdog.check(race_name)
 
     return all_dfs, forms_dfs
 
@@ -371,35 +301,257 @@ def scrape_races(driver, australian_locations):
 # Main
 # ------------------------------
 
-def main():
-    driver = webdriver.Chrome()
-    url = "https://www.unibet.com.au/racing#/lobby/T"
-    driver.get(url)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape Unibet thoroughbred races and form.")
+    parser.add_argument("--lobby-url", default=LOBBY_URL, help="Racing lobby to scrape.")
+    parser.add_argument("--output-dir", default="../data", help="Directory for the output CSVs.")
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="Number of browser workers to scrape venues with concurrently."
+    )
+    parser.add_argument(
+        "--min-interval", type=float, default=0.0,
+        help="Minimum seconds between venue starts on each worker."
+    )
+    parser.add_argument(
+        "--engine", choices=["browser", "cdp", "http"], default="browser",
+        help="Scrape with Chrome, with many tabs of one Chrome over DevTools, or over plain HTTP without a browser. "
+             "The http engine runs no JavaScript, so it only works against prerendered pages (a fixture site "
+             "or a prerendering proxy), not the live single-page app."
+    )
+    parser.add_argument(
+        "--tabs", type=int, default=4,
+        help="Number of tabs the cdp engine scrapes venues in at once."
+    )
+    parser.add_argument(
+        "--fetch-backend", choices=sorted(BACKENDS), default="requests",
+        help="HTTP client used by the http engine."
+    )
+    parser.add_argument("--record-dir", help="Save every response the http engine fetches here, for offline replay of a prerendered run.")
+    parser.add_argument(
+        "--form-cache",
+        help="JSON file of form history already emitted; only new form rows are written."
+    )
+    parser.add_argument(
+        "--form-cache-days", type=int, default=60,
+        help="Evict runners from the form cache after this many days unseen."
+    )
+    parser.add_argument(
+        "--form-fresh-hours", type=float, default=12,
+        help="Skip FULL FORM when every runner's form was read within this many hours."
+    )
+    parser.add_argument(
+        "--parquet-dir",
+        help="Also write typed Parquet datasets here, partitioned by code and meeting date."
+    )
+    parser.add_argument("--run-id", help="Identifies the run for --resume (default: today's date).")
+    parser.add_argument(
+        "--resume", action="store_true",
+        help="Keep venues already written by an interrupted run with the same run id."
+    )
+    parser.add_argument(
+        "--archive-dir",
+        help="Keep the raw page text of every venue here, gzipped, for re-parsing with snapshot_archive.py."
+    )
+    parser.add_argument(
+        "--full-browser", action="store_true",
+        help="Run Chrome with its default profile instead of the lean headless one that blocks images, fonts and trackers."
+    )
+    parser.add_argument(
+        "--daemon", action="store_true",
+        help="Run on the warm browser of browser_daemon.py instead of starting Chrome; falls back to a local run."
+    )
+    parser.add_argument("--daemon-dir", default=DAEMON_DIR, help="Directory of the browser daemon to submit to.")
+    parser.add_argument(
+        "--fingerprints",
+        help="Keep a hash of each venue's page text here; venues unchanged since the last run are not re-parsed."
+    )
+    parser.add_argument(
+        "--sqlite",
+        help="Also upsert meetings, runners, odds and form runs into this SQLite database."
+    )
+    parser.add_argument(
+        "--stats",
+        help="Keep per-runner statistics (win rate, best times by track and distance, ...) in this JSON file, "
+             "updated from each run's form rows."
+    )
+    parser.add_argument(
+        "--race-results", action="store_true",
+        help="Also write each historical race once (Trace_results.csv) and the form rows as slim runs referencing it (Trace_runs.csv)."
+    )
+    parser.add_argument(
+        "--max-browser-mb", type=float, default=0,
+        help="Recycle the browser session between venues once Chrome and ChromeDriver use more than this "
+             "much resident memory (needs psutil; single-browser runs)."
+    )
+    parser.add_argument(
+        "--recycle-after", type=int, default=0,
+        help="Recycle the browser session after this many venues (single-browser runs)."
+    )
+    parser.add_argument(
+        "--follow-jumps", action="store_true",
+        help="Keep re-scraping each race, more often as its jump approaches, until every race has jumped."
+    )
+    args = parser.parse_args(argv)
+    if args.follow_jumps and (args.engine != "browser" or args.workers > 1):
+        parser.error("--follow-jumps needs the browser engine and a single worker")
+    if args.follow_jumps and args.fingerprints:
+        parser.error("--fingerprints cannot be combined with --follow-jumps")
+    return args
+
+
+def make_sink(output_dir, run_id=None, resume=False):
+    return CsvVenueSink(
+        output_dir, 'Trace_data.csv', 'Tfull_form_data.csv',
+        race_columns=build_dataframe([]).columns,
+        form_columns=parse_horse_form([]).columns,
+        run_id=run_id, resume=resume,
+    )
 
-    text, australian_locations = None, []
 
-    while not text or not australian_locations:
+def main(argv=None, driver=None):
+    args = parse_args(argv)
+    if args.daemon and driver is None:
+        try:
+            reply = submit('T', sys.argv[1:] if argv is None else argv, args.daemon_dir)
+            if not reply['ok']:
+                sys.exit(1)
+            return
+        except DaemonUnavailable as e:
+            print(f"Browser daemon not reachable ({e}), scraping in this process.")
+
+    form_cache = None
+    if args.form_cache:
+        form_cache = FormCache(args.form_cache, args.form_cache_days, args.form_fresh_hours)
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    sink = make_sink(args.output_dir, args.run_id, args.resume)
+    fingerprints = None
+    if args.fingerprints:
+        fingerprints = VenueFingerprints(
+            args.fingerprints, 'T', sources=(__file__,), runner_column='Horse Name', reuse_form=form_cache is None
+        )
+        sink = FingerprintSink(sink, fingerprints)
+    if args.sqlite:
+        sink = TeeSink(sink, RaceStore(args.sqlite, 'T'))
+    if args.stats:
+        sink = TeeSink(sink, RunnerStats(args.stats))
+    sink = MeteredSink(sink)
+    archive = SnapshotArchive(args.archive_dir) if args.archive_dir else None
+
+    if args.engine == "http":
+        engine = HttpEngine(make_backend(args.fetch_backend), args.lobby_url, record_dir=args.record_dir)
         try:
-            element = WebDriverWait(driver, 60).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".css-1kd0cbg"))
+            australian_locations, _, _ = scrape_races_http(
+                engine,
+                lambda text: parse_australian_race_locations([text]),
+                lambda name, race_data, form_data: parse_venue(
+                    name, race_data, form_data, form_cache, archive, fingerprints
+                ),
+                sink,
             )
-            text = element.text.strip()
-            australian_locations = parse_australian_race_locations([text])
-            time.sleep(2)
-        except Exception:
-            text, australian_locations = None, []
-            time.sleep(2)
-
-    scraped_race_data, scraped_form_data = scrape_races(driver, australian_locations)
-
-    race_output = pd.concat(scraped_race_data, ignore_index=True)
-    form_output = pd.concat(scraped_form_data, ignore_index=True)
-
-    os.makedirs('../data', exist_ok=True)
-    form_output.to_csv('../data/Tfull_form_data.csv', index=False)
-    race_output.to_csv('../data/Trace_data.csv', index=False)
+        finally:
+            engine.close()
+    elif args.engine == "cdp":
+        driver = driver or start_chrome(lean=not args.full_browser)
+        try:
+            australian_locations, _, _ = scrape_races_cdp(
+                debugger_address(driver), args.lobby_url,
+                lambda text: parse_australian_race_locations([text]),
+                lambda name, race_data, form_data: parse_venue(
+                    name, race_data, form_data, form_cache, archive, fingerprints
+                ),
+                sink, tabs=args.tabs,
+                need_form=lambda name, race_data: needs_full_form(name, race_data, form_cache),
+                blocked_urls=driver.blocked_urls,
+            )
+        finally:
+            driver.quit()
+    else:
+        # A browser daemon lends its own session, which is not ours to recycle
+        lent_driver = driver is not None
+        driver = driver or start_chrome(lean=not args.full_browser)
+        with METRICS.stage("lobby"):
+            australian_locations = load_lobby(driver, args.lobby_url)
+            race_urls = collect_race_urls(driver, australian_locations)
+            tile_texts = collect_tile_texts(driver, australian_locations)
+        print(f"Found direct links for {len(race_urls)}/{len(australian_locations)} venues")
+        scheduler = JumpScheduler()
+        for name in australian_locations:
+            if name not in sink.completed():
+                scheduler.add(name, tile_texts.get(name))
+        pending = scheduler.order()
+
+        if args.workers > 1:
+            driver.quit()
+            scrape_in_parallel(
+                make_driver=lambda: start_chrome(lean=not args.full_browser),
+                open_lobby=lambda d: load_lobby(d, args.lobby_url, report=False),
+                scrape_venue=lambda d, name: scrape_venue(
+                    d, name, args.lobby_url, race_urls.get(name), form_cache, archive, fingerprints=fingerprints,
+                    race_urls=race_urls
+                ),
+                locations=pending,
+                workers=args.workers,
+                min_interval=args.min_interval,
+                sink=sink,
+            )
+        elif args.follow_jumps:
+            try:
+                follow_jumps(
+                    scheduler,
+                    lambda name, with_form: scrape_venue(
+                        driver, name, args.lobby_url, race_urls.get(name), form_cache, archive, with_form,
+                        race_urls=race_urls
+                    ),
+                    lambda race_df: race_df['Race Time'].dropna().tolist(),
+                    sink,
+                )
+            finally:
+                driver.quit()
+        else:
+            watchdog = None
+            if (args.max_browser_mb or args.recycle_after) and not lent_driver:
+                watchdog = BrowserWatchdog(
+                    driver, lambda: start_chrome(lean=not args.full_browser), args.max_browser_mb, args.recycle_after
+                )
+            try:
+                scrape_races(
+                    driver, pending, args.lobby_url, race_urls, form_cache, sink, archive, fingerprints, watchdog
+                )
+            finally:
+                if watchdog is None:
+                    driver.quit()
+                else:
+                    watchdog.quit()
+                    watchdog.print_summary()
+                    watchdog.write_json(os.path.join(args.output_dir, 'browser_memory.json'))
+
+        RECORDER.print_summary()
+        RECORDER.write_json(os.path.join(args.output_dir, 'wait_latency.json'))
+        NAVIGATIONS.print_summary()
+        NAVIGATIONS.write_json(os.path.join(args.output_dir, 'navigation_metrics.json'))
+
+    sink.finalize(australian_locations)
+    if args.parquet_dir:
+        with METRICS.stage("parquet"):
+            write_typed_outputs(
+                os.path.join(args.output_dir, 'Trace_data.csv'), os.path.join(args.output_dir, 'Tfull_form_data.csv'),
+                args.parquet_dir, 'T', datetime.now().strftime('%Y-%m-%d')
+            )
+    if args.race_results:
+        with METRICS.stage("race_results"):
+            write_race_results(
+                os.path.join(args.output_dir, 'Tfull_form_data.csv'), os.path.join(args.output_dir, 'Trace_results.csv'),
+                os.path.join(args.output_dir, 'Trace_runs.csv'), 'T'
+            )
+    if form_cache is not None:
+        with METRICS.stage("form_cache_save"):
+            form_cache.save()
 
-    driver.quit()
+    METRICS.print_summary()
+    METRICS.write_json(os.path.join(args.output_dir, 'run_metrics.json'))
+    METRICS.write_prometheus(os.path.join(args.output_dir, 'run_metrics.prom'), code='T')
 
 
 if __name__ == "__main__":
@@ -0,0 +1,293 @@
+"""
+Typed, columnar versions of the race and form outputs.
+
+The CSVs hold every field as text ("$3.40", "1,1,6", "Ben E Thompson 58kg").
+These conversions give each column a proper dtype once, at write time: numeric
+odds, prices, margins and times, real dates, list columns for In Run and
+placings, and categorical tracks, classes and people. Form rows also get
+derived features: finishing position and field size from Plc ("4/7") and the
+first-section position from In Run. Every conversion works on whole columns:
+scalar columns are converted once per distinct value (`by_distinct`), and the
+list columns with pyarrow compute kernels when pyarrow is installed, so 100k
+form rows take a fraction of a second. The typed frames are written as Parquet
+datasets partitioned by code and meeting date
+(`<dir>/form/code=G/meeting_date=2025-08-30/...`), the date of the scrape; form
+rows keep each run's own Date as a typed column. Greyhound and thoroughbred
+rows have different columns, so each code is read from its own partition.
+"""
+import json
+import os
+import shutil
+import tempfile
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = pc = None
+
+NUMBER = r'(\d+(?:\.\d+)?)'
+# The columns that identify a row within a partition: a later run's row with the same
+# key replaces the earlier one
+RACE_KEYS = {'G': ['Race', 'Dog number'], 'T': ['Race Time', 'Race Name', 'Horse Number']}
+FORM_KEYS = {'G': ['Greyhound', 'Date', 'Track'], 'T': ['Horse', 'Date', 'Track']}
+
+
+def by_distinct(series, convert):
+    """
+    Applies the column conversion `convert` to each distinct value once and spreads
+    the results back over the rows. Prices, margins, dates and positions repeat
+    heavily, so this touches a small fraction of the rows.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    converted = convert(pd.Series(uniques, dtype=series.dtype))
+    return pd.Series(converted.array.take(codes), index=series.index, name=series.name)
+
+
+def _to_number(series):
+    return pd.to_numeric(
+        series.astype('string').str.replace(r'[$,]|kg$', '', regex=True).str.strip(),
+        errors='coerce'
+    ).astype('Float64')
+
+
+def to_number(series):
+    """'$3.40' / '58kg' / '6.23' -> float; anything else -> NaN."""
+    return by_distinct(series, _to_number)
+
+
+def to_int(series, dtype='Int32'):
+    return to_number(series).round().astype(dtype)
+
+
+def to_date(series):
+    return by_distinct(series, lambda distinct: pd.to_datetime(distinct, format='%Y-%m-%d', errors='coerce'))
+
+
+def to_category(series):
+    return series.astype('string').replace({'': pd.NA, 'N/A': pd.NA}).astype('category')
+
+
+def _arrow_text(series):
+    text = pa.array(series.astype('string'))
+    return text.combine_chunks() if isinstance(text, pa.ChunkedArray) else text
+
+
+def _to_int_list(series):
+    text = series.astype('string')
+    valid = text.str.fullmatch(r'\d+(,\d+)*').fillna(False)
+    return text.where(valid).str.split(',').map(
+        lambda parts: [int(p) for p in parts] if isinstance(parts, list) else None
+    ).astype(object)
+
+
+def to_int_list(series):
+    """'1,1,6' -> [1, 1, 6]; 'N/A' or malformed -> None."""
+    if pa is None:
+        return by_distinct(series, _to_int_list)
+    text = _arrow_text(series)
+    text = pc.if_else(pc.match_substring_regex(text, r'^\d+(,\d+)*$'), text, None)
+    lists = pc.split_pattern(text, ',').cast(pa.large_list(pa.int64()))
+    return pd.Series(pd.arrays.ArrowExtensionArray(lists), index=series.index, name=series.name)
+
+
+def _to_placings(series):
+    text = series.astype('string').where(series != 'N/A')
+    return text.str.replace(r'(^|\n)\d+\.\s*', r'\1', regex=True).str.split('\n').map(
+        lambda names: names if isinstance(names, list) else None
+    ).astype(object)
+
+
+def to_placings(series):
+    """'1. Lakeview Liam\\n2. Amron Lucy' -> ['Lakeview Liam', 'Amron Lucy']; 'N/A' -> None."""
+    if pa is None:
+        return by_distinct(series, _to_placings)
+    text = _arrow_text(series)
+    lines = pc.split_pattern(pc.if_else(pc.equal(text, 'N/A'), None, text), '\n')
+    # Drops a leading "<digits>." and the spaces after it from every line, without a regex.
+    # Trimming every leading dot is the cheap way to drop the one after the number; only
+    # a line with two dots there ("1.. x") needs the exact single replacement.
+    line = lines.flatten()
+    rest = pc.ascii_ltrim(line, '0123456789')
+    numbered = pc.and_(pc.starts_with(rest, '.'), pc.less(pc.binary_length(rest), pc.binary_length(line)))
+    if pc.any(pc.starts_with(rest, '..')).as_py():
+        rest = pc.replace_substring(rest, '.', '', max_replacements=1)
+    else:
+        rest = pc.ascii_ltrim(rest, '.')
+    name = pc.ascii_ltrim_whitespace(rest)
+    names = pc.if_else(numbered, name, line)
+    lists = pa.LargeListArray.from_arrays(lines.offsets, names, mask=lines.is_null())
+    return pd.Series(pd.arrays.ArrowExtensionArray(lists), index=series.index, name=series.name)
+
+
+def _leading_int(series, pattern):
+    return pd.to_numeric(series.astype('string').str.extract(pattern, expand=False), errors='coerce').astype('Int16')
+
+
+def plc_features(plc):
+    """'4/7' -> finishing position 4 and field size 7, as Int16 columns (NA when not n/m)."""
+    codes, uniques = pd.factorize(plc, use_na_sentinel=False)
+    parts = pd.Series(uniques, dtype=plc.dtype).astype('string').str.extract(r'^(\d+)/(\d+)$')
+    distinct = [pd.to_numeric(parts[i], errors='coerce').astype('Int16') for i in (0, 1)]
+    return tuple(pd.Series(values.array.take(codes), index=plc.index, name=plc.name) for values in distinct)
+
+
+def first_section_position(in_run):
+    """'3,2,2' -> 3, the runner's position at the first call of In Run."""
+    return by_distinct(in_run, lambda distinct: _leading_int(distinct, r'^(\d+)(?:,|$)'))
+
+
+def typed_race_frame(df, code):
+    df = df.copy()
+    if code == 'G':
+        df['Dog number'] = to_int(df['Dog number'], 'Int16')
+        df['Form'] = df['Form'].astype('string')
+        df['Race'] = to_category(df['Race'])
+        for column in ['Win', 'Place']:
+            df[column] = to_number(df[column])
+    else:
+        jockey = df['Jockey'].astype('string').str.extract(r'^(.*?)\s+' + NUMBER + r'kg$')
+        df['Jockey Weight'] = pd.to_numeric(jockey[1], errors='coerce').astype('Float64')
+        df['Jockey'] = to_category(jockey[0].fillna(df['Jockey']))
+        for column in ['Race Time', 'Race Name', 'Trainer', 'Age/Sex', 'Status']:
+            df[column] = to_category(df[column])
+        df['Horse Number'] = to_int(df['Horse Number'], 'Int16')
+        df['Barrier'] = to_int(df['Barrier'], 'Int16')
+        df['Form'] = df['Form'].astype('string')
+        for column in ['Win Odds', 'Place Odds']:
+            df[column] = to_number(df[column])
+    return df
+
+
+def typed_form_frame(df, code):
+    df = df.copy()
+    df['Finish'], df['Field Size'] = plc_features(df['Plc'])
+    df['First Sect Pos'] = first_section_position(df['In Run'])
+    df['Date'] = to_date(df['Date'])
+    df['Track'] = to_category(df['Track'])
+    df['Class'] = to_category(df['Class'])
+    df['Days'] = to_int(df['Days'])
+    df['Distance'] = to_int(df['Distance'])
+    df['Mgn'] = to_number(df['Mgn'])
+    df['Time'] = to_number(df['Time'])
+    df['Price'] = to_number(df['Price'])
+    df['In Run'] = to_int_list(df['In Run'])
+    df['Placing'] = to_placings(df['Placing'])
+    if code == 'G':
+        df['Box'] = to_int(df['Box'], 'Int16')
+        for column in ['Sect', 'Best']:
+            if column in df:
+                df[column] = to_number(df[column])
+    else:
+        df['Cond'] = to_category(df['Cond'])
+        df['Jockey'] = to_category(df['Jockey'])
+        df['Bar'] = to_int(df['Bar'], 'Int16')
+        df['Wgt'] = to_number(df['Wgt'])
+    return df
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError("Parquet output needs pyarrow: pip install pyarrow")
+
+
+def append_partition(df, root, code, meeting_date):
+    """
+    Adds `df` to the (code, meeting_date) partition of the Parquet dataset at `root`.
+    """
+    _require_pyarrow()
+    import pyarrow.parquet as pq
+
+    pq.write_to_dataset(_arrow_table(df.assign(code=code, meeting_date=meeting_date)),
+                        root, partition_cols=['code', 'meeting_date'])
+
+
+def _row_keys(df, columns):
+    return pd.MultiIndex.from_frame(df[columns].astype('string').fillna(''))
+
+
+def merge_partition(staged, target, keys):
+    """
+    Moves the staged partition directory `staged` into place at `target`. Rows already
+    in `target` are kept unless a staged row has the same `keys`, so a run replaces
+    only the rows it scraped again.
+    """
+    import pyarrow.parquet as pq
+
+    if os.path.isdir(target):
+        existing = pd.read_parquet(target)
+        kept = existing[~_row_keys(existing, keys).isin(_row_keys(pd.read_parquet(staged, columns=keys), keys))]
+        if not kept.empty:
+            pq.write_table(_arrow_table(kept), os.path.join(staged, 'kept.parquet'))
+        replaced = staged + '.replaced'
+        os.rename(target, replaced)
+        os.rename(staged, target)
+        shutil.rmtree(replaced)
+    else:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.rename(staged, target)
+
+
+def _arrow_table(df):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    # pandas picks the smallest integer type for categorical codes, so the same column
+    # would be dictionary<int8> in one file and dictionary<int16> in another and the
+    # files of a dataset could not be read together
+    schema = pa.schema([
+        field.with_type(pa.dictionary(pa.int32(), field.type.value_type))
+        if pa.types.is_dictionary(field.type) else field
+        for field in table.schema
+    ], metadata=table.schema.metadata)
+    table = table.cast(schema)
+    return table.replace_schema_metadata(_list_columns_as_object(table.schema.metadata))
+
+
+def _list_columns_as_object(metadata):
+    # pandas cannot read back the dtype name of Arrow-backed list columns
+    # ("list<item: int64>[pyarrow]"), so they are recorded as object columns, which
+    # is how list columns of Python lists were always stored
+    pandas_metadata = json.loads(metadata[b'pandas'])
+    for column in pandas_metadata['columns']:
+        if column['numpy_type'].startswith(('list<', 'large_list<')):
+            column['numpy_type'] = 'object'
+    return {**metadata, b'pandas': json.dumps(pandas_metadata).encode()}
+
+
+def write_typed_outputs(race_csv, form_csv, parquet_dir, code, meeting_date, chunksize=50000):
+    """
+    Converts the final race and form CSVs into typed Parquet datasets under
+    `parquet_dir`/race and `parquet_dir`/form, in the (code, meeting_date) partition.
+    The run is merged into that partition (see `merge_partition`), so a later run on
+    the same day, e.g. one that writes only the form rows new to `--form-cache`, adds
+    to the day's rows instead of replacing them. The CSVs are read in chunks, so
+    memory stays bounded.
+    """
+    _require_pyarrow()
+    os.makedirs(parquet_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix='.staging-', dir=parquet_dir)
+    try:
+        for name, csv_path, convert in [('race', race_csv, typed_race_frame), ('form', form_csv, typed_form_frame)]:
+            staged_root = os.path.join(staging, name)
+            for chunk in pd.read_csv(csv_path, dtype=str, keep_default_na=False, chunksize=chunksize):
+                if chunk.empty:
+                    continue
+                append_partition(convert(chunk, code), staged_root, code, meeting_date)
+            partition = os.path.join(f"code={code}", f"meeting_date={meeting_date}")
+            if os.path.isdir(os.path.join(staged_root, partition)):
+                keys = FORM_KEYS[code] if name == 'form' else RACE_KEYS[code]
+                merge_partition(os.path.join(staged_root, partition), os.path.join(parquet_dir, name, partition), keys)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    print(f"Wrote typed Parquet output for {code} {meeting_date} to {parquet_dir}")
+
+
+def read_dataset(root, code, meeting_date=None):
+    """
+    Loads one code's typed dataset, e.g. read_dataset('parquet/form', 'G').
+    """
+    filters = [('meeting_date', '==', meeting_date)] if meeting_date else None
+    return pd.read_parquet(os.path.join(root, f"code={code}"), filters=filters).assign(code=code)
@@ -0,0 +1,168 @@
+"""
+Content fingerprints of each venue's page text, kept between runs.
+
+On repeated runs most venues' runner lists and form blocks are byte-for-byte the same
+as last time. `VenueFingerprints.unchanged` hashes a venue's extracted text with
+SHA-256, salted with the parser sources so that a parser change invalidates every
+entry. When the hash matches the stored one, the scraper skips parsing, and
+`FingerprintSink` commits the rows written for that text last time (hard-linked, not
+rewritten). Changed venues are parsed and written as usual, and their part files are
+kept for the next run. Hits and misses are counted in the run metrics.
+"""
+import hashlib
+import json
+import os
+import threading
+
+import form_engine
+from run_metrics import METRICS
+from venue_sink import link_or_copy, venue_slug
+
+
+def text_digest(race_data, form_data, salt=b''):
+    """SHA-256 of a venue's runner lines and form blocks."""
+    digest = hashlib.sha256(salt)
+    digest.update('\n'.join(race_data).encode('utf-8'))
+    digest.update(b'\x00')
+    digest.update('\x1e'.join(form_data).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def source_salt(*paths):
+    """A digest of the parser sources, so outputs of older parsers are never reused."""
+    digest = hashlib.sha256()
+    for path in (form_engine.__file__, *paths):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.digest()
+
+
+class VenueFingerprints:
+    """
+    Per-venue text hashes and the part files written for them, stored under `root`.
+
+    With `reuse_form=False` (when a form cache trims already emitted form rows) only
+    a venue's race rows are reused, and only while the cache knows all its runners,
+    since their form rows were emitted then.
+    """
+
+    def __init__(self, root, code, sources=(), runner_column='Name', reuse_form=True):
+        self.root = root
+        self.code = code
+        self.salt = source_salt(*sources)
+        self.runner_column = runner_column
+        self.reuse_form = reuse_form
+        self.parts_dir = os.path.join(root, code)
+        self.index_path = os.path.join(root, f"{code}-index.json")
+        self.hits = self.misses = 0
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._reused = set()
+        self.entries = {}
+        os.makedirs(self.parts_dir, exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path) as f:
+                self.entries = json.load(f)
+
+    def part_path(self, file_name):
+        return os.path.join(self.parts_dir, file_name)
+
+    def _reusable(self, entry, digest):
+        return (
+            entry is not None and entry['sha256'] == digest
+            and (entry['complete_form'] or not self.reuse_form)
+            and os.path.exists(self.part_path(entry['race']))
+            and os.path.exists(self.part_path(entry['form']))
+        )
+
+    def unchanged(self, venue, race_data, form_data, form_cache=None):
+        """
+        True when the venue's text hashes the same as when its stored rows were written
+        (and `form_cache`, if given, knows every runner). Otherwise the new hash is held
+        until the venue's rows are stored.
+        """
+        digest = text_digest(race_data, form_data, self.salt)
+        with self._lock:
+            entry = self.entries.get(venue)
+            hit = self._reusable(entry, digest) and (form_cache is None or form_cache.knows(entry['runners']))
+            if hit:
+                self._reused.add(venue)
+                self.hits += 1
+            else:
+                self._pending[venue] = digest
+                self.misses += 1
+        METRICS.count("fingerprint_hits" if hit else "fingerprint_misses")
+        return hit
+
+    def reused(self, venue):
+        with self._lock:
+            return venue in self._reused
+
+    def runners(self, venue):
+        """Runner names of the venue's stored rows."""
+        with self._lock:
+            return list(self.entries.get(venue, {}).get('runners', []))
+
+    def store(self, venue, race_path, form_path, race_rows, form_rows, runners):
+        """Keeps the part files just written for the venue's new text."""
+        with self._lock:
+            digest = self._pending.pop(venue, None)
+        if digest is None:
+            return
+        slug = venue_slug(venue)
+        entry = {
+            'sha256': digest, 'race': f"{slug}-race.csv", 'form': f"{slug}-form.csv",
+            'race_rows': race_rows, 'form_rows': form_rows, 'runners': list(runners),
+            'complete_form': self.reuse_form,
+        }
+        link_or_copy(race_path, self.part_path(entry['race']))
+        link_or_copy(form_path, self.part_path(entry['form']))
+        with self._lock:
+            self.entries[venue] = entry
+
+    def save(self):
+        tmp_path = self.index_path + '.tmp'
+        with self._lock:
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+        os.replace(tmp_path, self.index_path)
+        print(f"Fingerprints: {self.hits} venues unchanged and reused, {self.misses} parsed")
+
+
+class FingerprintSink:
+    """
+    Wraps a CsvVenueSink. Venues whose text was unchanged are committed from their
+    stored part files; every other venue is written, then stored for the next run.
+    """
+
+    def __init__(self, sink, fingerprints):
+        self.sink = sink
+        self.fingerprints = fingerprints
+
+    def completed(self):
+        return self.sink.completed()
+
+    def write_venue(self, venue, race_df, form_df):
+        fingerprints = self.fingerprints
+        if fingerprints.reused(venue):
+            entry = fingerprints.entries[venue]
+            form_path = fingerprints.part_path(entry['form']) if fingerprints.reuse_form else None
+            self.sink.adopt_venue(
+                venue, fingerprints.part_path(entry['race']), form_path, entry['race_rows'], entry['form_rows']
+            )
+            # The scraper hands a reused venue down as None frames, so the metrics sink
+            # counts nothing for it; its rows are the ones adopted from the part files
+            METRICS.rows(venue, entry['race_rows'], entry['form_rows'] if form_path is not None else 0)
+            return
+        self.sink.write_venue(venue, race_df, form_df)
+        race_path, form_path = self.sink.part_paths(venue)
+        runners = [] if race_df is None else race_df[fingerprints.runner_column].tolist()
+        fingerprints.store(
+            venue, race_path, form_path,
+            0 if race_df is None else len(race_df), 0 if form_df is None else len(form_df), runners
+        )
+
+    def finalize(self, order=None):
+        result = self.sink.finalize(order)
+        self.fingerprints.save()
+        return result
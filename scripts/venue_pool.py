@@ -0,0 +1,114 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import WebDriverException
+
+
+class RateLimiter:
+    """
+    Spaces out calls so that at most one call passes every `min_interval` seconds.
+    """
+
+    def __init__(self, min_interval=0.0):
+        self.min_interval = min_interval
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_allowed - now
+            self._next_allowed = max(now, self._next_allowed) + self.min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def split_locations(locations, workers):
+    """
+    Splits locations round-robin across workers, keeping each location's lobby index.
+    Returns a list of [(index, location), ...] chunks, one per worker.
+    """
+    chunks = [[] for _ in range(workers)]
+    for index, location in enumerate(locations):
+        chunks[index % workers].append((index, location))
+    return [chunk for chunk in chunks if chunk]
+
+
+def _recover(worker_id, driver, make_driver, open_lobby):
+    """
+    Back to the lobby after a failed venue, or, when the session no longer answers,
+    on a new driver. Returns the driver to carry on with.
+    """
+    try:
+        open_lobby(driver)
+        return driver
+    except WebDriverException as e:
+        print(f"[worker {worker_id}] Restarting the browser: {e.__class__.__name__}")
+    try:
+        driver.quit()
+    except WebDriverException:
+        pass
+    driver = make_driver()
+    open_lobby(driver)
+    return driver
+
+
+def _run_worker(worker_id, chunk, make_driver, open_lobby, scrape_venue, min_interval, results, sink):
+    limiter = RateLimiter(min_interval)
+    driver = make_driver()
+    try:
+        open_lobby(driver)
+        for index, race_name in chunk:
+            limiter.wait()
+            print(f"[worker {worker_id}] Scraping {race_name}")
+            try:
+                race_df, form_df = scrape_venue(driver, race_name)
+            except (TimeoutError, WebDriverException) as e:
+                # Selenium's TimeoutException is a WebDriverException; a dead tab raises one too
+                reason = e.msg if isinstance(e, WebDriverException) else e
+                print(f"[worker {worker_id}] Skipping {race_name}: {e.__class__.__name__}: {reason}")
+                driver = _recover(worker_id, driver, make_driver, open_lobby)
+                continue
+            if sink is not None:
+                sink.write_venue(race_name, race_df, form_df)
+            else:
+                results[index] = (race_df, form_df)
+    finally:
+        driver.quit()
+
+
+def scrape_in_parallel(make_driver, open_lobby, scrape_venue, locations, workers=2, min_interval=0.0, sink=None):
+    """
+    Scrapes locations concurrently across a pool of browser workers.
+
+    Each worker owns its own driver from `make_driver()`, opens the lobby with
+    `open_lobby(driver)` and calls `scrape_venue(driver, race_name)` for its share of
+    the locations, which must return (race_df, form_df). At most `workers` browsers
+    run at once, and each starts a new venue at most every `min_interval` seconds.
+    With a `sink`, each venue is written as soon as it is scraped and nothing is kept.
+    A venue that times out or whose tab fails is skipped, and the worker goes back to
+    the lobby, on a new driver if its session no longer answers.
+    Returns two lists of DataFrames, merged back into lobby order.
+    """
+    workers = max(1, min(workers, len(locations)))
+    results = [(None, None)] * len(locations)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _run_worker, worker_id, chunk, make_driver, open_lobby,
+                scrape_venue, min_interval, results, sink
+            )
+            for worker_id, chunk in enumerate(split_locations(locations, workers))
+        ]
+        for worker_id, future in enumerate(futures):
+            # A worker that could not recover loses only its own remaining venues
+            try:
+                future.result()
+            except Exception as e:
+                print(f"[worker {worker_id}] Stopped: {e.__class__.__name__}: {e}")
+
+    all_dfs = [race_df for race_df, _ in results if race_df is not None]
+    forms_dfs = [form_df for _, form_df in results if form_df is not None]
+    return all_dfs, forms_dfs
@@ -0,0 +1,164 @@
+import json
+import os
+import re
+import shutil
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+
+def venue_slug(name):
+    return re.sub(r'[^A-Za-z0-9]+', '-', name).strip('-').lower() or 'venue'
+
+
+def link_or_copy(source, path):
+    """Puts `source` at `path` atomically, as a hard link where the filesystem allows one."""
+    tmp_path = path + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class CsvVenueSink:
+    """
+    Streams each venue's race and form rows to disk as soon as they are parsed.
+
+    Every venue is committed atomically: its rows are written to part files, which
+    are renamed into place before the venue is recorded in the run manifest. A run
+    interrupted part way can be resumed, and completed venues are skipped.
+    `finalize()` then streams the parts into the final CSVs without loading them.
+    """
+
+    def __init__(self, output_dir, race_file, form_file, race_columns, form_columns,
+                 run_id=None, resume=False):
+        self.output_dir = output_dir
+        self.race_file = race_file
+        self.form_file = form_file
+        self.race_columns = list(race_columns)
+        self.form_columns = list(form_columns)
+        self.run_id = run_id or datetime.now().strftime('%Y%m%d')
+        self.parts_dir = os.path.join(output_dir, '.parts', f"{os.path.splitext(race_file)[0]}-{self.run_id}")
+        self.manifest_path = os.path.join(self.parts_dir, 'manifest.json')
+        self._lock = threading.Lock()
+
+        if not resume and os.path.isdir(self.parts_dir):
+            shutil.rmtree(self.parts_dir)
+        os.makedirs(self.parts_dir, exist_ok=True)
+
+        self.manifest = {'completed': {}}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+            print(f"Resuming run {self.run_id}: {len(self.manifest['completed'])} venues already written")
+
+    def completed(self):
+        with self._lock:
+            return set(self.manifest['completed'])
+
+    def _write_part(self, df, columns, file_name):
+        path = os.path.join(self.parts_dir, file_name)
+        tmp_path = path + '.tmp'
+        df = df if df is not None else pd.DataFrame(columns=columns)
+        df[columns].to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        return file_name
+
+    def write_venue(self, venue, race_df, form_df):
+        """
+        Writes one venue's rows and commits the venue to the manifest.
+        """
+        slug = venue_slug(venue)
+        parts = {
+            'race': self._write_part(race_df, self.race_columns, f"{slug}-race.csv"),
+            'form': self._write_part(form_df, self.form_columns, f"{slug}-form.csv"),
+            'race_rows': 0 if race_df is None else len(race_df),
+            'form_rows': 0 if form_df is None else len(form_df),
+        }
+        self._commit(venue, parts)
+
+    def adopt_venue(self, venue, race_path, form_path, race_rows, form_rows):
+        """
+        Commits a venue from part files written earlier, e.g. by a previous run, instead
+        of writing its rows again. Without `form_path` the venue has no form rows.
+        """
+        slug = venue_slug(venue)
+        parts = {'race': f"{slug}-race.csv", 'form': f"{slug}-form.csv", 'race_rows': race_rows, 'form_rows': 0}
+        link_or_copy(race_path, os.path.join(self.parts_dir, parts['race']))
+        if form_path is not None:
+            link_or_copy(form_path, os.path.join(self.parts_dir, parts['form']))
+            parts['form_rows'] = form_rows
+        else:
+            self._write_part(None, self.form_columns, parts['form'])
+        self._commit(venue, parts)
+
+    def part_paths(self, venue):
+        """The committed (race, form) part files of `venue`."""
+        with self._lock:
+            parts = self.manifest['completed'][venue]
+        return os.path.join(self.parts_dir, parts['race']), os.path.join(self.parts_dir, parts['form'])
+
+    def _commit(self, venue, parts):
+        with self._lock:
+            self.manifest['completed'][venue] = parts
+            tmp_path = self.manifest_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(self.manifest, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+
+    def _merge(self, kind, columns, file_name, order):
+        path = os.path.join(self.output_dir, file_name)
+        tmp_path = path + '.tmp'
+        rows = 0
+        with open(tmp_path, 'w', newline='') as out:
+            pd.DataFrame(columns=columns).to_csv(out, index=False)
+            for venue in order:
+                parts = self.manifest['completed'].get(venue)
+                if not parts:
+                    continue
+                with open(os.path.join(self.parts_dir, parts[kind]), newline='') as part:
+                    part.readline()
+                    shutil.copyfileobj(part, out)
+                rows += parts[f"{kind}_rows"]
+        os.replace(tmp_path, path)
+        return rows
+
+    def finalize(self, order=None):
+        """
+        Streams the committed parts, in `order` then commit order, into the final CSVs
+        and removes the run's parts. Returns (race rows, form rows) written.
+        """
+        with self._lock:
+            completed = list(self.manifest['completed'])
+        order = [venue for venue in (order or []) if venue in completed]
+        order += [venue for venue in completed if venue not in order]
+
+        race_rows = self._merge('race', self.race_columns, self.race_file, order)
+        form_rows = self._merge('form', self.form_columns, self.form_file, order)
+        shutil.rmtree(self.parts_dir)
+        print(f"Wrote {race_rows} race rows and {form_rows} form rows from {len(order)} venues")
+        return race_rows, form_rows
+
+
+class TeeSink:
+    """
+    Writes every venue to several sinks. The first sink decides which venues are already done.
+    """
+
+    def __init__(self, primary, *others):
+        self.sinks = [primary, *others]
+
+    def completed(self):
+        return self.sinks[0].completed()
+
+    def write_venue(self, venue, race_df, form_df):
+        for sink in self.sinks:
+            sink.write_venue(venue, race_df, form_df)
+
+    def finalize(self, order=None):
+        results = [sink.finalize(order) for sink in self.sinks]
+        return results[0]
@@ -0,0 +1,38 @@
+import contextlib
+import io
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'scripts'))
+sys.path.insert(0, os.path.join(HERE, '..', 'benchmarks'))
+
+import pandas as pd
+
+from fixture_site import FixtureSite, ReplaySite, lobby_url, serve
+from scraper_loader import load_scraper
+
+
+def scrape(code, url, output_dir, *extra):
+    with contextlib.redirect_stdout(io.StringIO()):
+        load_scraper(code).main(['--engine', 'http', '--lobby-url', url, '--output-dir', str(output_dir), *extra])
+
+
+def test_recorded_run_replays_to_the_same_outputs(tmp_path):
+    site = FixtureSite('T', venues=3, prerender=True)
+    server, base_url = serve(site)
+    try:
+        scrape('T', lobby_url(site, base_url), tmp_path / 'fixture', '--record-dir', str(tmp_path / 'recorded'))
+    finally:
+        server.shutdown()
+
+    server, base_url = serve(ReplaySite(str(tmp_path / 'recorded')))
+    try:
+        scrape('T', lobby_url(site, base_url), tmp_path / 'replayed')
+    finally:
+        server.shutdown()
+
+    for name in ['Trace_data.csv', 'Tfull_form_data.csv']:
+        fixture = pd.read_csv(tmp_path / 'fixture' / name)
+        assert len(fixture) > 0
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / 'replayed' / name), fixture)
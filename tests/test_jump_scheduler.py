@@ -0,0 +1,32 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from jump_scheduler import JumpScheduler
+
+
+def label(hours, venue):
+    return f"{datetime.now() + timedelta(hours=hours):%H:%M}  {venue}"
+
+
+def test_real_clock_orders_due_venues_by_jump_time():
+    scheduler = JumpScheduler()
+    for hours, venue in [(3, 'Late'), (2, 'Mid'), (1, 'Soon')]:
+        scheduler.add(venue, label(hours, venue))
+
+    assert scheduler.order() == ['Soon', 'Mid', 'Late']
+    assert [scheduler.pop(sleep=lambda s: None) for _ in range(3)] == ['Soon', 'Mid', 'Late']
+    assert scheduler.pop() is None
+
+
+def test_unknown_jump_time_goes_last_and_rescheduled_venue_waits():
+    scheduler = JumpScheduler()
+    scheduler.add('Unknown')
+    scheduler.add('Soon', label(1, 'Soon'))
+    scheduler.add('Mid', label(2, 'Mid'))
+    assert scheduler.pop() == 'Soon'
+    scheduler.reschedule('Soon', [label(1, 'Soon')])
+
+    assert scheduler.order() == ['Mid', 'Unknown', 'Soon']
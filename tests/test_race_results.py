@@ -0,0 +1,40 @@
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from race_results import normalize_form, placing_map
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+
+def form_row(runner, plc, placing):
+    return {'Greyhound': runner, 'Plc': plc, 'Date': '2025-08-08', 'Track': 'Sale', 'Distance': '400',
+            'Class': 'M', 'Placing': placing}
+
+
+def test_conflicting_rows_of_one_winner_are_merged():
+    form_df = pd.DataFrame([
+        form_row('Alpha', '2/6', '1. Winner\n3. Gamma'),
+        form_row('Beta', '2/6', '1. Winner\n3. Delta'),
+    ])
+    races, runs = normalize_form(form_df, 'G')
+    assert len(races) == 1
+    assert runs['race_id'].tolist() == [races['race_id'][0]] * 2
+    assert races['Placing'][0].split('\n') == ['1. Winner', '2. Alpha', '2. Beta', '3. Gamma', '3. Delta']
+
+
+def test_data_races_keep_every_placing():
+    for code, name, runner_column in (('G', 'full_form_data.csv', 'Greyhound'), ('T', 'Tfull_form_data.csv', 'Horse')):
+        form_df = pd.read_csv(os.path.join(DATA_DIR, name), dtype=str, keep_default_na=False)
+        races, runs = normalize_form(form_df, code)
+        assert races['race_id'].is_unique
+        assert set(runs['race_id']) == set(races['race_id'])
+        placings = dict(zip(races['race_id'], races['Placing'].str.split('\n')))
+        for identifier, placing, plc, runner in zip(
+            runs['race_id'], form_df['Placing'], form_df['Plc'], form_df[runner_column]
+        ):
+            lines = {f"{position}. {name}" for position, name in placing_map(placing, plc, runner).items()}
+            assert lines <= set(placings[identifier])
@@ -0,0 +1,47 @@
+import contextlib
+import io
+import os
+import sys
+from datetime import datetime, timedelta
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'scripts'))
+sys.path.insert(0, os.path.join(HERE, '..', 'benchmarks'))
+
+import pandas as pd
+
+from fixture_site import FixtureSite, lobby_url, serve
+from scraper_loader import load_scraper
+from snapshot_archive import SnapshotArchive, reparse
+
+
+def test_reparse_keeps_form_of_follow_jumps_refreshes(tmp_path):
+    site = FixtureSite('G', venues=3, prerender=True)
+    server, base_url = serve(site)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_scraper('G').main([
+                '--engine', 'http', '--lobby-url', lobby_url(site, base_url),
+                '--output-dir', str(tmp_path / 'out'), '--archive-dir', str(tmp_path / 'archive'),
+            ])
+    finally:
+        server.shutdown()
+
+    # A follow-jumps refresh archives the runner list only (with_form=False)
+    archive = SnapshotArchive(str(tmp_path / 'archive'))
+    scraped = archive.entries()
+    for entry in scraped:
+        snapshot = archive.load(entry)
+        archive.add('G', entry['venue'], snapshot['race_data'], [],
+                    captured_at=datetime.fromisoformat(entry['captured_at']) + timedelta(seconds=1))
+    assert all(not entry['form_entries'] for entry in archive.latest())
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert reparse(str(tmp_path / 'archive'), str(tmp_path / 'rebuild'), processes=1) == len(scraped)
+
+    day = scraped[0]['day']
+    for name in ['race_data.csv', 'full_form_data.csv']:
+        expected = pd.read_csv(tmp_path / 'out' / name)
+        rebuilt = pd.read_csv(tmp_path / 'rebuild' / day / name)
+        assert len(expected) > 0
+        pd.testing.assert_frame_equal(rebuilt, expected)